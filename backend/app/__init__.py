@@ -1,20 +1,105 @@
 # backend/app/__init__.py
 
-from flask import Flask
+from flask import Flask, current_app
 from flask_cors import CORS
 from flask_login import LoginManager
 from dotenv import load_dotenv
 from app.utils._constants import categories_dict
 
 from app.utils.mongodb_connector import ExpenseTrackerWebAppDB
+from app.utils.cache import build_cache
+from app.utils.jobs import JobQueue
+from app.utils.login_throttle import LoginThrottle
+from app.utils.password_hasher import PasswordHasher
+from app.utils.json_provider import FastJSONProvider
 from app.utils.mongo_user import MongoUser  # We'll create this file
 
 load_dotenv()
 login_manager = LoginManager()
 
+# Defaults that can be overridden with FLASK_ prefixed environment variables,
+# e.g. FLASK_MONGODB_MAX_POOL_SIZE=50
+DEFAULT_CONFIG = {
+    "MONGODB_MAX_POOL_SIZE": 20,
+    "MONGODB_MIN_POOL_SIZE": 0,
+    "MONGODB_CONNECT_TIMEOUT_MS": 5000,
+    "MONGODB_SOCKET_TIMEOUT_MS": 10000,
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS": 5000,
+    # "rollups" (MonthlyRollups), "aggregate" (pipeline over Transactions) or
+    # "python" (single pass over the transactions)
+    "DASHBOARD_CHART_SOURCE": "rollups",
+    # Transactions returned by /dashboard, and the default/max page size of /transactions
+    "DASHBOARD_PAGE_SIZE": 50,
+    "MAX_PAGE_SIZE": 500,
+    # Operations accepted per /expenses/batch request
+    "EXPENSES_BATCH_MAX_OPERATIONS": 1000,
+    # Uploaded statement files (/expenses/import): largest accepted upload, and
+    # transactions upserted per bulk write while the file is parsed
+    "STATEMENT_IMPORT_MAX_BYTES": 100 * 1024 * 1024,
+    "STATEMENT_IMPORT_BATCH_SIZE": 1000,
+    # Re-validate every stored transaction on reads instead of trusting the write paths
+    "AUDIT_TRANSACTION_READS": False,
+    # Computed /dashboard payloads kept per user until their data version changes:
+    # at most DASHBOARD_CACHE_SIZE in each process (0 disables the cache), for up
+    # to DASHBOARD_CACHE_TTL_SECONDS. Backend "mongo" also shares them between
+    # worker processes through the Cache collection.
+    "DASHBOARD_CACHE_SIZE": 1024,
+    "DASHBOARD_CACHE_TTL_SECONDS": 3600,
+    "DASHBOARD_CACHE_BACKEND": "memory",
+    # PBKDF2 iterations of new password hashes (older hashes keep working and are
+    # upgraded on login), hashed on a pool of PASSWORD_HASH_WORKERS processes (0 =
+    # in the request thread) with at most PASSWORD_HASH_MAX_QUEUE waiting
+    "PASSWORD_HASH_ITERATIONS": 100000,
+    "PASSWORD_HASH_WORKERS": 2,
+    "PASSWORD_HASH_MAX_QUEUE": 16,
+    "PASSWORD_HASH_TIMEOUT_SECONDS": 5,
+    # Login attempts admitted per LOGIN_THROTTLE_WINDOW_SECONDS, checked before hashing.
+    # Failures are counted per account and IP, so others cannot lock a user out
+    "LOGIN_MAX_FAILURES_PER_ACCOUNT": 5,
+    "LOGIN_MAX_ATTEMPTS_PER_IP": 30,
+    "LOGIN_THROTTLE_WINDOW_SECONDS": 300,
+    # Logged-in users kept in memory by the Flask-Login user_loader (0 disables the
+    # cache); a user deleted or changed by another process is seen after the TTL
+    "USER_CACHE_SIZE": 4096,
+    "USER_CACHE_TTL_SECONDS": 60,
+    # Category taxonomy (/all_categories, /get_subcategories) is cached in memory and
+    # by browsers for this long; edits made by another process show up after it
+    "CATEGORIES_CACHE_TTL_SECONDS": 300,
+    # Linked bank accounts fetched in parallel by /banks/import, and transactions
+    # upserted per bulk write while their response streams in
+    "BANK_IMPORT_MAX_WORKERS": 4,
+    "BANK_IMPORT_BATCH_SIZE": 500,
+    # Incremental imports re-fetch this many days before an account's last booked
+    # date; accounts without a watermark start this many days back
+    "BANK_SYNC_OVERLAP_DAYS": 3,
+    "BANK_SYNC_INITIAL_DAYS": 90,
+    # Background job workers per process; jobs without a heartbeat for this long
+    # are treated as orphaned and re-run (at most JOBS_MAX_ATTEMPTS times). With
+    # JOBS_WORKER_ENABLED a process starts recovering orphans on its first request
+    # (CLI commands, which serve none, never do); jobs it runs heartbeat regardless
+    "JOBS_WORKER_ENABLED": True,
+    "JOBS_MAX_WORKERS": 2,
+    "JOBS_STALE_AFTER_SECONDS": 120,
+    "JOBS_MAX_ATTEMPTS": 3,
+    # Background bank sync (flask bank sync-scheduler): each linked account is synced
+    # every SYNC_INTERVAL_SECONDS, at most SYNC_MAX_CONCURRENCY at a time and no more
+    # than SYNC_REQUESTS_PER_WINDOW GoCardless calls per SYNC_WINDOW_SECONDS
+    "SYNC_INTERVAL_SECONDS": 6 * 3600,
+    "SYNC_POLL_SECONDS": 60,
+    "SYNC_MAX_CONCURRENCY": 2,
+    "SYNC_REQUESTS_PER_WINDOW": 30,
+    "SYNC_WINDOW_SECONDS": 60,
+}
+
 
 def create_app():
+    """
+    Builds the Flask app. Call this once per process (see run.py): the app owns the
+    long-lived MongoDB client, and routes reach it through current_app.mongo.
+    """
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.from_mapping(DEFAULT_CONFIG)
     app.config.from_prefixed_env("FLASK")
 
     # Initialize CORS with default settings
@@ -24,16 +109,56 @@ def create_app():
         supports_credentials=True,
     )
 
-    # Initialize the MongoDB connection
-    app.mongo = ExpenseTrackerWebAppDB(app.config["MONGODB_URI"])
+    # Initialize the MongoDB connection (one client + connection pool per process)
+    app.mongo = ExpenseTrackerWebAppDB(
+        app.config["MONGODB_URI"],
+        maxPoolSize=app.config["MONGODB_MAX_POOL_SIZE"],
+        minPoolSize=app.config["MONGODB_MIN_POOL_SIZE"],
+        connectTimeoutMS=app.config["MONGODB_CONNECT_TIMEOUT_MS"],
+        socketTimeoutMS=app.config["MONGODB_SOCKET_TIMEOUT_MS"],
+        serverSelectionTimeoutMS=app.config["MONGODB_SERVER_SELECTION_TIMEOUT_MS"],
+    )
+
+    # Create the indexes the hot queries rely on (no-op if they already exist)
+    app.mongo.ensure_indexes()
+
+    # Seed the category taxonomy on first start
+    app.mongo.seed_categories(categories_dict)
+    app.mongo.taxonomy_ttl = app.config["CATEGORIES_CACHE_TTL_SECONDS"]
+    app.mongo.principal_cache = build_cache(
+        maxsize=app.config["USER_CACHE_SIZE"], ttl=app.config["USER_CACHE_TTL_SECONDS"]
+    )
+
+    # Per-user /dashboard payloads, see routes.main.dashboard
+    app.dashboard_cache = build_cache(
+        maxsize=app.config["DASHBOARD_CACHE_SIZE"],
+        ttl=app.config["DASHBOARD_CACHE_TTL_SECONDS"],
+        backend=app.config["DASHBOARD_CACHE_BACKEND"],
+        mongo=app.mongo,
+        namespace="dashboard",
+    )
+
+    # Background jobs (bank imports, link refreshes); handlers register with the blueprints
+    app.jobs = JobQueue(
+        app,
+        app.mongo.jobs,
+        max_workers=app.config["JOBS_MAX_WORKERS"],
+        stale_after=app.config["JOBS_STALE_AFTER_SECONDS"],
+        max_attempts=app.config["JOBS_MAX_ATTEMPTS"],
+    )
 
-    # Attempt to seed categories if needed:
-    # You might want to check if categories are empty first, then seed:
-    if app.mongo.categories.count_documents({}) == 0:
-        for cat_name, sub_cats in categories_dict.items():
-            app.mongo.categories.insert_one(
-                {"_id": cat_name, "subCategories": sub_cats}
-            )
+    # Password hashing pool and login admission control, see routes.auth
+    app.password_hasher = PasswordHasher(
+        iterations=app.config["PASSWORD_HASH_ITERATIONS"],
+        max_workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_queue=app.config["PASSWORD_HASH_MAX_QUEUE"],
+        timeout=app.config["PASSWORD_HASH_TIMEOUT_SECONDS"],
+    )
+    app.login_throttle = LoginThrottle(
+        max_failures_per_account=app.config["LOGIN_MAX_FAILURES_PER_ACCOUNT"],
+        max_attempts_per_ip=app.config["LOGIN_MAX_ATTEMPTS_PER_IP"],
+        window=app.config["LOGIN_THROTTLE_WINDOW_SECONDS"],
+    )
 
     # Initialize Flask-Login
     login_manager.init_app(app)
@@ -41,10 +166,11 @@ def create_app():
     @login_manager.user_loader
     def load_user(user_id):
         """
-        For MongoDB: fetch user from "Users" collection by _id
+        For MongoDB: fetch user from "Users" collection by _id (cached, and only the
+        PRINCIPAL_PROJECTION fields, see ExpenseTrackerWebAppDB.load_principal)
         Then return a user object that implements Flask-Login’s requirements (MongoUser).
         """
-        user_doc = app.mongo.users.find_one({"_id": user_id})
+        user_doc = current_app.mongo.load_principal(user_id)
         if user_doc:
             return MongoUser(user_doc)
         return None
@@ -60,4 +186,20 @@ def create_app():
     app.register_blueprint(main_blueprint)
     app.register_blueprint(expenses_blueprint)
 
+    # Re-run jobs orphaned by a crashed worker, then keep our own jobs heartbeating.
+    # Started by the first request rather than here, so that `flask ...` commands,
+    # which build the app too, leave running jobs of other workers alone.
+    if app.config["JOBS_WORKER_ENABLED"]:
+
+        @app.before_request
+        def start_job_worker():
+            app.jobs.start()
+
+    # Register CLI commands (flask --app run <group> <command>)
+    from app.cli import bank_cli, db_cli, rollups_cli
+
+    app.cli.add_command(bank_cli)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(rollups_cli)
+
     return app
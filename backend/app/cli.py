@@ -0,0 +1,82 @@
+# backend/app/cli.py
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+bank_cli = AppGroup("bank", help="Background bank synchronisation.")
+db_cli = AppGroup("db", help="Inspect and maintain MongoDB indexes.")
+rollups_cli = AppGroup("rollups", help="Maintain the MonthlyRollups collection.")
+
+
+@bank_cli.command("sync-scheduler")
+@click.option("--once", is_flag=True, help="Sync the due accounts once and exit.")
+def sync_scheduler(once):
+    """Keep every linked account with a valid agreement synced in the background."""
+    from app.routes.bank import gocardless_client
+    from app.utils.sync_scheduler import SyncScheduler
+
+    config = current_app.config
+    scheduler = SyncScheduler(
+        current_app.mongo,
+        gocardless_client,
+        interval_seconds=config["SYNC_INTERVAL_SECONDS"],
+        max_concurrency=config["SYNC_MAX_CONCURRENCY"],
+        requests_per_window=config["SYNC_REQUESTS_PER_WINDOW"],
+        window_seconds=config["SYNC_WINDOW_SECONDS"],
+        initial_days=config["BANK_SYNC_INITIAL_DAYS"],
+        overlap_days=config["BANK_SYNC_OVERLAP_DAYS"],
+    )
+    if once:
+        click.echo(scheduler.run_once())
+        return
+    click.echo("Bank sync scheduler started.")
+    try:
+        scheduler.run_forever(poll_seconds=config["SYNC_POLL_SECONDS"])
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+@db_cli.command("ensure-indexes")
+def ensure_indexes():
+    """Create the indexes declared in mongodb_connector.INDEXES."""
+    for name in current_app.mongo.ensure_indexes():
+        click.echo(f"Ensured index {name}")
+
+
+@db_cli.command("check-indexes")
+def check_indexes():
+    """Explain every hot query and fail if any of them plans a COLLSCAN."""
+    collscans = []
+    for name, stages in current_app.mongo.explain_hot_queries().items():
+        click.echo(f"{name}: {' > '.join(stages)}")
+        if "COLLSCAN" in stages:
+            collscans.append(name)
+    if collscans:
+        raise click.ClickException(f"COLLSCAN planned for: {', '.join(collscans)}")
+    click.echo("All hot queries use an index.")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--username", default=None, help="Only rebuild this user's rollups.")
+def rebuild_rollups(username):
+    """Recompute rollups from scratch out of the Transactions collection."""
+    count = current_app.mongo.rebuild_rollups(username)
+    click.echo(f"Rebuilt {count} rollup buckets.")
+
+
+@rollups_cli.command("verify")
+@click.option("--username", default=None, help="Only verify this user's rollups.")
+def verify_rollups(username):
+    """Report rollup buckets that drifted from the Transactions collection."""
+    drift = current_app.mongo.verify_rollups(username)
+    for entry in sorted(drift, key=lambda e: tuple(str(k) for k in e["key"])):
+        user, month, category, transaction_type = entry["key"]
+        click.echo(
+            f"{user} {month} {category} {transaction_type}: "
+            f"expected total={entry['expected'][0]:.2f} count={entry['expected'][1]}, "
+            f"stored total={entry['actual'][0]:.2f} count={entry['actual'][1]}"
+        )
+    if drift:
+        raise click.ClickException(f"{len(drift)} rollup buckets drifted.")
+    click.echo("Rollups are consistent.")
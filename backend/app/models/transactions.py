@@ -1,6 +1,15 @@
 # backend/app/models/transactions.py
 
-from pydantic import BaseModel, Field, field_validator, BeforeValidator
+from pydantic import (
+    BaseModel,
+    Field,
+    field_validator,
+    BeforeValidator,
+    TypeAdapter,
+    ValidationError,
+    ValidationInfo,
+    WrapValidator,
+)
 from typing import Annotated, Optional
 from datetime import date
 
@@ -43,7 +52,57 @@ class GoCardlessTransaction(BaseModel):
 
     # If you want to ensure bookingDate is not in future:
     @field_validator("bookingDate")
-    def check_booking_date(cls, v):
-        if v and v > date.today():
+    def check_booking_date(cls, v, info: ValidationInfo):
+        # validate_transactions passes one "today" for the whole batch
+        today = (info.context or {}).get("today") or date.today()
+        if v and v > today:
             raise ValueError("bookingDate cannot be in the future")
         return v
+
+
+class _RowError:
+    """Stands in for a transaction that failed validation inside a batch."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: ValidationError):
+        self.error = error
+
+
+def _collect_row_error(value, handler):
+    try:
+        return handler(value)
+    except ValidationError as e:
+        return _RowError(e)
+
+
+TRANSACTION_LIST_ADAPTER = TypeAdapter(list[GoCardlessTransaction])
+# one invalid row must not fail (and force a second pass over) the whole batch
+_COLLECTING_LIST_ADAPTER = TypeAdapter(
+    list[Annotated[GoCardlessTransaction, WrapValidator(_collect_row_error)]]
+)
+
+
+def _format_errors(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'transaction'}: {e['msg']}"
+        for e in error.errors(include_url=False)
+    )
+
+
+def validate_transactions(docs: list, today: Optional[date] = None) -> tuple:
+    """
+    Validates a batch of transaction docs in one TypeAdapter call, with a single
+    "today" for the bookingDate check instead of one date.today() per row.
+
+    Returns (models, errors): 'models' is aligned with 'docs', holding None for each
+    rejected doc, and 'errors' is [{"index": i, "error": "field: message"}] for them.
+    """
+    context = {"today": today or date.today()}
+    models = _COLLECTING_LIST_ADAPTER.validate_python(docs, context=context)
+    errors = []
+    for index, model in enumerate(models):
+        if isinstance(model, _RowError):
+            errors.append({"index": index, "error": _format_errors(model.error)})
+            models[index] = None
+    return models, errors
@@ -1,11 +1,13 @@
 # backend/app/routes/auth.py
 
-from flask import Blueprint, request, flash
+import math
+
+from flask import Blueprint, current_app, request, flash
 from flask_login import login_user, logout_user, login_required, current_user
-from app.utils._password_utils import check_password
+from pymongo.errors import DuplicateKeyError
 from app.utils.mongo_user import MongoUser
+from app.utils.password_hasher import HasherBusy
 
-from app import create_app
 
 auth = Blueprint("auth", __name__)
 
@@ -20,9 +22,15 @@ def login():
     if not username_email or not password:
         return {"error": "Missing username/email or password"}, 400
 
+    # Reject throttled accounts/IPs before any lookup or hashing
+    throttle = current_app.login_throttle
+    retry_after = throttle.retry_after(username_email, request.remote_addr)
+    if retry_after:
+        return too_many_attempts(retry_after)
+
     # Access the mongo instance
-    app = create_app()
-    user_doc = app.mongo.users.find_one(
+    mongo = current_app.mongo
+    user_doc = mongo.users.find_one(
         {
             "$or": [
                 {"_id": username_email},  # if you store username in _id
@@ -32,14 +40,28 @@ def login():
     )
 
     if not user_doc:
+        throttle.record(username_email, request.remote_addr, success=False)
         flash("Please check your login details and try again.")
         return {"error": "Invalid credentials"}, 401
 
     stored_password = user_doc["password"]
-    if not check_password(stored_password, password):
+    try:
+        matched, new_hash = current_app.password_hasher.check(stored_password, password)
+    except HasherBusy:
+        return server_busy()
+    throttle.record(username_email, request.remote_addr, success=matched)
+    if not matched:
         flash("Invalid password.")
         return {"error": "Invalid credentials"}, 401
 
+    # Legacy or outdated hash: store it again at the current cost. Conditional on
+    # the old hash, so a concurrent password change is not overwritten.
+    if new_hash:
+        mongo.users.update_one(
+            {"_id": user_doc["_id"], "password": stored_password},
+            {"$set": {"password": new_hash}},
+        )
+
     # If okay, create a MongoUser object
     user_obj = MongoUser(user_doc)
     login_user(user_obj, remember=True)
@@ -58,25 +80,56 @@ def signup():
     if not username or not email or not password:
         return {"error": "Missing username, email, or password"}, 400
 
+    retry_after = current_app.login_throttle.retry_after(None, request.remote_addr)
+    if retry_after:
+        return too_many_attempts(retry_after)
+
     # Access the mongo instance
-    app = create_app()
+    mongo = current_app.mongo
 
     # Check if user or email exist
     # We assume _id is the username
-    existing_user = app.mongo.users.find_one({"_id": username})
-    existing_email = app.mongo.users.find_one({"email": email})
+    existing_user = mongo.users.find_one({"_id": username})
+    existing_email = mongo.users.find_one({"email": email})
 
     if existing_user:
         return {"error": "Username already exists"}, 400
     if existing_email:
         return {"error": "Email already exists"}, 400
 
-    app.mongo.upsert_user(
-        username=username, name=nickname, email=email, password=password
-    )
+    try:
+        password_hash = current_app.password_hasher.hash(password)
+    except HasherBusy:
+        return server_busy()
+
+    # the checks above are only a fast path: a concurrent signup for the same
+    # username or email can still win the race, and then the insert fails
+    try:
+        mongo.create_user(
+            username=username,
+            name=nickname,
+            email=email,
+            password_hash=password_hash,
+        )
+    except DuplicateKeyError as e:
+        if mongo.duplicate_user_field(e) == "email":
+            return {"error": "Email already exists"}, 400
+        return {"error": "Username already exists"}, 400
     return {"success": True, "message": "User registered successfully"}
 
 
+def too_many_attempts(retry_after: float):
+    return (
+        {"error": "Too many attempts, try again later"},
+        429,
+        {"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+def server_busy():
+    return {"error": "Server busy, try again shortly"}, 503, {"Retry-After": "1"}
+
+
 @auth.route("/logout", methods=["POST"])
 @login_required
 def logout():
@@ -87,11 +140,11 @@ def logout():
 @auth.route("/delete_user/<username>", methods=["DELETE"])
 @login_required
 def delete_user(username):
-    app = create_app()
+    mongo = current_app.mongo
 
     # If the current user is the one being deleted
     if current_user.id == username:
-        app.mongo.users.delete_one({"_id": username})
+        mongo.delete_user(username)
         logout_user()
         return {"success": True, "message": "User deleted and logged out"}
     else:
@@ -1,9 +1,10 @@
 # backend/app/routes/banks.py
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_login import login_required, current_user
-from app import create_app
 from app.utils.bank_auth.gocardless_api import ApiClient
+from app.utils.bank_import import import_accounts
+import datetime as dt
 import os
 from dotenv import load_dotenv
 
@@ -28,8 +29,8 @@ def link_bank():
     access_valid_for_days = data.get("access_valid_for_days", "180")
     access_scope = data.get("access_scope", ["balances", "transactions", "details"])
 
-    app = create_app()
-    user_doc = app.mongo.users.find_one({"_id": current_user.id})
+    mongo = current_app.mongo
+    user_doc = mongo.users.find_one({"_id": current_user.id})
     if not user_doc:
         return jsonify({"error": "User not found"}), 404
 
@@ -50,7 +51,7 @@ def link_bank():
         access_scope=access_scope,
     )
     # store it in user doc
-    app.mongo.users.update_one(
+    mongo.users.update_one(
         {"_id": current_user.id}, {"$set": {"gocardless_agreement": agreement_resp}}
     )
 
@@ -62,7 +63,7 @@ def link_bank():
         user_language="EN",
     )
     # store it
-    app.mongo.users.update_one(
+    mongo.users.update_one(
         {"_id": current_user.id}, {"$set": {"gocardless_requisition": link_resp}}
     )
 
@@ -73,19 +74,31 @@ def link_bank():
 @login_required
 def import_transactions():
     """
-    Called from the ImportTransactionsModal. We read date_from, date_to,
-    then call get_transactions on the user's linked account, storing them in DB.
+    Called from the ImportTransactionsModal. We read date_from, date_to and optionally
+    account_ids (defaults to every linked account), then queue a background job that
+    imports the accounts concurrently. Returns the job id right away; progress and the
+    per-account results are reported by /banks/jobs/<job_id>.
+
+    With mode="incremental" each account is only fetched from its last booked date
+    (minus BANK_SYNC_OVERLAP_DAYS) up to today; date_from/date_to are then optional
+    and only used for accounts that were never synced.
     """
     data = request.get_json() or {}
+    incremental = data.get("mode", "full") == "incremental"
     date_from = data.get("date_from")
     date_to = data.get("date_to")
+    if incremental and not date_from:
+        today = dt.date.today()
+        initial_days = current_app.config["BANK_SYNC_INITIAL_DAYS"]
+        date_from = (today - dt.timedelta(days=initial_days)).isoformat()
+        date_to = date_to or today.isoformat()
     if not date_from or not date_to:
         return jsonify({"error": "Missing date_from or date_to"}), 400
 
-    app = create_app()
+    mongo = current_app.mongo
 
     # get user doc
-    user_doc = app.mongo.users.find_one({"_id": current_user.id})
+    user_doc = mongo.users.find_one({"_id": current_user.id})
     if not user_doc:
         return jsonify({"error": "User not found"}), 404
 
@@ -95,38 +108,44 @@ def import_transactions():
     if not accounts:
         return jsonify({"error": "No linked bank accounts"}), 400
 
-    account_id = accounts[0]  # or let user pick which account from your front end
+    account_ids = data.get("account_ids") or accounts
+    unknown = [account_id for account_id in account_ids if account_id not in accounts]
+    if unknown:
+        return jsonify({"error": f"Accounts not linked: {', '.join(unknown)}"}), 400
 
-    # create client
-    access_token = os.environ.get("GOCARDLESS_ACCESS_TOKEN", "")
-    base_url = os.environ.get("GOCARDLESS_BANK_ACCOUNT_INFO_BASE_URL", "")
-
-    client = ApiClient(base_url=base_url, access_token=access_token)
-
-    trans_resp = client.get_transactions(account_id, date_from, date_to)
-    print("Account ID: ", account_id)
-    print("Date From: ", date_from)
-    print("Date To: ", date_to)
-    # print("Transactions ", trans_resp)
-
-    # store each transaction doc in your "transactions" collection, or do further processing
-    # e.g. trans_resp["transactions"]["booked"]
-    booked = trans_resp["transactions"].get("booked", [])
-    pending = trans_resp["transactions"].get("pending", [])
+    job_id = current_app.jobs.submit(
+        "import",
+        current_user.id,
+        {
+            "account_ids": account_ids,
+            "date_from": date_from,
+            "date_to": date_to,
+            "incremental": incremental,
+        },
+    )
+    return jsonify({"success": True, "job_id": job_id}), 202
 
-    # we'll add user_id = current_user.id so we can filter them later
-    for t in booked:
-        t["username"] = current_user.id
-    for t in pending:
-        t["username"] = current_user.id
 
-    # insert in your DB
-    if booked:
-        app.mongo.upsert_transaction(booked)
-    if pending:
-        app.mongo.upsert_transaction(pending)
+@bank_bp.route("/banks/jobs/<job_id>", methods=["GET"])
+@login_required
+def job_status(job_id):
+    """
+    Reports a background job of the current user.
 
-    return jsonify({"success": True, "imported": len(booked) + len(pending)}), 200
+    Return Example:
+        {
+            "id": "5f0c...", "kind": "import", "status": "running",
+            "progress": {"accounts_done": 1, "accounts_total": 3},
+            "result": None, "error": None, ...
+        }
+    'result' is filled in once status is "done"; 'error' when it is "failed".
+    """
+    job = current_app.jobs.get(job_id, username=current_user.id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    job["id"] = job.pop("_id")
+    job.pop("owner", None)
+    return jsonify(job), 200
 
 
 @bank_bp.route("/callback", methods=["GET"])
@@ -152,13 +171,13 @@ def callback():
             400,
         )
 
-    app = create_app()
+    mongo = current_app.mongo
 
     # 2. Check if user is logged in or how you track user.
     #    Sometimes the callback might not have a session, so you might store the requisition_id in the user's doc earlier.
     #    For demonstration, let's assume you can find the user doc by searching for gocardless_requisition.id == requisition_id
     #    or you do an open callback without login_required.
-    user_doc = app.mongo.users.find_one({"gocardless_requisition.id": requisition_id})
+    user_doc = mongo.users.find_one({"gocardless_requisition.id": requisition_id})
     if not user_doc:
         # no user doc found with that requisition
         return (
@@ -173,7 +192,7 @@ def callback():
             404,
         )
 
-    # 3. Build the client with your stored or global access token
+    # 3. Make sure a client can be built with your stored or global access token
     access_token = os.environ.get("GOCARDLESS_ACCESS_TOKEN", "")
     base_url = os.environ.get("GOCARDLESS_BANK_ACCOUNT_INFO_BASE_URL", "")
     if not access_token or not base_url:
@@ -189,20 +208,8 @@ def callback():
             500,
         )
 
-    client = ApiClient(base_url=base_url, access_token=access_token)
-
-    # 4. List accounts for that requisition
-    #    e.g. client.list_accounts(path="requisitions/", requisition_id=requisition_id)
-    accounts_resp = client.list_accounts(
-        path="requisitions/", requisition_id=requisition_id
-    )
-    # Typically returns a structure like { "id": "xxxx", "accounts": [...] } or so
-    # or maybe { "results": [...] }. Adjust as needed
-    print(f"Accounts for requisition {requisition_id}:", accounts_resp)
-
-    # 6. If you need the agreement_id from either your user doc or from accounts_resp
+    # 4. If you need the agreement_id from either your user doc or from accounts_resp
     #    Let's say your user doc has the 'gocardless_requisition.agreement'
-    #    or we do a quick get: agreement_id = user_doc["gocardless_requisition"]["agreement"]
     agreement_id = user_doc.get("gocardless_requisition", {}).get("agreement")
     if not agreement_id:
         return (
@@ -217,23 +224,15 @@ def callback():
             400,
         )
 
-    agreement_resp = client.get_agreement(
-        path="agreements/enduser", agreement_id=agreement_id
+    # 5. List accounts + get the agreement in the background (see run_refresh_link_job)
+    job_id = current_app.jobs.submit(
+        "refresh_link",
+        user_doc["_id"],
+        {"requisition_id": requisition_id, "agreement_id": agreement_id},
     )
-    print("Updated End User Agreement:", agreement_resp)
 
-    update_data = {
-        "gocardless_requisition": accounts_resp,
-        "gocardless_agreement": agreement_resp,
-    }
-    app.mongo.users.update_one({"_id": user_doc["_id"]}, {"$set": update_data})
-
-    # 9. Show a success message or redirect to your front end
-    return jsonify(
-        {
-            "success": True,
-        }
-    ), 200
+    # 6. Show a success message or redirect to your front end
+    return jsonify({"success": True, "job_id": job_id}), 202
 
 
 @bank_bp.route("/banks/refresh_link", methods=["POST"])
@@ -246,8 +245,8 @@ def refresh_link_account():
     Then updates user doc with new data.
     For example, a "Refresh Link Status" button can call this route.
     """
-    app = create_app()
-    user_doc = app.mongo.users.find_one({"_id": current_user.id})
+    mongo = current_app.mongo
+    user_doc = mongo.users.find_one({"_id": current_user.id})
     if not user_doc:
         return jsonify({"error": "User not found"}), 404
 
@@ -271,15 +270,83 @@ def refresh_link_account():
             {"error": "Missing GOCARDLESS_ACCESS_TOKEN or base_url in env"}
         ), 500
 
-    client = ApiClient(base_url=base_url, access_token=access_token)
+    # List accounts + get the agreement in the background (see run_refresh_link_job)
+    job_id = current_app.jobs.submit(
+        "refresh_link",
+        current_user.id,
+        {"requisition_id": requisition_id, "agreement_id": agreement_id},
+    )
+    return jsonify({"success": True, "job_id": job_id}), 202
+
+
+def gocardless_client() -> ApiClient:
+    access_token = os.environ.get("GOCARDLESS_ACCESS_TOKEN", "")
+    base_url = os.environ.get("GOCARDLESS_BANK_ACCOUNT_INFO_BASE_URL", "")
+    return ApiClient(base_url=base_url, access_token=access_token)
+
+
+def run_import_job(job: dict, progress) -> dict:
+    """JobQueue handler for "import" jobs queued by /banks/import."""
+    mongo = current_app.mongo
+    params = job["params"]
+    user_doc = mongo.users.find_one({"_id": job["username"]}, {"gocardless_sync": 1})
+    if not user_doc:
+        raise ValueError(f"User {job['username']} not found")
+
+    account_ids = params["account_ids"]
+    done = []
+    progress(accounts_done=0, accounts_total=len(account_ids))
+
+    def on_account_done(account_id, result):
+        done.append(account_id)
+        progress(accounts_done=len(done), **{f"accounts.{account_id}": result["success"]})
+
+    client = gocardless_client()
+    results = import_accounts(
+        client,
+        mongo,
+        job["username"],
+        account_ids,
+        params["date_from"],
+        params["date_to"],
+        max_workers=current_app.config["BANK_IMPORT_MAX_WORKERS"],
+        sync_states=user_doc.get("gocardless_sync", {}),
+        incremental=params.get("incremental", False),
+        overlap_days=current_app.config["BANK_SYNC_OVERLAP_DAYS"],
+        on_account_done=on_account_done,
+        batch_size=current_app.config["BANK_IMPORT_BATCH_SIZE"],
+    )
+    succeeded = [r for r in results.values() if r["success"]]
+    if not succeeded:
+        raise RuntimeError(
+            "; ".join(f"{account_id}: {r['error']}" for account_id, r in results.items())
+        )
+    return {
+        "success": len(succeeded) == len(results),
+        "imported": sum(r["inserted"] + r["modified"] for r in succeeded),
+        "accounts": results,
+        "throttled_seconds": round(client.throttled_seconds, 3),
+    }
+
+
+def run_refresh_link_job(job: dict, progress) -> dict:
+    """
+    JobQueue handler for "refresh_link" jobs (from /callback and /banks/refresh_link):
+      1) list_accounts with the stored requisition_id
+      2) get_agreement with the stored agreement_id
+    Then updates user doc with new data.
+    """
+    params = job["params"]
+    client = gocardless_client()
 
     # 1) List accounts with requisition_id
     accounts_resp = client.list_accounts(
-        path="requisitions/", requisition_id=requisition_id
+        path="requisitions/", requisition_id=params["requisition_id"]
     )
+    progress(step="accounts")
     # 2) Get updated agreement data
     agreement_resp = client.get_agreement(
-        path="agreements/enduser", agreement_id=agreement_id
+        path="agreements/enduser", agreement_id=params["agreement_id"]
     )
 
     # 3) Update the user doc
@@ -287,8 +354,11 @@ def refresh_link_account():
         "gocardless_requisition": accounts_resp,  # or merge with existing if you prefer
         "gocardless_agreement": agreement_resp,
     }
-    app.mongo.users.update_one({"_id": current_user.id}, {"$set": update_data})
+    current_app.mongo.users.update_one({"_id": job["username"]}, {"$set": update_data})
+    return {"success": True, "accounts": accounts_resp, "agreement": agreement_resp}
+
 
-    return jsonify(
-        {"success": True, "accounts": accounts_resp, "agreement": agreement_resp}
-    ), 200
+@bank_bp.record_once
+def register_jobs(state):
+    state.app.jobs.register("import", run_import_job)
+    state.app.jobs.register("refresh_link", run_refresh_link_job)
@@ -1,12 +1,18 @@
 # backend/app/routes/expenses.py
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_login import login_required, current_user
 from urllib.parse import unquote
 from datetime import datetime
-from app import create_app
 import json
 
+from app.utils.statement_import import (
+    FORMATS,
+    StatementError,
+    detect_format,
+    import_statement,
+)
+
 expenses = Blueprint("expenses", __name__)
 
 
@@ -18,6 +24,219 @@ def add_expense():
     """
     data = request.get_json() or request.form
 
+    # Basic validation: some fields might be required
+    if not data.get("username") or not data.get("transactionType") or not data.get("amount"):
+        return jsonify(
+            {"error": "Missing required fields (username, transactionType, amount)"}
+        ), 400
+
+    new_transaction_doc, error = new_expense_doc(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Validated as a GoCardlessTransaction, inserted and added to its monthly rollup
+    [result] = current_app.mongo.apply_transaction_operations(
+        current_user.id, [{"op": "create", "doc": new_transaction_doc}]
+    )
+    if result["status"] != "created":
+        return operation_error(result)
+
+    return jsonify({"success": True, "inserted_id": result["id"]}), 200
+
+
+@expenses.route("/edit_expense/<expense_id>", methods=["POST"])
+@login_required
+def edit_expense(expense_id):
+    """
+    Updates an existing transaction in MongoDB: sets fields from the
+    GoCardlessTransaction structure on the current user's transaction with
+    _id = expense_id, if the result is still a valid transaction (see
+    ExpenseTrackerWebAppDB.update_transaction).
+    """
+    data = request.get_json() or request.form
+
+    update_fields, error = expense_update_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    result = current_app.mongo.update_transaction(expense_id, update_fields, current_user.id)
+    if result["status"] != "updated":
+        return operation_error(result)
+
+    return jsonify({"success": True}), 200
+
+
+def operation_error(result: dict):
+    """
+    The error response for a failed update_transaction result, or a failed
+    single-operation apply_transaction_operations result.
+    """
+    status = result["status"]
+    if status == "invalid":
+        return jsonify({"error": f"Invalid transaction: {result['error']}"}), 400
+    if status == "not_found":
+        return jsonify({"error": "Transaction not found"}), 404
+    if status == "forbidden":
+        return jsonify({"error": "Unauthorized"}), 403
+    if status == "conflict":
+        return jsonify({"error": "Transaction was changed by another request, try again"}), 409
+    return jsonify({"error": result.get("error") or "Write failed"}), 500
+
+
+@expenses.route("/expenses/batch", methods=["POST"])
+@login_required
+def batch_expenses():
+    """
+    Creates, updates and deletes many of the current user's transactions at once,
+    applied with a single unordered bulk_write (see
+    ExpenseTrackerWebAppDB.apply_transaction_operations). Every operation is
+    validated first; invalid ones are reported and skipped, the rest still apply.
+
+    Body:
+        {"operations": [
+            {"op": "create", "fields": {...}},               # fields as for /add_expense
+            {"op": "update", "id": "65f1...", "fields": {...}},  # fields as for /edit_expense
+            {"op": "delete", "id": "65f2..."}
+        ]}
+
+    Return Example:
+        {"results": [{"status": "created", "id": "65f3..."},
+                     {"status": "invalid", "error": "Invalid amount value"},
+                     {"status": "deleted", "id": "65f2..."}],
+         "counts": {"created": 1, "invalid": 1, "deleted": 1}}
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations") if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "Expected a non-empty 'operations' list"}), 400
+    max_operations = current_app.config["EXPENSES_BATCH_MAX_OPERATIONS"]
+    if len(operations) > max_operations:
+        return jsonify({"error": f"At most {max_operations} operations per batch"}), 400
+
+    results = [None] * len(operations)
+    valid, valid_indexes, seen_ids = [], [], set()
+    for i, operation in enumerate(operations):
+        parsed, error = parse_batch_operation(operation)
+        if error is None and parsed["op"] != "create":
+            if parsed["id"] in seen_ids:
+                error = f"Transaction {parsed['id']} appears more than once in the batch"
+            seen_ids.add(parsed["id"])
+        if error:
+            results[i] = {"status": "invalid", "error": error}
+            continue
+        valid.append(parsed)
+        valid_indexes.append(i)
+
+    if valid:
+        applied = current_app.mongo.apply_transaction_operations(current_user.id, valid)
+        for i, result in zip(valid_indexes, applied):
+            results[i] = result
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return jsonify({"results": results, "counts": counts}), 200
+
+
+@expenses.route("/expenses/import", methods=["POST"])
+@login_required
+def import_statement_file():
+    """
+    Imports a bank statement file (multipart field "file") into the current user's
+    transactions. The file is parsed as it is read and written in bounded batches
+    (app/utils/statement_import.py); re-uploading it changes nothing.
+
+    Form fields (all optional):
+        format: "csv", "ofx" or "camt053" (default: from the file name/content)
+        account: label for the statement's account, namespaces its references
+        CSV only:
+            mapping: JSON {field: column header}, see DEFAULT_CSV_MAPPING
+            delimiter (","), date_format ("%Y-%m-%d"), decimal ("." or ","),
+            currency ("EUR", for files without a currency column)
+
+    Return Example:
+        {"format": "csv", "rows": 120000, "inserted": 119990, "modified": 0,
+         "unchanged": 0, "rejected": 10, "errors": [{"row": 57, "error": "..."}],
+         "elapsed_seconds": 4.1, "rows_per_second": 29268.3}
+    """
+    max_bytes = current_app.config["STATEMENT_IMPORT_MAX_BYTES"]
+    if request.content_length and request.content_length > max_bytes:
+        return jsonify({"error": f"Statement files are limited to {max_bytes} bytes"}), 413
+    upload = request.files.get("file")
+    if upload is None:
+        return jsonify({"error": "Missing statement file (field 'file')"}), 400
+
+    form = request.form
+    head = upload.stream.read(2048)
+    upload.stream.seek(0)
+    fmt = form.get("format") or detect_format(upload.filename, head)
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Unknown format {fmt!r}, expected one of {list(FORMATS)}"}), 400
+
+    options = {}
+    if fmt == "csv":
+        if form.get("mapping"):
+            try:
+                options["mapping"] = json.loads(form["mapping"])
+            except ValueError:
+                return jsonify({"error": "Invalid mapping (expected a JSON object)"}), 400
+            if not isinstance(options["mapping"], dict):
+                return jsonify({"error": "Invalid mapping (expected a JSON object)"}), 400
+        for option in ("delimiter", "date_format", "decimal", "currency"):
+            if form.get(option):
+                options[option] = form[option]
+
+    try:
+        report = import_statement(
+            current_app.mongo,
+            current_user.id,
+            upload.stream,
+            fmt,
+            batch_size=current_app.config["STATEMENT_IMPORT_BATCH_SIZE"],
+            account=form.get("account", ""),
+            **options,
+        )
+    except StatementError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(report), 200
+
+
+def parse_batch_operation(operation) -> tuple:
+    """
+    One /expenses/batch operation in the shape apply_transaction_operations takes.
+    Returns (operation, None), or (None, error message).
+    """
+    if not isinstance(operation, dict):
+        return None, "Operation must be an object"
+    kind = operation.get("op")
+    fields = operation.get("fields") or {}
+    if not isinstance(fields, dict):
+        return None, "'fields' must be an object"
+
+    if kind == "create":
+        if not fields.get("transactionType") or not fields.get("amount"):
+            return None, "Missing required fields (transactionType, amount)"
+        doc, error = new_expense_doc(fields)
+        return (None, error) if error else ({"op": "create", "doc": doc}, None)
+
+    if kind not in ("update", "delete"):
+        return None, "'op' must be one of create, update, delete"
+    expense_id = operation.get("id")
+    if not isinstance(expense_id, str) or not expense_id:
+        return None, f"Missing transaction 'id' for {kind}"
+    if kind == "delete":
+        return {"op": "delete", "id": expense_id}, None
+    update_fields, error = expense_update_fields(fields)
+    if error:
+        return None, error
+    return {"op": "update", "id": expense_id, "fields": update_fields}, None
+
+
+def new_expense_doc(data) -> tuple:
+    """
+    The GoCardlessTransaction fields of a new transaction from an /add_expense body
+    (without username and createdAt). Returns (doc, None), or (None, error message).
+    """
     # Extract fields from the request, mapping them to GoCardlessTransaction
     transaction_id = data.get("transactionId")
     end_to_end_id = data.get("endToEndId")
@@ -34,34 +253,25 @@ def add_expense():
     transaction_type = data.get("transactionType")  # "expense" or "income"
     category = data.get("category")
     sub_category = data.get("sub_category")
-    username = data.get("username")
-
-    # Basic validation: some fields might be required
-    if not username or not transaction_type or not amount_str:
-        return jsonify(
-            {"error": "Missing required fields (username, transactionType, amount)"}
-        ), 400
 
     # Convert amount to float
     try:
         amount_val = float(amount_str)
-    except ValueError:
-        return jsonify({"error": "Invalid amount value"}), 400
+    except (TypeError, ValueError):
+        return None, "Invalid amount value"
 
     # Convert bookingDate to a valid date if provided
     parsed_date_str = None
     if booking_date:
         try:
             # Validate date format "YYYY-MM-DD"
-            dt_obj = datetime.strptime(booking_date, "%Y-%m-%d")
-            parsed_date_str = booking_date  # store as string if you like, or dt_obj if you want a real date
-        except ValueError:
-            return jsonify(
-                {"error": "Invalid bookingDate format (expected YYYY-MM-DD)"}
-            ), 400
+            datetime.strptime(booking_date, "%Y-%m-%d")
+            parsed_date_str = booking_date  # stored as "YYYY-MM-DD"
+        except (TypeError, ValueError):
+            return None, "Invalid bookingDate format (expected YYYY-MM-DD)"
 
     # Build the Mongo doc
-    new_transaction_doc = {
+    return {
         "transactionId": transaction_id,
         "endToEndId": end_to_end_id,
         "bookingDate": parsed_date_str,
@@ -76,36 +286,14 @@ def add_expense():
         "transactionType": transaction_type,  # "expense" or "income"
         "category": category,
         "sub_category": sub_category,
-        "username": current_user.id,
-        "createdAt": datetime.now(),
-    }
+    }, None
 
-    app = create_app()
-    # Insert into the 'Transactions' collection
-    inserted = app.mongo.transactions.insert_one(new_transaction_doc)
-    print("New Transaction Inserted:")
-    print(json.dumps(new_transaction_doc, indent=2, default=str))
 
-    return jsonify({"success": True, "inserted_id": str(inserted.inserted_id)}), 200
-
-
-@expenses.route("/edit_expense/<expense_id>", methods=["POST"])
-@login_required
-def edit_expense(expense_id):
+def expense_update_fields(data) -> tuple:
     """
-    Updates an existing transaction in MongoDB. We find by _id = expense_id,
-    then set fields from the GoCardlessTransaction structure.
+    The fields an /edit_expense body sets (only those present in it).
+    Returns (fields, None), or (None, error message).
     """
-    app = create_app()
-    existing_doc = app.mongo.transactions.find_one({"_id": expense_id})
-    if not existing_doc:
-        return jsonify({"error": "Transaction not found"}), 404
-    # Check ownership
-    if existing_doc.get("user_id") != current_user.id:
-        return jsonify({"error": "Unauthorized"}), 403
-
-    data = request.get_json() or request.form
-
     # Extract the same fields as in add_expense
     transaction_id = data.get("transactionId")
     end_to_end_id = data.get("endToEndId")
@@ -122,7 +310,6 @@ def edit_expense(expense_id):
     transaction_type = data.get("transactionType")
     category = data.get("category")
     sub_category = data.get("sub_category")
-    username = current_user.id
 
     update_fields = {}
     # Convert if present
@@ -134,8 +321,8 @@ def edit_expense(expense_id):
         try:
             datetime.strptime(booking_date, "%Y-%m-%d")  # Validate format
             update_fields["bookingDate"] = booking_date
-        except ValueError:
-            return jsonify({"error": "Invalid bookingDate format"}), 400
+        except (TypeError, ValueError):
+            return None, "Invalid bookingDate format"
     if amount_str:
         try:
             amt_val = float(amount_str)
@@ -143,8 +330,8 @@ def edit_expense(expense_id):
                 "amount": amt_val,
                 "currency": currency,
             }
-        except ValueError:
-            return jsonify({"error": "Invalid amount value"}), 400
+        except (TypeError, ValueError):
+            return None, "Invalid amount value"
     if debtor_name is not None:
         update_fields["debtorName"] = debtor_name
     if debtor_iban is not None:
@@ -165,46 +352,43 @@ def edit_expense(expense_id):
         update_fields["category"] = category
     if sub_category is not None:
         update_fields["sub_category"] = sub_category
-    if username is not None:
-        update_fields["username"] = username
-
-    # Last modified
-    update_fields["updatedAt"] = datetime.utcnow()
-
-    app.mongo.transactions.update_one({"_id": expense_id}, {"$set": update_fields})
-
-    print(f"Transaction {expense_id} updated with:")
-    print(json.dumps(update_fields, indent=2, default=str))
-
-    return jsonify({"success": True}), 200
+    return update_fields, None
 
 
 @expenses.route("/delete_expense/<expense_id>", methods=["DELETE"])
 @login_required
 def delete_expense(expense_id):
     """
-    Deletes a transaction doc from Mongo by _id, checking ownership.
+    Deletes a transaction doc from Mongo by _id, checking ownership in the same
+    atomic delete.
     """
-    app = create_app()
-    expense_doc = app.mongo.transactions.find_one({"_id": expense_id})
-    if not expense_doc:
-        return jsonify({"error": "Transaction not found"}), 404
-    if expense_doc.get("username") != current_user.id:
-        return jsonify({"error": "Unauthorized"}), 403
-
-    app.mongo.transactions.delete_one({"_id": expense_id})
+    mongo = current_app.mongo
+    if mongo.delete_transaction(expense_id, username=current_user.id) is None:
+        return expense_not_matched(expense_id)
     return jsonify({"success": True}), 200
 
 
+def expense_not_matched(expense_id):
+    """
+    404 or 403 after an edit/delete filtered on {_id, username} matched nothing.
+    Only this failure path pays the extra lookup of the transaction's owner.
+    """
+    if current_app.mongo.transaction_owner(expense_id) is None:
+        return jsonify({"error": "Transaction not found"}), 404
+    return jsonify({"error": "Unauthorized"}), 403
+
+
 @expenses.route("/all_categories", methods=["GET"])
 def get_categories():
-    app = create_app()
-    categories = list(app.mongo.categories.find())
-
-    if not categories:
+    """
+    Every category with its sub categories. Served from the in-process taxonomy
+    cache (ExpenseTrackerWebAppDB.category_taxonomy), with an ETag and a max-age
+    so browsers reuse it when the expense modals open.
+    """
+    taxonomy = current_app.mongo.category_taxonomy()
+    if not taxonomy["categories"]:
         return jsonify({"error": "No categories found"}), 404
-
-    return jsonify(categories), 200
+    return taxonomy_response(taxonomy, taxonomy["categories"])
 
 
 @expenses.route("/get_subcategories/<category>", methods=["GET"])
@@ -214,8 +398,22 @@ def get_subcategories(category):
     where doc._id = category, doc.subCategories = [...]
     """
     cat = unquote(category)
-    app = create_app()
-    cat_doc = app.mongo.categories.find_one({"_id": cat})
-    if not cat_doc:
-        return jsonify([])
-    return jsonify(cat_doc.get("subCategories", []))
+    taxonomy = current_app.mongo.category_taxonomy()
+    return taxonomy_response(taxonomy, taxonomy["subcategories"].get(cat, []))
+
+
+def taxonomy_response(taxonomy: dict, payload):
+    """
+    'payload' as JSON, or a 304 if the client's If-None-Match has the taxonomy's
+    ETag (the ETag only ever gets compared for the same URL, so one per taxonomy
+    version is enough).
+    """
+    etag = taxonomy["etag"]
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max(int(current_app.config["CATEGORIES_CACHE_TTL_SECONDS"]), 0)
+    return response
@@ -1,12 +1,17 @@
 # backend/app/routes/main.py
 
-from flask import Blueprint, jsonify
+import hashlib
+
+from flask import Blueprint, current_app, jsonify, request
 from flask_login import login_required, current_user
-from datetime import datetime
-from app import create_app
-from collections import defaultdict
-from app.models.transactions import GoCardlessTransaction
-from pydantic import ValidationError
+from app.models.transactions import validate_transactions
+from app.utils.chart_builder import build_chart_data, chart_data_from_rows
+from app.utils.mongodb_connector import (
+    FRONTEND_PROJECTION,
+    batched,
+    decode_cursor,
+    encode_cursor,
+)
 
 main = Blueprint("main", __name__)
 
@@ -16,131 +21,237 @@ main = Blueprint("main", __name__)
 def dashboard():
     """
     Returns JSON data for the authenticated user's transactions (GoCardlessTransaction),
-    plus chart usage.
+    plus chart usage. Only the first page of transactions is returned (newest first);
+    the rest can be fetched from /transactions with the returned next_cursor.
+
+    The payload only changes when the user's data version does (every add, edit,
+    delete and import bumps it), so it is cached per version and sent with an ETag:
+    a repeat visit costs one version lookup, and a 304 if the client still has it.
     """
-    app = create_app()
     user_id = current_user.id
-    print(user_id)
-    # Query all transactions for this user.
-    # If your doc references user by e.g. "debtorName == user_id", adapt as needed:
-    docs = list(app.mongo.transactions.find({"username": user_id}))
-
-    if not docs:
-        return jsonify(
-            {
-                "user": {"id": user_id},
-                "transactions": [],
-                "chart_data": {
-                    "categories": [],
-                    "amounts": [],
-                    "dates": [],
-                    "categoryData": [],
-                },
-            }
-        ), 200
+    etag = dashboard_etag(user_id, current_app.mongo.data_version(user_id))
 
-    # Convert each doc to a Python dict that includes the fields from GoCardlessTransaction
-    transactions_for_frontend = []
-    for doc in docs:
-        try:
-            # Validate doc with GoCardlessTransaction
-            gtxn = GoCardlessTransaction(**doc)
-        except ValidationError:
-            # skip or handle
-            continue
-
-        # Format bookingDate if it's a datetime
-        booked_str = ""
-        if gtxn.bookingDate:
-            booked_str = gtxn.bookingDate.strftime("%Y-%m-%d")
-
-        # Build a dictionary for front end usage
-        # e.g. "amount" is from gtxn.transactionAmount.amount
-        txn_dict = {
-            "id": str(gtxn.id) if gtxn.id else "",
-            "transactionId": gtxn.transactionId,
-            "endToEndId": gtxn.endToEndId,
-            "bookingDate": booked_str,  # or None if pending
-            "amount": gtxn.transactionAmount.amount,
-            "currency": gtxn.transactionAmount.currency,
-            "debtorName": gtxn.debtorName,
-            "debtorAccount": gtxn.debtorAccount.model_dump()
-            if gtxn.debtorAccount
-            else None,
-            "creditorName": gtxn.creditorName,
-            "creditorAccount": gtxn.creditorAccount.model_dump()
-            if gtxn.creditorAccount
-            else None,
-            "remittanceInformationUnstructured": gtxn.remittanceInformationUnstructured,
-            "proprietaryBankTransactionCode": gtxn.proprietaryBankTransactionCode,
-            "internalTransactionId": gtxn.internalTransactionId,
-            "transactionType": gtxn.transactionType,
-            "category": gtxn.category or "Uncategorized",
-            "sub_category": gtxn.sub_category or "",
-        }
-        transactions_for_frontend.append(txn_dict)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        cache = current_app.dashboard_cache
+        body = cache.get(etag) if cache is not None else None
+        if body is None:
+            body = current_app.json.dumps(dashboard_payload(user_id))
+            if cache is not None:
+                cache.set(etag, body)
+        response = current_app.response_class(body, mimetype=current_app.json.mimetype)
 
-    # Group for charting by month-year + category, using transactionType=expense as example
-    expenses_by_month_category = defaultdict(lambda: defaultdict(list))
+    response.set_etag(etag)
+    # the browser may keep it, but has to revalidate with If-None-Match every time
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
-    for txn in transactions_for_frontend:
-        # parse bookingDate
-        date_str = txn["bookingDate"]
-        if not date_str:
-            # If no bookingDate => consider pending or ignore
-            date_str = "Pending"
 
-        try:
-            dt_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            month_year = dt_obj.strftime("%B %Y")
-        except ValueError:
-            month_year = date_str  # "Pending" or "Unknown"
-
-        cat = txn["category"]
-        expenses_by_month_category[month_year][cat].append(txn)
-
-    # Unique categories
-    all_categories = set(txn["category"] for txn in transactions_for_frontend)
-    unique_categories = sorted(all_categories)
-
-    # For a simple "pie chart" style: sum amounts for transactionType=expense by category
-    categories_list = list(unique_categories)
-    amounts_list = []
-    for cat in categories_list:
-        total_for_cat = 0.0
-        for txn in transactions_for_frontend:
-            if txn["category"] == cat and txn["transactionType"] == "expense":
-                total_for_cat += float(txn["amount"])
-        amounts_list.append(total_for_cat)
-
-    # Build stacked bar style data
-    dates_list = sorted(expenses_by_month_category.keys())
-    categoryData = []
-    for cat in categories_list:
-        dataset_values = []
-        for d in dates_list:
-            cat_sum = 0.0
-            if cat in expenses_by_month_category[d]:
-                for txn in expenses_by_month_category[d][cat]:
-                    if txn["transactionType"] == "expense":
-                        cat_sum += float(txn["amount"])
-            dataset_values.append(cat_sum)
-        dataset = {
-            "label": cat,
-            "data": dataset_values,
-            "backgroundColor": "rgba(255, 99, 132, 0.2)",
-        }
-        categoryData.append(dataset)
+def dashboard_etag(user_id: str, version: int) -> str:
+    """Identifies a /dashboard payload: the user, their data version and the config it depends on."""
+    config = current_app.config
+    key = (
+        f"{user_id}:{version}:{config['DASHBOARD_CHART_SOURCE']}:"
+        f"{config['DASHBOARD_PAGE_SIZE']}:{config['AUDIT_TRANSACTION_READS']}"
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def dashboard_payload(user_id: str) -> dict:
+    mongo = current_app.mongo
+
+    docs, next_cursor = mongo.find_transactions_page(
+        user_id, limit=current_app.config["DASHBOARD_PAGE_SIZE"], projection=read_projection()
+    )
+    transactions_for_frontend = read_transactions(docs)
 
+    # By default chart data is read from the MonthlyRollups collection, so it costs
+    # O(months x categories). FLASK_DASHBOARD_CHART_SOURCE=aggregate runs a pipeline
+    # over Transactions instead, and =python builds it from every transaction.
+    chart_source = current_app.config["DASHBOARD_CHART_SOURCE"]
+    if chart_source == "python":
+        chart_data = build_chart_data(
+            read_transactions(
+                mongo.transactions.find({"username": user_id}, read_projection())
+            )
+        )
+    elif chart_source == "aggregate":
+        chart_data = chart_data_from_rows(mongo.aggregate_chart_data(user_id))
+    else:
+        chart_data = chart_data_from_rows(mongo.rollup_chart_rows(user_id))
+
+    return {
+        "user": {"id": user_id},
+        "transactions": transactions_for_frontend,
+        "next_cursor": encode_cursor(next_cursor),
+        "chart_data": chart_data,
+    }
+
+
+@main.route("/transactions", methods=["GET"])
+@login_required
+def list_transactions():
+    """
+    Keyset-paginated transactions of the authenticated user, newest first.
+
+    Query params (all optional):
+        limit: page size (default DASHBOARD_PAGE_SIZE, max MAX_PAGE_SIZE)
+        after: next_cursor returned by the previous page
+        date_from / date_to: "YYYY-MM-DD" bounds on bookingDate (inclusive)
+        category: category name ("Uncategorized" matches transactions without one)
+        transactionType: "expense" or "income"
+
+    Return Example:
+        {"transactions": [...], "next_cursor": "eyJ..."}   # next_cursor is null on the last page
+    """
+    args = request.args
+    try:
+        limit = int(args.get("limit", current_app.config["DASHBOARD_PAGE_SIZE"]))
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1:
+        return jsonify({"error": "Invalid limit"}), 400
+    limit = min(limit, current_app.config["MAX_PAGE_SIZE"])
+
+    try:
+        after = decode_cursor(args["after"]) if args.get("after") else None
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    docs, next_cursor = current_app.mongo.find_transactions_page(
+        current_user.id,
+        limit=limit,
+        after=after,
+        date_from=args.get("date_from"),
+        date_to=args.get("date_to"),
+        category=args.get("category"),
+        transaction_type=args.get("transactionType"),
+        projection=read_projection(),
+    )
     return jsonify(
         {
-            "user": {"id": user_id},
-            "transactions": transactions_for_frontend,
-            "chart_data": {
-                "categories": categories_list,
-                "amounts": amounts_list,
-                "dates": dates_list,
-                "categoryData": categoryData,
-            },
+            "transactions": read_transactions(docs),
+            "next_cursor": encode_cursor(next_cursor),
         }
     ), 200
+
+
+def read_projection():
+    """Fields to load for read_transactions: all of them in audit mode."""
+    if current_app.config["AUDIT_TRANSACTION_READS"]:
+        return None
+    return FRONTEND_PROJECTION
+
+
+def read_transactions(docs) -> list:
+    """
+    Stored transactions in the frontend shape. The write paths validate what they
+    store, so by default docs are mapped straight through
+    (trusted_transactions_to_frontend), leaving out the few that cannot be mapped.
+    With FLASK_AUDIT_TRANSACTION_READS=true every doc is re-validated instead
+    (transactions_to_frontend), and invalid ones are logged and left out.
+    """
+    if current_app.config["AUDIT_TRANSACTION_READS"]:
+        return transactions_to_frontend(docs)
+    return trusted_transactions_to_frontend(docs)
+
+
+def _date_str(value) -> str:
+    if not value:
+        return ""
+    if isinstance(value, str):
+        return value[:10]  # stored as "YYYY-MM-DD"
+    return value.strftime("%Y-%m-%d")  # legacy docs with a datetime
+
+
+def trusted_transactions_to_frontend(docs) -> list:
+    """
+    Maps stored docs (ideally loaded with FRONTEND_PROJECTION) to the same dicts as
+    transactions_to_frontend, without building a GoCardlessTransaction per doc.
+    Docs that cannot be mapped (e.g. written before validation, without a usable
+    transactionAmount) are logged and left out, like on the audit path.
+    """
+    transactions_for_frontend = []
+    for doc in docs:
+        try:
+            transactions_for_frontend.append(
+                {
+                    "id": str(doc["_id"]),
+                    "transactionId": doc.get("transactionId"),
+                    "endToEndId": doc.get("endToEndId"),
+                    "bookingDate": _date_str(doc.get("bookingDate")),
+                    "amount": float(doc["transactionAmount"]["amount"]),
+                    "currency": doc["transactionAmount"]["currency"],
+                    "debtorName": doc.get("debtorName"),
+                    "debtorAccount": doc.get("debtorAccount"),
+                    "creditorName": doc.get("creditorName"),
+                    "creditorAccount": doc.get("creditorAccount"),
+                    "remittanceInformationUnstructured": doc.get(
+                        "remittanceInformationUnstructured"
+                    ),
+                    "proprietaryBankTransactionCode": doc.get("proprietaryBankTransactionCode"),
+                    "internalTransactionId": doc.get("internalTransactionId"),
+                    "transactionType": doc.get("transactionType"),
+                    "category": doc.get("category") or "Uncategorized",
+                    "sub_category": doc.get("sub_category") or "",
+                }
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            current_app.mongo.logger.warning(
+                f"Skipping unreadable transaction {doc.get('_id')}: {type(e).__name__}: {e}"
+            )
+    return transactions_for_frontend
+
+
+def transactions_to_frontend(docs, batch_size: int = 1000) -> list:
+    """
+    Converts stored transaction docs to the flat dicts the frontend uses. Docs are
+    validated as GoCardlessTransaction in batches (validate_transactions); the ones
+    that fail are left out and logged with their errors. This is the audit path of
+    read_transactions.
+    """
+    transactions_for_frontend = []
+    for _, batch in batched(docs, batch_size):
+        models, errors = validate_transactions(batch)
+        for error in errors:
+            current_app.mongo.logger.warning(
+                f"Skipping invalid transaction {batch[error['index']].get('_id')}: "
+                f"{error['error']}"
+            )
+        for gtxn in models:
+            if gtxn is None:
+                continue
+
+            # Format bookingDate if it's a datetime
+            booked_str = ""
+            if gtxn.bookingDate:
+                booked_str = gtxn.bookingDate.strftime("%Y-%m-%d")
+
+            # Build a dictionary for front end usage
+            # e.g. "amount" is from gtxn.transactionAmount.amount
+            txn_dict = {
+                "id": str(gtxn.id) if gtxn.id else "",
+                "transactionId": gtxn.transactionId,
+                "endToEndId": gtxn.endToEndId,
+                "bookingDate": booked_str,  # or None if pending
+                "amount": gtxn.transactionAmount.amount,
+                "currency": gtxn.transactionAmount.currency,
+                "debtorName": gtxn.debtorName,
+                "debtorAccount": gtxn.debtorAccount.model_dump()
+                if gtxn.debtorAccount
+                else None,
+                "creditorName": gtxn.creditorName,
+                "creditorAccount": gtxn.creditorAccount.model_dump()
+                if gtxn.creditorAccount
+                else None,
+                "remittanceInformationUnstructured": gtxn.remittanceInformationUnstructured,
+                "proprietaryBankTransactionCode": gtxn.proprietaryBankTransactionCode,
+                "internalTransactionId": gtxn.internalTransactionId,
+                "transactionType": gtxn.transactionType,
+                "category": gtxn.category or "Uncategorized",
+                "sub_category": gtxn.sub_category or "",
+            }
+            transactions_for_frontend.append(txn_dict)
+    return transactions_for_frontend
@@ -1,36 +1,82 @@
 # backend/app/utils/_password_utils.py
 
 import os
+import base64
 import hashlib
 import binascii
+import hmac
+from typing import Optional, Tuple
 
+# Stored hashes look like "pbkdf2_sha256$<iterations>$<salt b64>$<hash b64>", so the
+# cost can be raised without breaking existing users: every hash is checked with
+# the iterations it was made with, and re-hashed at the current cost on login.
+# Hashes from before the format existed are hex(salt + hash) with LEGACY_ITERATIONS.
+ALGORITHM = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 100000
+LEGACY_ITERATIONS = 100000
+SALT_BYTES = 16
 
-def hash_password(password):
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+
+def _parse(stored_password: str) -> Tuple[int, bytes, bytes]:
+    """(iterations, salt, hash) of a stored hash in either format."""
+    if stored_password.startswith(ALGORITHM + "$"):
+        _, iterations, salt, hashed = stored_password.split("$")
+        return int(iterations), base64.b64decode(salt), base64.b64decode(hashed)
+    raw = binascii.unhexlify(stored_password)
+    return LEGACY_ITERATIONS, raw[:SALT_BYTES], raw[SALT_BYTES:]
+
+
+def hash_password(password, iterations: int = DEFAULT_ITERATIONS):
     # Generate a random salt
-    salt = os.urandom(16)
+    salt = os.urandom(SALT_BYTES)
+
+    hashed_password = _pbkdf2(password, salt, iterations)
 
-    # Use pbkdf2_hmac to hash the password
-    hashed_password = hashlib.pbkdf2_hmac(
-        "sha256", password.encode("utf-8"), salt, 100000
+    return "$".join(
+        (
+            ALGORITHM,
+            str(iterations),
+            base64.b64encode(salt).decode("ascii"),
+            base64.b64encode(hashed_password).decode("ascii"),
+        )
     )
 
-    # Combine the salt and the hashed password
-    stored_password = binascii.hexlify(salt + hashed_password)
 
-    return stored_password.decode("utf-8")
+def check_password(stored_password, provided_password):
+    iterations, salt, stored_hash = _parse(stored_password)
 
+    # Use pbkdf2_hmac to hash the provided password with the stored parameters
+    hashed_password = _pbkdf2(provided_password, salt, iterations)
 
-def check_password(stored_password, provided_password):
-    # Decode the stored password and get the salt
-    salt = binascii.unhexlify(stored_password)[:16]
+    # Constant time comparison, so the time taken does not leak the hash
+    return hmac.compare_digest(hashed_password, stored_hash)
 
-    # Get the hashed password
-    stored_password = binascii.unhexlify(stored_password)[16:]
 
-    # Use pbkdf2_hmac to hash the provided password
-    hashed_password = hashlib.pbkdf2_hmac(
-        "sha256", provided_password.encode("utf-8"), salt, 100000
-    )
+def needs_rehash(stored_password, iterations: int = DEFAULT_ITERATIONS) -> bool:
+    """True for legacy hashes and hashes made with a different iteration count."""
+    if not stored_password.startswith(ALGORITHM + "$"):
+        return True
+    return _parse(stored_password)[0] != iterations
+
+
+def check_and_rehash(
+    stored_password, provided_password, iterations: int = DEFAULT_ITERATIONS
+) -> Tuple[bool, Optional[str]]:
+    """
+    check_password, plus the password re-hashed at 'iterations' when it matched and
+    needs_rehash(). Runs as one task on the PasswordHasher pool.
 
-    # Compare the hashed password with the stored password
-    return hashed_password == stored_password
+    Return Example:
+        (True, "pbkdf2_sha256$100000$...")   # matched, store the new hash
+        (True, None)                          # matched, hash is current
+        (False, None)
+    """
+    if not check_password(stored_password, provided_password):
+        return False, None
+    if needs_rehash(stored_password, iterations):
+        return True, hash_password(provided_password, iterations)
+    return True, None
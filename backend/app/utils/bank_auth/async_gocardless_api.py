@@ -0,0 +1,269 @@
+# backend/app/utils/bank_auth/async_gocardless_api.py
+
+import json
+import os
+import urllib.parse as urlparse
+import webbrowser
+from functools import wraps
+from typing import List
+
+import aiohttp
+
+from app.utils.bank_auth.gocardless_api import (
+    ApiClient,
+    RateLimit,
+    RateLimitError,
+)
+from app.utils.bank_auth.http_session import DEFAULT_TIMEOUT
+from app.utils.bank_auth.rate_limiter import (
+    RateLimitExceeded,
+    endpoint_class,
+    get_rate_limiter,
+)
+
+
+def build_async_session(
+    pool_maxsize: int = 10, timeout=DEFAULT_TIMEOUT
+) -> aiohttp.ClientSession:
+    """
+    Builds an aiohttp.ClientSession with a keep-alive pool of at most 'pool_maxsize'
+    connections, shared by every request made through it. Must be called from a
+    running event loop. Pool size defaults to GOCARDLESS_POOL_MAXSIZE.
+    """
+    connect_timeout, read_timeout = timeout
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=pool_maxsize, limit_per_host=pool_maxsize),
+        timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+    )
+
+
+class Response:
+    """
+    The parts of requests.Response the client code relies on (status_code, headers,
+    json(), text), read eagerly from an aiohttp response so its connection goes
+    straight back to the pool.
+    """
+
+    def __init__(self, status_code: int, headers, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def update_rate_limit_async(method):
+    """Async counterpart of gocardless_api.update_rate_limit: waits for the
+    limiter's quota, updates the client's RateLimit and retries 429s after the reset.
+    """
+
+    @wraps(method)
+    async def wrapper(self, path, *args, **kwargs):
+        key = endpoint_class(path)
+        for _ in range(self.max_rate_limit_retries + 1):
+            try:
+                self.throttled_seconds += await self.limiter.acquire_async(key)
+            except RateLimitExceeded as e:
+                raise RateLimitError({"message": str(e), "type": "rate_limited"}) from e
+            response = await method(self, path, *args, **kwargs)
+            self.rate_limit.update_from_response(response)
+            if not self.limiter.observe(key, response):
+                break
+        return response
+
+    return wrapper
+
+
+class AsyncApiClient(object):
+    """asyncio counterpart of ApiClient, built on aiohttp.
+
+    Many accounts or users can be fetched concurrently on one event loop, e.g.
+    ``await asyncio.gather(*(client.get_transactions(a) for a in account_ids))``.
+    Shares the process-wide RateLimiter with the sync clients, so both draw from
+    the same predicted quota.
+
+    Args:
+      base_url (string): The prefix that's prepended to all request paths.
+      access_token (string): Token used in the Authorization header.
+      http_session (aiohttp.ClientSession, optional): Connection pool to send requests
+        through. Defaults to a new one from build_async_session, closed by aclose().
+      limiter (RateLimiter, optional): Defaults to the process-wide limiter.
+      max_rate_limit_retries (int, optional): Times a 429 is retried after its reset.
+
+    Example:
+      async with AsyncApiClient(base_url, token) as client:
+          transactions = await client.get_transactions(account_id)
+    """
+
+    def __init__(
+        self,
+        base_url,
+        access_token,
+        http_session=None,
+        limiter=None,
+        max_rate_limit_retries=2,
+    ):
+        self.base_url = base_url
+        self.access_token = access_token
+        self.rate_limit = RateLimit()
+        self._owns_http_session = http_session is None
+        self.http_session = http_session or build_async_session(
+            pool_maxsize=int(os.environ.get("GOCARDLESS_POOL_MAXSIZE", 10))
+        )
+        self.limiter = limiter or get_rate_limiter()
+        self.max_rate_limit_retries = max_rate_limit_retries
+        # only touched from the event loop thread, so no lock unlike ApiClient
+        self.throttled_seconds = 0.0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._owns_http_session:
+            await self.http_session.close()
+
+    # Response mirrors requests.Response, so URL building, headers and error
+    # mapping are shared with the sync client
+    _handle_errors = ApiClient._handle_errors
+    _url_for = ApiClient._url_for
+    _headers = ApiClient._headers
+    _default_headers = ApiClient._default_headers
+
+    async def _request(self, method, path, params=None, body=None, headers=None):
+        async with self.http_session.request(
+            method,
+            self._url_for(path),
+            params=params,
+            data=None if body is None else json.dumps(body),
+            headers=self._headers(headers),
+        ) as response:
+            return Response(response.status, response.headers, await response.read())
+
+    @update_rate_limit_async
+    async def get(self, path, params=None, headers=None):
+        """Perform a GET request, optionally providing query-string params.
+
+        Returns:
+          A ``Response`` object.
+        """
+        return await self._request("GET", path, params=params, headers=headers)
+
+    @update_rate_limit_async
+    async def post(self, path, body, headers=None):
+        """Perform a POST request, providing a body, which will be JSON-encoded.
+
+        Returns:
+          A ``Response`` object.
+        """
+        return await self._request("POST", path, body=body, headers=headers)
+
+    @update_rate_limit_async
+    async def put(self, path, body, headers=None):
+        """Perform a PUT request, providing a body, which will be JSON-encoded.
+
+        Returns:
+          A ``Response`` object.
+        """
+        response = await self._request("PUT", path, body=body, headers=headers)
+        self._handle_errors(response)
+        return response
+
+    @update_rate_limit_async
+    async def delete(self, path, body=None, headers=None):
+        """Perform a DELETE request, providing a body, which will be JSON-encoded.
+
+        Returns:
+          A ``Response`` object.
+        """
+        return await self._request("DELETE", path, body=body, headers=headers)
+
+    # End-user Agreement
+    async def create_end_user_agreement(
+        self,
+        path: str = "agreements/enduser/",
+        institution_id: str = "ING_INGBNL2A",
+        max_historical_days: str = 90,
+        access_valid_for_days: str = 180,
+        access_scope: List[str] = ["balances", "transactions", "details"],
+    ):
+        """See ApiClient.create_end_user_agreement."""
+        end_user_agreement = {
+            "institution_id": institution_id,
+            "max_historical_days": max_historical_days,
+            "access_valid_for_days": access_valid_for_days,
+            "access_scope": access_scope,
+        }
+
+        self.end_user_agreement = (await self.post(path, body=end_user_agreement)).json()
+
+        return self.end_user_agreement
+
+    async def link_bank_account(
+        self,
+        path: str = "requisitions/",
+        redirect_url: str = "http://localhost:8000/callback",
+        institution_id: str = None,
+        reference: str = None,
+        user_language: str = "EN",
+        user_agreement: dict = None,
+        open_browser: bool = True,
+    ):
+        """See ApiClient.link_bank_account."""
+        user_agreement = user_agreement if user_agreement else self.end_user_agreement
+        linking_info = {
+            "redirect": redirect_url,
+            "institution_id": institution_id or user_agreement.get("institution_id"),
+            "agreement": user_agreement.get("id"),
+            "user_language": user_language,
+        }
+        if reference is not None:
+            linking_info["reference"] = reference
+
+        self.linked_account = (await self.post(path, body=linking_info)).json()
+
+        if open_browser:
+            webbrowser.open(self.linked_account["link"])
+
+        return self.linked_account
+
+    async def list_accounts(
+        self,
+        path: str = "requisitions/",
+        requisition_id: str = None,
+    ):
+        account_path = urlparse.urljoin(path, requisition_id)
+        self.accounts_list = (await self.get(account_path)).json()
+
+        return self.accounts_list
+
+    async def get_transactions(
+        self,
+        account_id: str,
+        date_from: str = None,
+        date_to: str = None,
+    ):
+        url = f"accounts/{account_id}/transactions"
+        if date_from is not None and date_to is not None:
+            params = {"date_from": date_from, "date_to": date_to}
+        else:
+            params = None
+        # not stored on self.transactions: concurrent calls would overwrite each other
+        return (await self.get(url, params)).json()
+
+    async def get_agreement(
+        self,
+        path: str,
+        agreement_id: str,
+    ):
+        url = f"{path}/{agreement_id}/"
+        self.end_user_agreement = (await self.get(url)).json()
+
+        return self.end_user_agreement
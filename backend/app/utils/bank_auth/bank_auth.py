@@ -1,9 +1,9 @@
 # backend/app/utils/bank_auth/bank_auth.py
 
-import requests
-
 import urllib.parse as urlparse
 
+from app.utils.bank_auth.http_session import DEFAULT_TIMEOUT, get_session
+
 
 class BankConnect:
     def __init__(
@@ -14,6 +14,8 @@ class BankConnect:
         secret_id,
         access_token=None,
         refresh_token=None,
+        session=None,
+        timeout=DEFAULT_TIMEOUT,
     ):
         self.base_url = base_url
         self.redirect_url = redirect_url
@@ -21,14 +23,17 @@ class BankConnect:
         self.secret_id = secret_id
         self.access_token = access_token
         self.refresh_token = refresh_token
+        self.session = session or get_session()
+        self.timeout = timeout
 
     def generate_access_token(
         self,
     ) -> dict:
-        response = requests.post(
+        response = self.session.post(
             self._url_for("token/new/"),
             json={"secret_id": self.secret_id, "secret_key": self.secret_key},
             headers=self._default_headers,
+            timeout=self.timeout,
         )
         response.raise_for_status()
         self.access_token = response.json()["access"]
@@ -51,10 +56,11 @@ class BankConnect:
     def refresh_access_token(
         self,
     ) -> dict:
-        response = requests.post(
+        response = self.session.post(
             self._url_for("token/refresh/"),
             json={"refresh": self.refresh_token},
             headers=self._default_headers,
+            timeout=self.timeout,
         )
         response.raise_for_status()
         self.access_token = response.json()["access"]
@@ -8,9 +8,18 @@ import platform
 import urllib.parse as urlparse
 import json
 import requests
+import threading
 from typing import List
 import webbrowser
 
+from app.utils.bank_auth.http_session import DEFAULT_TIMEOUT, get_session
+from app.utils.bank_auth.rate_limiter import (
+    RateLimitExceeded,
+    endpoint_class,
+    get_rate_limiter,
+)
+from app.utils.bank_auth.transaction_stream import TransactionStream
+
 
 class GoCardlessProError(Exception):
     """Base exception class for gocardless_pro errors."""
@@ -162,12 +171,29 @@ class InvalidSignatureError(GoCardlessProError):
 def update_rate_limit(method):
     """Wrap all fetch methods in this decorator to update the client's
     ratelimit object with remaining requests available.
+
+    Requests first wait for the limiter's quota of their endpoint class. A 429
+    empties that quota until the reported reset, after which the request is sent
+    again, at most ``max_rate_limit_retries`` times.
     """
 
     @wraps(method)
-    def wrapper(self, *args, **kwargs):
-        response = method(self, *args, **kwargs)
-        self.rate_limit.update_from_response(response)
+    def wrapper(self, path, *args, **kwargs):
+        key = endpoint_class(path)
+        for attempt in range(self.max_rate_limit_retries + 1):
+            if attempt:
+                response.close()  # release the 429's connection (matters with stream=True)
+            try:
+                waited = self.limiter.acquire(key)
+            except RateLimitExceeded as e:
+                raise RateLimitError({"message": str(e), "type": "rate_limited"}) from e
+            if waited:
+                with self._throttled_lock:
+                    self.throttled_seconds += waited
+            response = method(self, path, *args, **kwargs)
+            self.rate_limit.update_from_response(response)
+            if not self.limiter.observe(key, response):
+                break
         return response
 
     return wrapper
@@ -196,6 +222,14 @@ class RateLimit:
         self.reset = response.headers.get("ratelimit-reset")
 
 
+def _iter_content(response, chunk_size):
+    """Yields the body of a streamed response in chunks, then releases the connection."""
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
+
+
 class Paginator(object):
     """Iterates through all records in a paginated collection, automatically
     loading each page until the last.
@@ -232,20 +266,42 @@ class ApiClient(object):
     Args:
       base_url (string): The prefix that's prepended to all request paths.
       access_token (string): Token used in the Authorization header.
+      session (requests.Session, optional): Defaults to the pooled, keep-alive
+        session shared by the whole process (see http_session.get_session).
+      timeout (tuple, optional): (connect, read) timeout in seconds.
+      limiter (RateLimiter, optional): Defaults to the process-wide limiter
+        (see rate_limiter.get_rate_limiter).
+      max_rate_limit_retries (int, optional): Times a 429 is retried after its reset.
     """
 
-    def __init__(self, base_url, access_token):
+    def __init__(
+        self,
+        base_url,
+        access_token,
+        session=None,
+        timeout=DEFAULT_TIMEOUT,
+        limiter=None,
+        max_rate_limit_retries=2,
+    ):
         self.base_url = base_url
         self.access_token = access_token
         self.rate_limit = RateLimit()
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.limiter = limiter or get_rate_limiter()
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.throttled_seconds = 0.0  # time this client spent waiting for quota
+        self._throttled_lock = threading.Lock()
 
     @update_rate_limit
-    def get(self, path, params=None, headers=None):
+    def get(self, path, params=None, headers=None, stream=False):
         """Perform a GET request, optionally providing query-string params.
 
         Args:
           path (str): A path that gets appended to ``base_url``.
           params (dict, optional): Dictionary of param names to values.
+          stream (bool, optional): Don't read the body up front (see requests'
+            ``stream``); the caller must consume or close the response.
 
         Example:
           api_client.get('/users', params={'active': True})
@@ -255,8 +311,12 @@ class ApiClient(object):
         """
         # print(self._url_for(path))
         # print(json.dumps(self._headers(headers), indent=2))
-        response = requests.get(
-            self._url_for(path), params=params, headers=self._headers(headers)
+        response = self.session.get(
+            self._url_for(path),
+            params=params,
+            headers=self._headers(headers),
+            timeout=self.timeout,
+            stream=stream,
         )
         # self._handle_errors(response)
         return response
@@ -277,8 +337,11 @@ class ApiClient(object):
         """
         # print(self._url_for(path))
         # print(json.dumps(self._headers(headers), indent=2))
-        response = requests.post(
-            self._url_for(path), data=json.dumps(body), headers=self._headers(headers)
+        response = self.session.post(
+            self._url_for(path),
+            data=json.dumps(body),
+            headers=self._headers(headers),
+            timeout=self.timeout,
         )
         # self._handle_errors(response)
         return response
@@ -299,8 +362,11 @@ class ApiClient(object):
         """
         # print(self._url_for(path))
         # print(json.dumps(self._headers(headers), indent=2))
-        response = requests.put(
-            self._url_for(path), data=json.dumps(body), headers=self._headers(headers)
+        response = self.session.put(
+            self._url_for(path),
+            data=json.dumps(body),
+            headers=self._headers(headers),
+            timeout=self.timeout,
         )
         self._handle_errors(response)
         return response
@@ -321,8 +387,11 @@ class ApiClient(object):
         """
         # print(self._url_for(path))
         # print(json.dumps(self._headers(headers), indent=2))
-        response = requests.delete(
-            self._url_for(path), data=json.dumps(body), headers=self._headers(headers)
+        response = self.session.delete(
+            self._url_for(path),
+            data=json.dumps(body),
+            headers=self._headers(headers),
+            timeout=self.timeout,
         )
         # self._handle_errors(response)
         return response
@@ -476,6 +545,26 @@ class ApiClient(object):
 
         return self.transactions
 
+    def stream_transactions(
+        self,
+        account_id: str,
+        date_from: str = None,
+        date_to: str = None,
+        chunk_size: int = 64 * 1024,
+    ) -> TransactionStream:
+        """Like get_transactions, but parses the response while it downloads
+        instead of loading it whole. Iterate the returned TransactionStream for
+        ("booked" | "pending", transaction) pairs; the connection is released once
+        it is exhausted. Nothing is stored on ``self.transactions``.
+        """
+        url = f"accounts/{account_id}/transactions"
+        if date_from is not None and date_to is not None:
+            params = {"date_from": date_from, "date_to": date_to}
+        else:
+            params = None
+        response = self.get(url, params, stream=True)
+        return TransactionStream(_iter_content(response, chunk_size))
+
     def get_agreement(
         self,
         path: str,
@@ -490,7 +579,7 @@ class ApiClient(object):
 if __name__ == "__main__":
     from dotenv import load_dotenv
     import os
-    from bank_auth import BankConnect
+    from app.utils.bank_auth.bank_auth import BankConnect
 
     bank_institutions_path = "institutions/?country=nl"
     end_user_agreement_path = "agreements/enduser/"
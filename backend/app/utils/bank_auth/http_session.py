@@ -0,0 +1,87 @@
+# backend/app/utils/bank_auth/http_session.py
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def _env_float(name, default):
+    return float(os.environ.get(name, default))
+
+
+# (connect, read) timeout in seconds for every GoCardless call
+DEFAULT_TIMEOUT = (
+    _env_float("GOCARDLESS_CONNECT_TIMEOUT", 3.05),
+    _env_float("GOCARDLESS_READ_TIMEOUT", 30),
+)
+
+
+class _ServerErrorRetry(Retry):
+    """
+    Retry that never retries a 429. urllib3 would otherwise retry any 429 carrying
+    Retry-After (even outside status_forcelist) and sleep on its own, hidden from
+    the RateLimiter and its max_wait.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def build_session(
+    pool_maxsize: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    backoff_jitter: float = 0.5,
+) -> requests.Session:
+    """
+    Builds a requests.Session with a keep-alive connection pool of 'pool_maxsize'
+    connections per host. Idempotent methods (GET, PUT, DELETE, ...) are retried on
+    connection errors and 5xx with exponential, jittered backoff; POSTs are only
+    retried when the connection could not be opened. 429s are left to ApiClient's
+    RateLimiter, which waits for the reset the response reports.
+    """
+    retry = _ServerErrorRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        respect_retry_after_header=True,  # for 503s; 429s never reach it
+        raise_on_status=False,  # hand the last response to ApiClient._handle_errors
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    The process-wide session shared by every ApiClient and BankConnect, so calls
+    reuse pooled TLS connections instead of opening a new one each time.
+    Pool size and retries come from GOCARDLESS_POOL_MAXSIZE / GOCARDLESS_MAX_RETRIES.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session(
+                    pool_maxsize=int(os.environ.get("GOCARDLESS_POOL_MAXSIZE", 10)),
+                    max_retries=int(os.environ.get("GOCARDLESS_MAX_RETRIES", 3)),
+                )
+    return _session
@@ -0,0 +1,218 @@
+# backend/app/utils/bank_auth/rate_limiter.py
+
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+# accounts/<id>/{transactions,details,balances} have their own per-account quota,
+# everything else (token, agreements, requisitions, ...) shares the general one
+ACCOUNT_ENDPOINT = re.compile(r"accounts/([^/]+)/(transactions|details|balances)")
+GENERAL = "general"
+
+# headers checked per endpoint class, first match wins
+ACCOUNT_HEADER_PREFIXES = ("http_x_ratelimit_account_success_", "ratelimit-")
+GENERAL_HEADER_PREFIXES = ("http_x_ratelimit_", "ratelimit-")
+
+
+def endpoint_class(path: str) -> str:
+    """
+    The quota bucket a request path draws from, e.g.
+    "accounts/acc-1/transactions" -> "transactions:acc-1", "requisitions/" -> "general".
+    """
+    match = ACCOUNT_ENDPOINT.search(path)
+    if match is None:
+        return GENERAL
+    account_id, scope = match.groups()
+    return f"{scope}:{account_id}"
+
+
+def _header_int(headers, name):
+    try:
+        return int(float(headers[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def read_rate_limit_headers(headers, key: str):
+    """(limit, remaining, reset_seconds) from the response headers; None when absent."""
+    prefixes = GENERAL_HEADER_PREFIXES if key == GENERAL else ACCOUNT_HEADER_PREFIXES
+    for prefix in prefixes:
+        values = tuple(
+            _header_int(headers, prefix + name) for name in ("limit", "remaining", "reset")
+        )
+        if values != (None, None, None):
+            return values
+    return None, None, None
+
+
+class TokenBucket:
+    """
+    Predicted quota of one endpoint class. The server is the source of truth:
+    every response resets 'tokens' to its remaining header, and between responses
+    each request spends one token locally so concurrent callers don't overshoot.
+    Once the tokens run out, callers wait until the predicted reset.
+    """
+
+    def __init__(self, default_reset: float = 60):
+        self.limit = None
+        self.tokens = None  # None = unknown, let requests through
+        self.reset_at = None  # time.monotonic() when the window refills
+        self.default_reset = default_reset
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        """
+        Takes a token if one is available and returns 0, otherwise returns the
+        seconds until the reset (the caller sleeps and tries again).
+        Raises RateLimitExceeded if that is more than 'max_wait'.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.reset_at is not None and now >= self.reset_at:
+                self.tokens = self.limit  # fresh window; unknown if we never saw a limit
+                self.reset_at = None
+            if self.tokens is None or self.tokens > 0:
+                if self.tokens is not None:
+                    self.tokens -= 1
+                return 0.0
+            if self.reset_at is None:
+                self.reset_at = now + self.default_reset
+            wait = self.reset_at - now
+        if wait > max_wait:
+            raise RateLimitExceeded(wait)
+        return wait
+
+    def observe(self, limit, remaining, reset):
+        """Syncs the prediction with the quota the server reported."""
+        if remaining is None:
+            return
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            self.tokens = remaining
+            if reset is not None:
+                self.reset_at = time.monotonic() + max(reset, 0)
+
+    def exhaust(self, reset):
+        """After a 429: no tokens left until 'reset' seconds (or default_reset) pass."""
+        with self._lock:
+            self.tokens = 0
+            self.reset_at = time.monotonic() + (
+                self.default_reset if reset is None else max(reset, 0)
+            )
+
+
+class RateLimitExceeded(Exception):
+    """A request would have to wait longer than the limiter's max_wait."""
+
+    def __init__(self, wait: float):
+        super().__init__(f"Rate limit exhausted, resets in {wait:.0f} seconds")
+        self.wait = wait
+
+
+class RateLimiter:
+    """
+    Client-side limiter for the GoCardless API with one TokenBucket per endpoint
+    class (see endpoint_class). Requests that would exceed the predicted quota wait
+    for the reset instead of being sent and rejected with a 429; waits longer than
+    'max_wait' seconds fail fast with RateLimitExceeded. Thread safe.
+    """
+
+    def __init__(self, max_wait: float = 60, default_reset: float = 60):
+        self.max_wait = max_wait
+        self._buckets = defaultdict(lambda: TokenBucket(default_reset))
+        self._buckets_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = defaultdict(
+            lambda: {"throttled_seconds": 0.0, "throttled_requests": 0, "rate_limited": 0}
+        )
+
+    def bucket(self, key: str) -> TokenBucket:
+        with self._buckets_lock:
+            return self._buckets[key]
+
+    def acquire(self, key: str) -> float:
+        """Blocks until a request to 'key' fits the quota. Returns the seconds waited."""
+        bucket = self.bucket(key)
+        waited = 0.0
+        while True:
+            wait = bucket.reserve(self.max_wait - waited)
+            if not wait:
+                break
+            time.sleep(wait)
+            waited += wait
+        self._record_wait(key, waited)
+        return waited
+
+    async def acquire_async(self, key: str) -> float:
+        """acquire() for coroutines: sleeps with asyncio instead of blocking the loop."""
+        bucket = self.bucket(key)
+        waited = 0.0
+        while True:
+            wait = bucket.reserve(self.max_wait - waited)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        self._record_wait(key, waited)
+        return waited
+
+    def _record_wait(self, key: str, waited: float):
+        if waited:
+            with self._metrics_lock:
+                metrics = self._metrics[key]
+                metrics["throttled_seconds"] += waited
+                metrics["throttled_requests"] += 1
+
+    def observe(self, key: str, response) -> bool:
+        """
+        Updates the bucket from the response headers. Returns True if the response
+        was a 429, in which case the bucket is empty until the reported reset.
+        """
+        limit, remaining, reset = read_rate_limit_headers(response.headers, key)
+        bucket = self.bucket(key)
+        if response.status_code != 429:
+            bucket.observe(limit, remaining, reset)
+            return False
+        retry_after = _header_int(response.headers, "retry-after")
+        bucket.exhaust(retry_after if retry_after is not None else reset)
+        with self._metrics_lock:
+            self._metrics[key]["rate_limited"] += 1
+        return True
+
+    def metrics(self) -> dict:
+        """
+        Return Example:
+            {"throttled_seconds": 12.5, "throttled_requests": 3, "rate_limited": 1,
+             "by_endpoint": {"transactions:acc-1": {"throttled_seconds": 12.5, ...}}}
+        """
+        with self._metrics_lock:
+            by_endpoint = {key: dict(m) for key, m in self._metrics.items()}
+        totals = {"throttled_seconds": 0.0, "throttled_requests": 0, "rate_limited": 0}
+        for m in by_endpoint.values():
+            for name in totals:
+                totals[name] += m[name]
+        return {**totals, "by_endpoint": by_endpoint}
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    The process-wide limiter shared by every ApiClient, since GoCardless counts the
+    quota per token/account and not per client object.
+    The longest acceptable wait comes from GOCARDLESS_RATE_LIMIT_MAX_WAIT (seconds).
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    max_wait=float(os.environ.get("GOCARDLESS_RATE_LIMIT_MAX_WAIT", 60))
+                )
+    return _limiter
@@ -0,0 +1,143 @@
+# backend/app/utils/bank_auth/transaction_stream.py
+
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class TransactionStream:
+    """
+    Incremental parser for a GoCardless transactions response,
+    {"transactions": {"booked": [...], "pending": [...]}, ...}, read from an iterable
+    of byte chunks (e.g. requests' Response.iter_content).
+
+    Iterating yields ("booked" | "pending", transaction) pairs as soon as each
+    transaction has been read, so only one chunk plus one transaction is held in
+    memory instead of the whole body. Array items are decoded with
+    JSONDecoder.raw_decode; everything outside the two arrays is small and decoded
+    whole. Once exhausted, 'found' tells whether the body had a "transactions"
+    object and 'other' holds the remaining top-level fields (e.g. an error body's
+    "summary"/"detail").
+
+    Example:
+        stream = TransactionStream(response.iter_content(chunk_size=65536))
+        for status, transaction in stream:
+            ...
+        if not stream.found:
+            raise ValueError(stream.other)
+    """
+
+    ARRAYS = ("booked", "pending")
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.found = False
+        self.other = {}
+
+    def __iter__(self) -> Iterator[tuple]:
+        self._expect("{")
+        for key in self._object_keys():
+            if key == "transactions" and self._peek() == "{":
+                self.found = True
+                self._advance()
+                for array in self._object_keys():
+                    if array in self.ARRAYS and self._peek() == "[":
+                        self._advance()
+                        for transaction in self._array_items():
+                            yield array, transaction
+                    else:
+                        self._value()
+            else:
+                self.other[key] = self._value()
+
+    # Structure
+
+    def _object_keys(self) -> Iterator[str]:
+        """Yields the keys of the object whose "{" was just consumed; the caller
+        consumes each value before asking for the next key."""
+        if self._peek() == "}":
+            self._advance()
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key at offset {self._pos}")
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def _array_items(self) -> Iterator:
+        """Yields the items of the array whose "[" was just consumed."""
+        if self._peek() == "]":
+            self._advance()
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    # Tokens
+
+    def _fill(self) -> bool:
+        """Appends the next chunk to the buffer; False at the end of the stream."""
+        if self._eof:
+            return False
+        if self._pos:
+            # drop what was parsed already, so the buffer never grows past a chunk
+            # plus the item being decoded
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._utf8.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        """The next non-whitespace character, without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of transactions response")
+
+    def _advance(self):
+        self._pos += 1
+
+    def _expect(self, characters: str) -> str:
+        char = self._peek()
+        if char not in characters:
+            raise ValueError(
+                f"Expected one of {characters!r} at offset {self._pos}, got {char!r}"
+            )
+        self._advance()
+        return char
+
+    def _value(self):
+        """Decodes the JSON value at the current position, reading more as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number that ends the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
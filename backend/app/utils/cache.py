@@ -0,0 +1,214 @@
+# backend/app/utils/cache.py
+
+import datetime as dt
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from pymongo.errors import PyMongoError
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded in-process cache: at most 'maxsize' entries, the least recently used is
+    evicted first, and entries older than 'ttl' seconds (if set) count as missing.
+    Thread safe. get() returns None on a miss, so None is not a cacheable value.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class MongoCache:
+    """
+    Cache shared by every worker process, one document per key in a MongoDB
+    collection: {"_id": "<namespace>:<key>", "value": ..., "expiresAt": datetime}.
+    Expired documents are ignored on read and removed by the TTL index on
+    expiresAt (see INDEXES["Cache"]). Values must be BSON encodable.
+    Errors are logged by the caller's logger and treated as misses, so a cache
+    outage never fails a request.
+    """
+
+    def __init__(self, collection, namespace: str, ttl: float = 3600, logger=None):
+        self.collection = collection
+        self.namespace = namespace
+        self.ttl = ttl
+        self.logger = logger
+
+    def _id(self, key) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key):
+        try:
+            doc = self.collection.find_one(
+                {"_id": self._id(key), "expiresAt": {"$gt": dt.datetime.now()}},
+                {"_id": 0, "value": 1},
+            )
+        except PyMongoError as e:
+            self._log(f"Cache read of {self._id(key)} failed: {e}")
+            return None
+        return doc["value"] if doc else None
+
+    def set(self, key, value):
+        try:
+            self.collection.replace_one(
+                {"_id": self._id(key)},
+                {"value": value, "expiresAt": dt.datetime.now() + dt.timedelta(seconds=self.ttl)},
+                upsert=True,
+            )
+        except PyMongoError as e:
+            self._log(f"Cache write of {self._id(key)} failed: {e}")
+
+    def delete(self, key):
+        try:
+            self.collection.delete_one({"_id": self._id(key)})
+        except PyMongoError as e:
+            self._log(f"Cache delete of {self._id(key)} failed: {e}")
+
+    def clear(self):
+        self.collection.delete_many({"_id": {"$regex": f"^{re.escape(self.namespace)}:"}})
+
+    def _log(self, message: str):
+        if self.logger is not None:
+            self.logger.warning(message)
+
+
+class TwoLevelCache:
+    """
+    An in-process LRUCache in front of a shared cache (e.g. MongoCache): reads try
+    the local level first and copy shared hits into it, writes go to both.
+    """
+
+    def __init__(self, local: LRUCache, shared):
+        self.local = local
+        self.shared = shared
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        self.shared.set(key, value)
+
+    def delete(self, key):
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def stats(self) -> dict:
+        return self.local.stats()
+
+
+class CachedValue:
+    """
+    A single value produced by 'loader()', reloaded on first use after 'ttl'
+    seconds (never, if ttl is None) or after invalidate(). Concurrent callers of an
+    expired value wait for one reload instead of all running the loader. A ttl of
+    0 or less disables the cache: every get() calls the loader.
+    """
+
+    def __init__(self, loader, ttl: Optional[float] = None):
+        self.loader = loader
+        self.ttl = ttl
+        self._value = _MISSING
+        self._expires_at = None
+        self._lock = threading.Lock()
+
+    def _current(self):
+        """The value if it has not expired, else _MISSING."""
+        value, expires_at = self._value, self._expires_at
+        if expires_at is not None and time.monotonic() >= expires_at:
+            return _MISSING
+        return value
+
+    def get(self):
+        if self.ttl is not None and self.ttl <= 0:
+            return self.loader()
+        value = self._current()
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            value = self._current()
+            if value is _MISSING:
+                value = self.loader()
+                self._value, self._expires_at = value, (
+                    None if self.ttl is None else time.monotonic() + self.ttl
+                )
+            return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = _MISSING
+
+
+def build_cache(
+    maxsize: int,
+    ttl: Optional[float] = None,
+    backend: str = "memory",
+    mongo=None,
+    namespace: str = "",
+):
+    """
+    The cache described by the app config: None if 'maxsize' is 0 (disabled), an
+    LRUCache for backend "memory", or an LRUCache in front of a MongoCache in
+    mongo.cache for backend "mongo", so several workers share computed values.
+    """
+    if not maxsize:
+        return None
+    local = LRUCache(maxsize=maxsize, ttl=ttl)
+    if backend == "memory":
+        return local
+    if backend == "mongo":
+        shared = MongoCache(mongo.cache, namespace, ttl=ttl or 3600, logger=mongo.logger)
+        return TwoLevelCache(local, shared)
+    raise ValueError(f"Unknown cache backend {backend!r}, expected 'memory' or 'mongo'")
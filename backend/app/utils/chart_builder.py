@@ -0,0 +1,111 @@
+# backend/app/utils/chart_builder.py
+
+from collections import defaultdict
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, Union
+
+PENDING_MONTH = "Pending"
+BAR_BACKGROUND_COLOR = "rgba(255, 99, 132, 0.2)"
+
+
+@lru_cache(maxsize=4096)
+def month_key(booking_date: Union[str, date, None]) -> str:
+    """
+    Returns the "YYYY-MM" bucket of a bookingDate ("YYYY-MM-DD" string or date).
+    Missing or unparsable dates go to "Pending". Cached, since a user only has a few
+    hundred distinct booking dates however many transactions they have.
+    """
+    if isinstance(booking_date, date):
+        return booking_date.strftime("%Y-%m")
+    if not booking_date:
+        return PENDING_MONTH
+    try:
+        return datetime.strptime(booking_date[:10], "%Y-%m-%d").strftime("%Y-%m")
+    except ValueError:
+        return PENDING_MONTH
+
+
+@lru_cache(maxsize=1024)
+def month_label(key: str) -> str:
+    """
+    Turns a "YYYY-MM" month key into the "%B %Y" label shown on the charts.
+    Anything else (e.g. "Pending") is returned as-is.
+    """
+    try:
+        return datetime.strptime(key, "%Y-%m").strftime("%B %Y")
+    except ValueError:
+        return key
+
+
+class ChartBuilder:
+    """
+    Accumulates expense totals per (month, category) and builds the structure the
+    frontend charts expect:
+
+        {
+            "categories": [...],    # sorted category names (pie labels)
+            "amounts": [...],       # expense total per category (pie values)
+            "dates": [...],         # chronological month labels (bar x-axis)
+            "categoryData": [       # one bar dataset per category
+                {"label": "Food", "data": [...], "backgroundColor": "..."},
+            ],
+        }
+
+    Each add() is O(1), so feeding n transactions costs O(n) and build() costs
+    O(months x categories).
+    """
+
+    def __init__(self):
+        self._totals = defaultdict(lambda: defaultdict(float))  # category -> month -> sum
+        self._months = set()
+
+    def add(self, month: str, category: str, expenses: float = 0.0):
+        """Adds an already aggregated expense total for (month, category)."""
+        self._months.add(month)
+        self._totals[category][month] += expenses
+
+    def add_transaction(self, txn: dict):
+        """
+        Adds one transaction in the /dashboard frontend shape (bookingDate, category,
+        transactionType, amount). Only expenses count towards the totals, but income
+        categories and months still show up on the charts. Amounts count unsigned, as
+        older bank imports stored expenses negative.
+        """
+        amount = abs(float(txn["amount"])) if txn["transactionType"] == "expense" else 0.0
+        self.add(
+            month_key(txn["bookingDate"]), txn["category"] or "Uncategorized", amount
+        )
+
+    def build(self) -> dict:
+        months = sorted(self._months)  # "YYYY-MM" sorts chronologically, "Pending" last
+        categories = sorted(self._totals)
+        return {
+            "categories": categories,
+            "amounts": [sum(self._totals[cat].values()) for cat in categories],
+            "dates": [month_label(month) for month in months],
+            "categoryData": [
+                {
+                    "label": cat,
+                    "data": [self._totals[cat].get(month, 0.0) for month in months],
+                    "backgroundColor": BAR_BACKGROUND_COLOR,
+                }
+                for cat in categories
+            ],
+        }
+
+
+def build_chart_data(transactions: Iterable[dict]) -> dict:
+    """Single pass over frontend-shaped transactions (the Python fallback)."""
+    builder = ChartBuilder()
+    for txn in transactions:
+        builder.add_transaction(txn)
+    return builder.build()
+
+
+def chart_data_from_rows(rows: Iterable[dict]) -> dict:
+    """Builds the charts from ExpenseTrackerWebAppDB.aggregate_chart_data() rows."""
+    builder = ChartBuilder()
+    for row in rows:
+        builder.add(row["_id"]["month"], row["_id"]["category"], row["expenses"])
+    return builder.build()
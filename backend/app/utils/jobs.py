@@ -0,0 +1,266 @@
+# backend/app/utils/jobs.py
+
+import datetime as dt
+import os
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from pymongo import ReturnDocument
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    Runs slow work (bank imports, link refreshes) outside the request thread.
+
+    Every job is a document in the Jobs collection:
+        {
+            "_id": "5f0c...", "kind": "import", "username": "alice", "params": {...},
+            "status": "queued" | "running" | "done" | "failed",
+            "progress": {...}, "result": {...}, "error": None,
+            "owner": "host:pid", "claim": "9b2e...", "heartbeat": datetime, "attempts": 1,
+            "createdDate": datetime, "updatedDate": datetime, "finishedAt": datetime,
+        }
+    and is executed on this process' thread pool by the handler registered for its
+    kind. While a process holds jobs it refreshes their heartbeat; queued or running
+    jobs whose heartbeat is older than 'stale_after' seconds were orphaned by a
+    crashed worker and are claimed and re-run by recover_orphans(). Every claim
+    stores a new 'claim' token, and a run only writes progress and its outcome
+    while the job still carries its token: a worker whose job was taken over
+    after a missed heartbeat cannot overwrite the new run's result. Finished jobs
+    are removed by a TTL index on 'finishedAt' (JOB_RETENTION_SECONDS in
+    mongodb_connector).
+
+    Orphans are only recovered after start(): processes that never serve requests
+    (CLI commands, benchmarks) must not claim other workers' jobs. Jobs this
+    process runs are heartbeated either way, from their dispatch on.
+    """
+
+    def __init__(
+        self,
+        app,
+        collection,
+        max_workers: int = 2,
+        stale_after: float = 120,
+        max_attempts: int = 3,
+    ):
+        self.app = app
+        self.jobs = collection
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.handlers = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job-worker"
+        )
+        self._held = set()  # job ids queued or running in this process
+        self._held_lock = threading.Lock()
+        self._heartbeat_thread = None
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def register(self, kind: str, handler: Callable):
+        """
+        'handler(job, progress)' runs inside an app context and returns the job result
+        (a dict). 'progress(**fields)' stores intermediate progress on the job doc.
+        """
+        self.handlers[kind] = handler
+
+    def submit(self, kind: str, username: str, params: Optional[dict] = None) -> str:
+        """Stores a queued job and hands it to the worker pool. Returns the job id."""
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        now = dt.datetime.now()
+        job_id = uuid.uuid4().hex
+        self.jobs.insert_one(
+            {
+                "_id": job_id,
+                "kind": kind,
+                "username": username,
+                "params": params or {},
+                "status": QUEUED,
+                "progress": {},
+                "result": None,
+                "error": None,
+                "owner": self.owner,
+                "claim": None,
+                "heartbeat": now,
+                "attempts": 0,
+                "createdDate": now,
+                "updatedDate": now,
+            }
+        )
+        self._dispatch(job_id)
+        return job_id
+
+    def get(self, job_id: str, username: Optional[str] = None) -> Optional[dict]:
+        """The job doc (without params), optionally only if it belongs to 'username'."""
+        query = {"_id": job_id}
+        if username is not None:
+            query["username"] = username
+        return self.jobs.find_one(query, {"params": 0})
+
+    def recover_orphans(self) -> list:
+        """
+        Claims queued/running jobs whose owner stopped heartbeating and re-runs them
+        here. Jobs that already used up 'max_attempts' are marked failed instead.
+        Returns the ids of the re-queued jobs.
+        """
+        cutoff = dt.datetime.now() - dt.timedelta(seconds=self.stale_after)
+        recovered = []
+        while True:
+            now = dt.datetime.now()
+            # atomic claim, so only one process recovers each job
+            job = self.jobs.find_one_and_update(
+                {"status": {"$in": [QUEUED, RUNNING]}, "heartbeat": {"$lt": cutoff}},
+                {
+                    "$set": {
+                        "status": QUEUED,
+                        "owner": self.owner,
+                        "claim": uuid.uuid4().hex,
+                        "heartbeat": now,
+                    }
+                },
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None:
+                return recovered
+            if job["attempts"] >= self.max_attempts:
+                self._finish(
+                    job["_id"], job["claim"], FAILED, error="Job was orphaned too many times"
+                )
+                continue
+            self.app.mongo.logger.warning(f"Recovering orphaned job {job['_id']}")
+            recovered.append(job["_id"])
+            self._dispatch(job["_id"])
+
+    def start(self):
+        """
+        Recovers orphaned jobs once, then keeps held jobs heartbeating. Only the
+        first call does anything, so it is cheap to call on every request.
+        """
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        self.recover_orphans()
+        self.start_heartbeat()
+
+    def start_heartbeat(self):
+        """
+        Starts the daemon thread that heartbeats held jobs, and after start() also
+        recovers orphans. Called by every dispatch; only the first call starts it.
+        """
+        if self._heartbeat_thread is not None:
+            return
+        with self._start_lock:
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat_loop, name="job-heartbeat", daemon=True
+                )
+                self._heartbeat_thread.start()
+
+    def shutdown(self, wait: bool = True):
+        """Stops the heartbeat thread and the worker pool."""
+        self._stopped.set()
+        self.executor.shutdown(wait=wait)
+
+    def _heartbeat_loop(self):
+        interval = max(self.stale_after / 4, 1)
+        while not self._stopped.wait(interval):
+            try:
+                with self._held_lock:
+                    held = list(self._held)
+                if held:
+                    self.jobs.update_many(
+                        {"_id": {"$in": held}, "owner": self.owner},
+                        {"$set": {"heartbeat": dt.datetime.now()}},
+                    )
+                if self._started:
+                    self.recover_orphans()
+            except Exception as e:  # keep heartbeating through transient DB errors
+                self.app.mongo.logger.error(f"Job heartbeat failed: {e}")
+
+    def _dispatch(self, job_id: str):
+        with self._held_lock:
+            self._held.add(job_id)
+        # a job without heartbeats would look orphaned to the other workers
+        self.start_heartbeat()
+        self.executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str):
+        try:
+            now = dt.datetime.now()
+            claim = uuid.uuid4().hex
+            job = self.jobs.find_one_and_update(
+                {"_id": job_id, "status": QUEUED, "owner": self.owner},
+                {
+                    "$set": {
+                        "status": RUNNING,
+                        "claim": claim,
+                        "heartbeat": now,
+                        "updatedDate": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                return_document=ReturnDocument.AFTER,
+            )
+            if job is None:  # claimed by someone else in the meantime
+                return
+
+            def progress(**fields):
+                self.jobs.update_one(
+                    {"_id": job_id, "claim": claim},
+                    {
+                        "$set": {
+                            **{f"progress.{k}": v for k, v in fields.items()},
+                            "heartbeat": dt.datetime.now(),
+                        }
+                    },
+                )
+
+            with self.app.app_context():
+                try:
+                    result = self.handlers[job["kind"]](job, progress)
+                except Exception as e:
+                    self.app.mongo.logger.error(
+                        f"Job {job_id} ({job['kind']}) failed: {e}\n{traceback.format_exc()}"
+                    )
+                    self._finish(job_id, claim, FAILED, error=str(e))
+                else:
+                    self._finish(job_id, claim, DONE, result=result)
+        finally:
+            with self._held_lock:
+                self._held.discard(job_id)
+
+    def _finish(self, job_id: str, claim: str, status: str, result=None, error=None):
+        """Stores the outcome, unless the job was claimed again since 'claim' (a no-op then)."""
+        now = dt.datetime.now()
+        updated = self.jobs.update_one(
+            {"_id": job_id, "claim": claim},
+            {
+                "$set": {
+                    "status": status,
+                    "result": result,
+                    "error": error,
+                    "updatedDate": now,
+                    # drives the TTL index that removes finished jobs
+                    "finishedAt": now,
+                }
+            },
+        )
+        if not updated.matched_count:
+            self.app.mongo.logger.warning(
+                f"Job {job_id} was claimed by another run, dropping this run's {status} outcome"
+            )
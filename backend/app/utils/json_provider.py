@@ -0,0 +1,39 @@
+# backend/app/utils/json_provider.py
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; without it responses use the standard library
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed and otherwise
+    behaves exactly like DefaultJSONProvider. The output stays the same either way:
+    keys are sorted, and dates and anything orjson does not know natively go through
+    DefaultJSONProvider.default (so datetimes are still HTTP dates). Pretty-printed
+    debug responses and dumps() calls with json.dumps keyword arguments use the
+    standard library.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj).decode()
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is None or pretty:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self._orjson_dumps(obj) + b"\n", mimetype=self.mimetype
+        )
+
+    def _orjson_dumps(self, obj) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
@@ -0,0 +1,81 @@
+# backend/app/utils/login_throttle.py
+
+import threading
+import time
+from typing import Optional
+
+from app.utils.cache import LRUCache
+
+
+class LoginThrottle:
+    """
+    Admission control for /login and /signup, checked before any password is
+    hashed so that rejecting an attempt costs a dict lookup rather than a PBKDF2 run.
+
+    Within every 'window' seconds each IP may make 'max_attempts_per_ip' attempts and
+    may fail 'max_failures_per_account' times per account (username or email, as
+    typed); a successful login clears that IP's failures for the account.
+
+    Failures are counted per (account, IP) rather than per account, so nobody can
+    lock a user out by sending wrong passwords for their username: the lockout only
+    reaches the IPs that sent them. The price is that an attacker spreading guesses
+    over N IPs gets N times 'max_failures_per_account' guesses per window at one
+    account, each IP still capped at 'max_attempts_per_ip' attempts overall.
+
+    Counters are fixed windows kept in bounded LRUs, per process: with several
+    workers the limits apply per worker. Thread safe.
+    """
+
+    def __init__(
+        self,
+        max_failures_per_account: int = 5,
+        max_attempts_per_ip: int = 30,
+        window: float = 300,
+        maxsize: int = 100_000,
+    ):
+        self.max_failures_per_account = max_failures_per_account
+        self.max_attempts_per_ip = max_attempts_per_ip
+        self.window = window
+        # key -> (window start, count); entries expire with their window.
+        # _accounts is keyed by (account, ip), _ips by ip
+        self._accounts = LRUCache(maxsize=maxsize, ttl=window)
+        self._ips = LRUCache(maxsize=maxsize, ttl=window)
+        self._lock = threading.Lock()
+
+    def _count(self, counters: LRUCache, key, now: float):
+        entry = counters.get(key)
+        if entry is None or now - entry[0] >= self.window:
+            return now, 0
+        return entry
+
+    def retry_after(self, account: Optional[str], ip: Optional[str]) -> float:
+        """
+        Seconds until the IP may try again (for 'account', if given), 0 if the attempt
+        is admitted. An admitted attempt counts against the IP's limit.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if account:
+                key = (account.lower(), ip)
+                started, failures = self._count(self._accounts, key, now)
+                if failures >= self.max_failures_per_account:
+                    return started + self.window - now
+            if ip:
+                started, attempts = self._count(self._ips, ip, now)
+                if attempts >= self.max_attempts_per_ip:
+                    return started + self.window - now
+                self._ips.set(ip, (started, attempts + 1))
+        return 0.0
+
+    def record(self, account: str, ip: Optional[str], success: bool):
+        """
+        Counts a failed login against the account from this IP, or clears those
+        failures after a success.
+        """
+        key = (account.lower(), ip)
+        with self._lock:
+            if success:
+                self._accounts.delete(key)
+                return
+            started, failures = self._count(self._accounts, key, time.monotonic())
+            self._accounts.set(key, (started, failures + 1))
@@ -6,7 +6,8 @@ from flask_login import UserMixin
 class MongoUser(UserMixin):
     """
     Wraps a MongoDB user document (e.g. { "_id": "some_username", "email": "...", ... })
-    so that Flask-Login can handle it.
+    so that Flask-Login can handle it. Requests get the slim principal loaded with
+    PRINCIPAL_PROJECTION (no password hash or GoCardless data).
     """
 
     def __init__(self, user_doc: dict):
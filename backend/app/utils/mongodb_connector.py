@@ -1,25 +1,268 @@
 # backend/app/utils/mongodb_connector.py
 
 # Built-in libraries
+import base64
+import binascii
 import datetime as dt
-from typing import Union
+import hashlib
+import json
+from collections import defaultdict
+from itertools import count, islice
+from typing import Iterable, Optional, Union
 
 # Third party libraries
-from pymongo import MongoClient
+from pymongo import (
+    ASCENDING,
+    DESCENDING,
+    IndexModel,
+    InsertOne,
+    MongoClient,
+    ReturnDocument,
+    UpdateOne,
+)
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from bson import ObjectId, json_util
 
 # Internal imports
 from app.utils._logger import MyLogger
+from app.utils.cache import CachedValue, LRUCache
 from app.utils._password_utils import hash_password
 from app.models.users import User
-from app.models.transactions import GoCardlessTransaction
+from app.models.transactions import (
+    TRANSACTION_LIST_ADAPTER,
+    GoCardlessTransaction,
+    validate_transactions,
+)
+from app.utils.chart_builder import month_key
+
+# Fields a transaction needs for its MonthlyRollups bucket
+ROLLUP_PROJECTION = {
+    "bookingDate": 1,
+    "category": 1,
+    "transactionType": 1,
+    "transactionAmount.amount": 1,
+}
+
+# Fields the frontend shows for a transaction (see routes.main.trusted_transactions_to_frontend)
+FRONTEND_PROJECTION = {
+    field: 1
+    for field in (
+        "transactionId",
+        "endToEndId",
+        "bookingDate",
+        "transactionAmount",
+        "debtorName",
+        "debtorAccount",
+        "creditorName",
+        "creditorAccount",
+        "remittanceInformationUnstructured",
+        "proprietaryBankTransactionCode",
+        "internalTransactionId",
+        "transactionType",
+        "category",
+        "sub_category",
+    )
+}
+
+
+# Fields of a user doc that make up the session principal (MongoUser), i.e. everything
+# but the password hash and the GoCardless agreement/requisition/sync blobs
+PRINCIPAL_PROJECTION = {"_id": 1, "name": 1, "email": 1, "groups": 1}
+
+
+# Seconds a finished job (done or failed) is kept for GET /banks/jobs/<job_id>
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+# Indexes per collection, applied idempotently by ExpenseTrackerWebAppDB.ensure_indexes()
+INDEXES = {
+    "Transactions": [
+        # find({"username": ...}) sorted by (bookingDate, _id) for /dashboard and /transactions
+        IndexModel(
+            [("username", ASCENDING), ("bookingDate", DESCENDING), ("_id", DESCENDING)],
+            name="username_bookingDate",
+        ),
+    ],
+    "Users": [
+        # the {"email": ...} branch of the login $or (the _id branch uses _id_)
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # find_one({"gocardless_requisition.id": ...}) in the bank callback
+        IndexModel(
+            [("gocardless_requisition.id", ASCENDING)],
+            name="requisition_id",
+            sparse=True,
+        ),
+    ],
+    "Jobs": [
+        # orphan scan of JobQueue.recover_orphans
+        IndexModel([("status", ASCENDING), ("heartbeat", ASCENDING)], name="status_heartbeat"),
+        # finished jobs are removed JOB_RETENTION_SECONDS after their finishedAt
+        IndexModel(
+            [("finishedAt", ASCENDING)],
+            name="finishedAt_ttl",
+            expireAfterSeconds=JOB_RETENTION_SECONDS,
+        ),
+    ],
+    "Cache": [
+        # MongoCache entries are removed once their expiresAt has passed
+        IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+    ],
+    "MonthlyRollups": [
+        IndexModel(
+            [
+                ("username", ASCENDING),
+                ("month", ASCENDING),
+                ("category", ASCENDING),
+                ("transactionType", ASCENDING),
+            ],
+            name="rollup_bucket",
+            unique=True,
+        ),
+    ],
+}
+
+# Hot queries checked by ExpenseTrackerWebAppDB.explain_hot_queries():
+# name -> (collection, filter, sort)
+HOT_QUERIES = {
+    "transactions_by_user": (
+        "Transactions",
+        {"username": "__explain__"},
+        [("bookingDate", DESCENDING), ("_id", DESCENDING)],
+    ),
+    "login": (
+        "Users",
+        {"$or": [{"_id": "__explain__"}, {"email": "__explain__"}]},
+        None,
+    ),
+    "callback_requisition": ("Users", {"gocardless_requisition.id": "__explain__"}, None),
+    "rollups_by_user": (
+        "MonthlyRollups",
+        {"username": "__explain__", "count": {"$gt": 0}},
+        None,
+    ),
+}
+
+
+def plan_stages(plan: dict) -> list:
+    """Flattens the stage names of an explain() plan tree, e.g. ["FETCH", "IXSCAN"]."""
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+def content_hash(txn_dict: dict) -> str:
+    """Stable hash of a validated transaction's fields, stored as 'contentHash'."""
+    content = json.dumps(txn_dict, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def rollup_key(transaction_doc: dict) -> tuple:
+    """(month, category, transactionType) bucket of a stored transaction."""
+    return (
+        month_key(transaction_doc.get("bookingDate")),
+        transaction_doc.get("category") or "Uncategorized",
+        transaction_doc.get("transactionType"),
+    )
+
+
+def rollup_amount(transaction_doc: dict) -> float:
+    """
+    Unsigned amount of a stored transaction; its transactionType says which way it
+    went. Bank rows imported before prepare_bank_transaction stored expenses as
+    positive amounts still hold negative ones.
+    """
+    try:
+        return abs(float((transaction_doc.get("transactionAmount") or {}).get("amount") or 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rollup_deltas(old_docs: Iterable[dict] = (), new_docs: Iterable[dict] = ()) -> dict:
+    """
+    Returns {(username, month, category, transactionType): [total delta, count delta]}
+    for replacing 'old_docs' with 'new_docs'. Buckets that cancel out are dropped.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for sign, docs in ((-1, old_docs), (1, new_docs)):
+        for doc in docs:
+            if not doc:
+                continue
+            delta = deltas[(doc.get("username"), *rollup_key(doc))]
+            delta[0] += sign * rollup_amount(doc)
+            delta[1] += sign
+    return {key: d for key, d in deltas.items() if d[0] != 0 or d[1] != 0}
+
+
+def transaction_id_query(transaction_id) -> Union[dict, str, ObjectId]:
+    """
+    _id filter for a transaction id taken from a URL. Manual expenses have an
+    ObjectId _id and bank imports a string one, so a 24-hex id matches either.
+    """
+    if isinstance(transaction_id, str) and ObjectId.is_valid(transaction_id):
+        return {"$in": [ObjectId(transaction_id), transaction_id]}
+    return transaction_id
+
+
+def rollup_guard(old_doc: dict) -> dict:
+    """
+    Filter on the rollup fields of 'old_doc', so a bulk update/delete computed from
+    it only applies if nobody changed those fields in the meantime.
+    """
+    return {
+        "bookingDate": old_doc.get("bookingDate"),
+        "category": old_doc.get("category"),
+        "transactionType": old_doc.get("transactionType"),
+        "transactionAmount.amount": (old_doc.get("transactionAmount") or {}).get("amount"),
+    }
+
+
+def _id_variants(transaction_id) -> list:
+    """The _id values transaction_id_query() matches."""
+    query = transaction_id_query(transaction_id)
+    return query["$in"] if isinstance(query, dict) else [query]
+
+
+def batched(iterable: Iterable, batch_size: int):
+    """Yields (offset, list) chunks of at most 'batch_size' items from any iterable."""
+    iterator = iter(iterable)
+    for offset in count(0, batch_size):
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield offset, batch
+
+
+def encode_cursor(cursor: Optional[tuple]) -> Optional[str]:
+    """Encodes a (bookingDate, _id) page cursor as an opaque url-safe string."""
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json_util.dumps(list(cursor)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor(). Raises ValueError for malformed cursors."""
+    try:
+        booking_date, transaction_id = json_util.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return booking_date, transaction_id
 
 
 class MongoConnector(MyLogger):
-    def __init__(self, connection_string):
+    def __init__(self, connection_string, **client_options):
+        """
+        'client_options' are passed straight to MongoClient, e.g. maxPoolSize,
+        connectTimeoutMS or serverSelectionTimeoutMS. The client owns a connection
+        pool, so one connector should be created per process and shared.
+        """
         super().__init__(
             name="ExpenseTrackerWebApp", level="DEBUG", log_file="././logs.log"
         )
-        self.client = MongoClient(connection_string)
+        self.client = MongoClient(connection_string, **client_options)
         self.db = self.client.ExpenseTrackerWebApp
 
     @property
@@ -52,16 +295,129 @@ class ExpenseTrackerWebAppDB(MongoConnector):
                 date = dt.datetime.now()
         return date
 
-    def __init__(self, connection_string):
-        super().__init__(connection_string)
+    def __init__(self, connection_string, **client_options):
+        super().__init__(connection_string, **client_options)
         self.users = self.db.Users
         self.categories = self.db.Categories
+        # The category taxonomy is seeded once and read by every expense modal, so
+        # it is served from memory; see category_taxonomy()
+        self._taxonomy = CachedValue(self._load_taxonomy, ttl=300)
+        # Session principals by username, see load_principal(); None disables caching
+        self.principal_cache = LRUCache(maxsize=4096, ttl=60)
         self.transactions = self.db.Transactions
+        # Sums/counts per (username, month, category, transactionType), kept up to
+        # date by the transaction write methods below
+        self.monthly_rollups = self.db.MonthlyRollups
+        # Background jobs, see app/utils/jobs.py
+        self.jobs = self.db.Jobs
+        # Shared cache entries (app/utils/cache.py MongoCache)
+        self.cache = self.db.Cache
 
-    def upsert_user(self, username, name, email, password):
+    def ensure_indexes(self) -> list:
+        """
+        Creates every index in INDEXES. create_indexes is a no-op for indexes that
+        already exist with the same spec, so this is safe to run at every startup.
+        Returns the names of the indexes that are in place.
+        """
+        ensured = []
+        for collection_name, indexes in INDEXES.items():
+            try:
+                ensured += self.db[collection_name].create_indexes(indexes)
+            except OperationFailure as e:
+                # e.g. duplicate emails blocking the unique index; keep serving
+                self.logger.error(f"Failed to create indexes on {collection_name}: {e}")
+        return ensured
+
+    def explain_hot_queries(self) -> dict:
+        """
+        Runs explain() on every query in HOT_QUERIES.
+        Returns {name: [stages of the winning plan]}, e.g. {"login": ["SUBPLAN", "FETCH", "OR", "IXSCAN", "IXSCAN"]}.
+        """
+        plans = {}
+        for name, (collection_name, query, sort) in HOT_QUERIES.items():
+            cursor = self.db[collection_name].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            planner = cursor.explain()["queryPlanner"]
+            plans[name] = plan_stages(planner["winningPlan"])
+        return plans
+
+    def _load_taxonomy(self) -> dict:
+        categories = list(self.categories.find())
+        return {
+            "categories": categories,
+            "subcategories": {doc["_id"]: doc.get("subCategories", []) for doc in categories},
+            "etag": hashlib.sha1(
+                json.dumps(categories, sort_keys=True, default=str).encode()
+            ).hexdigest(),
+        }
+
+    def category_taxonomy(self) -> dict:
+        """
+        The Categories collection, cached in this process for 'taxonomy_ttl' seconds
+        (set by create_app from CATEGORIES_CACHE_TTL_SECONDS) and reloaded at once
+        after seed_categories()/delete_all_categories().
+
+        Return Example:
+            {"categories": [{"_id": "Food", "subCategories": ["Groceries", ...]}, ...],
+             "subcategories": {"Food": ["Groceries", ...], ...},
+             "etag": "3f7a..."}   # changes whenever the taxonomy does
+        """
+        return self._taxonomy.get()
+
+    @property
+    def taxonomy_ttl(self) -> Optional[float]:
+        return self._taxonomy.ttl
+
+    @taxonomy_ttl.setter
+    def taxonomy_ttl(self, ttl: Optional[float]):
+        self._taxonomy.ttl = ttl
+        self._taxonomy.invalidate()
+
+    def invalidate_taxonomy(self):
+        """Drops the cached taxonomy of this process; other processes reload it after their TTL."""
+        self._taxonomy.invalidate()
+
+    def seed_categories(self, categories: dict) -> int:
+        """
+        Inserts {category: [sub categories]} if the Categories collection is empty.
+        Returns the number of categories inserted.
+        """
+        if self.categories.count_documents({}, limit=1):
+            return 0
+        self.categories.insert_many(
+            [{"_id": name, "subCategories": sub_categories} for name, sub_categories in categories.items()]
+        )
+        self.invalidate_taxonomy()
+        return len(categories)
+
+    def load_principal(self, username: str) -> Optional[dict]:
+        """
+        The PRINCIPAL_PROJECTION fields of a user, for Flask-Login's user_loader.
+        Served from principal_cache, so authenticated requests don't query Users;
+        upsert_user/delete_user drop the entry in this process, other processes
+        see the change after the cache TTL. None if the user does not exist.
+        """
+        cache = self.principal_cache
+        principal = cache.get(username) if cache is not None else None
+        if principal is None:
+            principal = self.users.find_one({"_id": username}, PRINCIPAL_PROJECTION)
+            if principal is not None and cache is not None:
+                cache.set(username, principal)
+        return principal
+
+    def invalidate_principal(self, username: str):
+        if self.principal_cache is not None:
+            self.principal_cache.delete(username)
+
+    def upsert_user(self, username, name, email, password, password_hash=None):
+        """
+        Creates or replaces a user. 'password_hash' (e.g. from the app's
+        PasswordHasher pool) is stored as is; otherwise 'password' is hashed here.
+        """
         now = dt.datetime.now()
         user = User(
-            name=name, email=email, password=hash_password(password), groups=[]
+            name=name, email=email, password=password_hash or hash_password(password), groups=[]
         ).model_dump()
 
         self.users.update_one(
@@ -76,49 +432,627 @@ class ExpenseTrackerWebAppDB(MongoConnector):
             },
             upsert=True,
         )
+        self.invalidate_principal(username)
         return True
 
+    def create_user(self, username, name, email, password_hash):
+        """
+        Inserts a new user. Raises DuplicateKeyError if the username (_id) or the
+        email (unique index, see INDEXES) is taken, including by a concurrent signup.
+        """
+        now = dt.datetime.now()
+        user = User(name=name, email=email, password=password_hash, groups=[]).model_dump()
+        self.users.insert_one({"_id": username, **user, "createdDate": now, "updatedDate": now})
+        self.invalidate_principal(username)
+        return True
+
+    @staticmethod
+    def duplicate_user_field(error: DuplicateKeyError) -> str:
+        """"email" or "username", whichever of them 'error' (from create_user) is about."""
+        details = error.details or {}
+        key = details.get("keyPattern") or details.get("keyValue") or {}
+        if "email" in key or "email" in str(details.get("errmsg", error)):
+            return "email"
+        return "username"
+
     def upsert_transaction(self, transaction_doc: dict) -> bool:
         """
         Insert or update a transaction in the database based on new GoCardlessTransaction fields.
         'transaction_doc' should have the keys that match GoCardlessTransaction.
+        Returns False if the document does not validate.
+        """
+        return self.upsert_transactions([transaction_doc])["rejected"] == 0
+
+    @staticmethod
+    def transaction_unique_id(txn_model: GoCardlessTransaction, txn_dict: dict) -> str:
+        """
+        _id of an imported transaction: the bank's transactionId, else its
+        internalTransactionId, else a hash of the content so re-imports still match.
+        """
+        if txn_model.transactionId:
+            return txn_model.transactionId
+        if txn_model.internalTransactionId:
+            return txn_model.internalTransactionId
+        if txn_model.id:
+            return txn_model.id
+        return content_hash(txn_dict)
+
+    def upsert_transactions(self, transaction_docs: Iterable[dict], batch_size: int = 500) -> dict:
         """
+        Bulk version of upsert_transaction for bank imports. Per batch of 'batch_size'
+        documents this validates every doc, reads the stored contentHash of the existing
+        versions with one $in query, skips docs whose content did not change and sends
+        the rest as a single unordered bulk_write of upserts, followed by one
+        bulk_write for the rollups.
+
+        Return Example:
+            {"inserted": 120, "modified": 3, "unchanged": 877, "rejected": 1,
+             "errors": [{"index": 17, "error": "..."}]}
+        'index' is the position of the rejected doc in 'transaction_docs'.
+        """
+        counts = {"inserted": 0, "modified": 0, "unchanged": 0, "rejected": 0, "errors": []}
+        for offset, batch in batched(transaction_docs, batch_size):
+            self._upsert_transaction_batch(batch, offset, counts)
+        return counts
+
+    def _upsert_transaction_batch(self, batch: list, offset: int, counts: dict):
         now = dt.datetime.now()
 
-        txn_model = GoCardlessTransaction(**transaction_doc)
+        # 1) validate the whole batch at once; later duplicates of the same _id win
+        models, errors = validate_transactions(batch)
+        counts["rejected"] += len(errors)
+        counts["errors"] += [{**error, "index": error["index"] + offset} for error in errors]
+        models = [txn_model for txn_model in models if txn_model is not None]
+        # mode="json" stores bookingDate as "YYYY-MM-DD" (like add_expense does);
+        # BSON cannot encode a bare datetime.date
+        dumped = TRANSACTION_LIST_ADAPTER.dump_python(
+            models, by_alias=True, exclude_none=True, mode="json"
+        )
+        validated = {}
+        for txn_model, txn_dict in zip(models, dumped):
+            txn_dict.pop("_id", None)
+            validated[self.transaction_unique_id(txn_model, txn_dict)] = txn_dict
+        if not validated:
+            return
 
-        unique_id = None
-        if txn_model.transactionId:
-            unique_id = txn_model.transactionId
-        elif txn_model.internalTransactionId:
-            unique_id = txn_model.internalTransactionId
+        # 2) one round trip for the hashes (and rollup fields) of the current versions
+        existing = {
+            doc["_id"]: doc
+            for doc in self.transactions.find(
+                {"_id": {"$in": list(validated)}},
+                {**ROLLUP_PROJECTION, "username": 1, "contentHash": 1},
+            )
+        }
+
+        # 3) one unordered bulk_write for everything that changed
+        operations, old_docs, new_docs = [], [], []
+        for unique_id, txn_dict in validated.items():
+            old_doc = existing.get(unique_id)
+            txn_hash = content_hash(txn_dict)
+            if old_doc is not None and old_doc.get("contentHash") == txn_hash:
+                counts["unchanged"] += 1
+                continue
+            operations.append(
+                UpdateOne(
+                    {"_id": unique_id},
+                    {
+                        "$set": {**txn_dict, "contentHash": txn_hash, "updatedDate": now},
+                        "$setOnInsert": {"createdDate": now},
+                    },
+                    upsert=True,
+                )
+            )
+            old_docs.append(old_doc)
+            new_docs.append(txn_dict)
+        if not operations:
+            return
+
+        result = self.transactions.bulk_write(operations, ordered=False)
+        counts["inserted"] += result.upserted_count
+        counts["modified"] += result.modified_count
+        counts["unchanged"] += result.matched_count - result.modified_count
+
+        # 4) one bulk_write for the rollup deltas
+        self.apply_rollup_deltas(rollup_deltas(old_docs, new_docs))
+        self.bump_data_version(*(txn_dict.get("username") for txn_dict in new_docs))
+
+    def find_transactions_page(
+        self,
+        username: str,
+        limit: int = 50,
+        after: Optional[tuple] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        category: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        projection: Optional[dict] = None,
+    ) -> tuple:
+        """
+        One page of a user's transactions sorted by (bookingDate, _id) descending, with
+        pending transactions (no bookingDate) last. Uses keyset pagination: 'after' is
+        the (bookingDate, _id) of the last row of the previous page, so every page is
+        an index range scan no matter how deep it is. 'projection' limits the fields
+        returned (bookingDate and _id are always needed for the cursor).
+
+        Returns (docs, next_cursor) where next_cursor is None on the last page.
+        """
+        query = {"username": username}
+        if date_from or date_to:
+            query["bookingDate"] = {}
+            if date_from:
+                query["bookingDate"]["$gte"] = date_from
+            if date_to:
+                query["bookingDate"]["$lte"] = date_to
+        if category == "Uncategorized":
+            query["category"] = {"$in": [None, "", "Uncategorized"]}
+        elif category:
+            query["category"] = category
+        if transaction_type:
+            query["transactionType"] = transaction_type
+        if after is not None:
+            query = {"$and": [query, self._keyset_after(*after)]}
+
+        docs = list(
+            self.transactions.find(query, projection)
+            .sort([("bookingDate", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, (docs[-1].get("bookingDate"), docs[-1]["_id"])
+
+    @staticmethod
+    def _keyset_after(booking_date, transaction_id) -> dict:
+        """
+        Filter for rows that sort after (bookingDate, _id) in descending order.
+        _id is an ObjectId for manual expenses and a string for bank imports; in BSON
+        order strings sort below ObjectIds, and null bookingDates sort below dates.
+        """
+        if isinstance(transaction_id, ObjectId):
+            id_after = {
+                "$or": [{"_id": {"$lt": transaction_id}}, {"_id": {"$type": "string"}}]
+            }
         else:
-            # fallback? possibly user + bookingDate + something
-            unique_id = str(now.timestamp())
+            id_after = {"_id": {"$lt": transaction_id}}
+
+        if booking_date is None:
+            return {"$and": [{"bookingDate": None}, id_after]}
+        return {
+            "$or": [
+                {"bookingDate": {"$lt": booking_date}},
+                {"$and": [{"bookingDate": booking_date}, id_after]},
+                {"bookingDate": None},
+            ]
+        }
+
+    def _transaction_filter(self, transaction_id, username: Optional[str]) -> dict:
+        query = {"_id": transaction_id_query(transaction_id)}
+        if username is not None:
+            query["username"] = username
+        return query
+
+    def delete_transaction(self, transaction_id, username: Optional[str] = None) -> Optional[dict]:
+        """
+        Deletes a transaction (only if it belongs to 'username', when given) and
+        removes it from its rollup. Returns the old doc, or None if none matched.
+        """
+        old_doc = self.transactions.find_one_and_delete(
+            self._transaction_filter(transaction_id, username),
+            projection={**ROLLUP_PROJECTION, "username": 1},
+        )
+        if old_doc is not None:
+            self.apply_rollup_deltas(rollup_deltas(old_docs=[old_doc]))
+            self.bump_data_version(old_doc.get("username"))
+        return old_doc
+
+    def update_transaction(self, transaction_id, update_fields: dict, username: str) -> dict:
+        """
+        $sets 'update_fields' on one of the user's transactions, if the stored doc
+        with them merged in is a valid GoCardlessTransaction. The write itself is a
+        single find_one_and_update on {_id, username} that returns the doc it
+        replaced, so the rollup delta is taken from exactly what was overwritten,
+        even if another write got there between the validation read and the update.
+
+        Returns a result like apply_transaction_operations does for an update:
+        {"status": "updated" | "invalid" | "not_found" | "forbidden", "id": "..."},
+        plus "error" for "invalid".
+        """
+        query = self._transaction_filter(transaction_id, username)
+        result = {"status": "updated", "id": str(transaction_id)}
+        stored = self.transactions.find_one(query)
+        if stored is not None:
+            _, errors = validate_transactions([{**stored, **update_fields}])
+            if errors:
+                return {**result, "status": "invalid", "error": errors[0]["error"]}
+            stored = self.transactions.find_one_and_update(
+                query,
+                {"$set": {**update_fields, "updatedAt": dt.datetime.utcnow()}},
+                return_document=ReturnDocument.BEFORE,
+            )
+        if stored is None:
+            owner = self.transaction_owner(transaction_id)
+            return {**result, "status": "not_found" if owner is None else "forbidden"}
+        self.apply_rollup_deltas(rollup_deltas([stored], [{**stored, **update_fields}]))
+        self.bump_data_version(username)
+        return result
+
+    def data_version(self, username: str) -> int:
+        """
+        Counter bumped by every write to the user's transactions (see
+        bump_data_version); anything computed from them, like the /dashboard
+        payload, stays valid for as long as it is unchanged. 0 if never bumped.
+        """
+        doc = self.users.find_one({"_id": username}, {"_id": 0, "dataVersion": 1})
+        return (doc or {}).get("dataVersion", 0)
+
+    def bump_data_version(self, *usernames):
+        """
+        $inc the data version of the given users. Called after the write it
+        announces, so a reader that sees the new version also sees the new data.
+        """
+        usernames = {username for username in usernames if username}
+        if not usernames:
+            return None
+        return self.users.update_many(
+            {"_id": {"$in": list(usernames)}}, {"$inc": {"dataVersion": 1}}
+        )
+
+    def apply_transaction_operations(self, username: str, operations: list) -> list:
+        """
+        Applies a batch of operations on one user's transactions:
+            {"op": "create", "doc": {...}}
+            {"op": "update", "id": "...", "fields": {...}}   # $set on the stored doc
+            {"op": "delete", "id": "..."}
+        Every created doc, and every stored doc with its update merged in, is first
+        validated as a GoCardlessTransaction (validate_transactions, one call for the
+        batch); the ones that fail report "invalid" and are not written.
+        Creates and updates go in one unordered bulk_write. Updates are filtered on
+        {_id, username} plus the rollup fields read just before (rollup_guard), so
+        the rollup deltas stay exact even if a concurrent write got there first;
+        such operations report "conflict". Deletes are find_one_and_delete'd one by
+        one, like delete_transaction: a bulk delete only reports how many docs went,
+        not which, and two requests deleting the same doc would both decrement its
+        rollup. A delete whose doc is already gone reports "not_found".
+        Rollups and the data version are then updated once for the whole batch.
+
+        Returns one result per operation, in order, e.g.
+            [{"status": "created", "id": "65f1..."}, {"status": "updated", "id": "t1"},
+             {"status": "not_found", "id": "x"}, {"status": "forbidden", "id": "y"},
+             {"status": "invalid", "error": "transactionType: String should match ..."}]
+        with statuses created, updated, deleted, invalid, not_found, forbidden,
+        conflict and failed.
+        """
+        results = [None] * len(operations)
+        # BSON datetimes have millisecond precision; every update of this batch gets
+        # the same updatedAt, which tells afterwards which of them were applied
+        now = dt.datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+        # 1) one round trip for every targeted transaction: whole docs if some are
+        # updated (to validate them with the update merged in), else the rollup fields
+        targets = {str(op["id"]) for op in operations if op["op"] != "create"}
+        has_updates = any(op["op"] == "update" for op in operations)
+        old_docs = {}
+        if targets:
+            id_values = [value for target in targets for value in _id_variants(target)]
+            for doc in self.transactions.find(
+                {"_id": {"$in": id_values}, "username": username},
+                None if has_updates else {**ROLLUP_PROJECTION, "username": 1},
+            ):
+                old_docs[str(doc["_id"])] = doc
+            missing = targets - set(old_docs)
+            if missing:
+                # only now tell "not found" from "not yours"
+                id_values = [value for target in missing for value in _id_variants(target)]
+                foreign = {
+                    str(doc["_id"])
+                    for doc in self.transactions.find({"_id": {"$in": id_values}}, {"_id": 1})
+                }
+                for i, op in enumerate(operations):
+                    target = str(op.get("id"))
+                    if op["op"] != "create" and target in missing:
+                        status = "forbidden" if target in foreign else "not_found"
+                        results[i] = {"status": status, "id": target}
+
+        # 2) what would be stored must be a valid transaction
+        candidates, candidate_indexes = [], []
+        for i, op in enumerate(operations):
+            if results[i] is not None or op["op"] == "delete":
+                continue
+            if op["op"] == "create":
+                candidates.append({**op["doc"], "username": username})
+            else:
+                candidates.append({**old_docs[str(op["id"])], **op["fields"]})
+            candidate_indexes.append(i)
+        if candidates:
+            _, errors = validate_transactions(candidates)
+            for error in errors:
+                i = candidate_indexes[error["index"]]
+                results[i] = {"status": "invalid", "error": error["error"]}
+                if operations[i]["op"] == "update":
+                    results[i]["id"] = str(operations[i]["id"])
+
+        # 3) one unordered bulk_write for the creates and updates that can be applied,
+        # and one find_one_and_delete per delete, whose delta is the doc it removed
+        requests, request_ops, before = [], [], []
+        for i, op in enumerate(operations):
+            if results[i] is not None:
+                continue
+            if op["op"] == "delete":
+                removed = self.transactions.find_one_and_delete(
+                    {"_id": old_docs[str(op["id"])]["_id"], "username": username},
+                    projection={**ROLLUP_PROJECTION, "username": 1},
+                )
+                status = "not_found" if removed is None else "deleted"
+                results[i] = {"status": status, "id": str(op["id"])}
+                if removed is not None:
+                    before.append(removed)
+                continue
+            if op["op"] == "create":
+                doc = {**op["doc"], "_id": ObjectId(), "username": username, "createdAt": now}
+                op = {**op, "doc": doc}
+                requests.append(InsertOne(doc))
+            else:
+                old_doc = old_docs[str(op["id"])]
+                query = {"_id": old_doc["_id"], "username": username, **rollup_guard(old_doc)}
+                requests.append(UpdateOne(query, {"$set": {**op["fields"], "updatedAt": now}}))
+            request_ops.append((i, op))
+        if not requests:
+            self.apply_rollup_deltas(rollup_deltas(before))
+            if before:
+                self.bump_data_version(username)
+            return results
+
+        failed = {}
+        try:
+            result = self.transactions.bulk_write(requests, ordered=False)
+            counts = (result.inserted_count, result.matched_count)
+        except BulkWriteError as e:
+            failed = {error["index"]: error.get("errmsg") for error in e.details["writeErrors"]}
+            counts = (e.details["nInserted"], e.details["nMatched"])
+
+        # 4) which updates matched; only looked up if some did not
+        expected = tuple(
+            sum(1 for _, op in request_ops if op["op"] == kind) for kind in ("create", "update")
+        )
+        applied_updates = None
+        if counts != expected or failed:
+            ids = [old_docs[str(op["id"])]["_id"] for _, op in request_ops if op["op"] == "update"]
+            applied_updates = {
+                doc["_id"]
+                for doc in self.transactions.find({"_id": {"$in": ids}}, {"updatedAt": 1})
+                if doc.get("updatedAt") == now
+            }
+
+        # 5) results, rollups and data version for what was applied
+        after = []
+        for index, (i, op) in enumerate(request_ops):
+            if index in failed:
+                results[i] = {"status": "failed", "id": op.get("id"), "error": failed[index]}
+                continue
+            if op["op"] == "create":
+                results[i] = {"status": "created", "id": str(op["doc"]["_id"])}
+                after.append(op["doc"])
+                continue
+            old_doc = old_docs[str(op["id"])]
+            if applied_updates is not None and old_doc["_id"] not in applied_updates:
+                results[i] = {"status": "conflict", "id": str(op["id"])}
+                continue
+            before.append(old_doc)
+            after.append({**old_doc, **op["fields"]})
+            results[i] = {"status": "updated", "id": str(op["id"])}
+        self.apply_rollup_deltas(rollup_deltas(before, after))
+        if before or after:
+            self.bump_data_version(username)
+        return results
 
-        txn_dict = txn_model.model_dump(by_alias=True, exclude_none=True)
+    def transaction_owner(self, transaction_id) -> Optional[str]:
+        """
+        Username of a transaction, or None if it does not exist. Only needed after
+        an ownership-filtered write matched nothing, to pick 404 or 403.
+        """
+        doc = self.transactions.find_one(
+            {"_id": transaction_id_query(transaction_id)}, {"_id": 0, "username": 1}
+        )
+        return None if doc is None else doc.get("username") or ""
+
+    def apply_rollup_deltas(self, deltas: dict):
+        """$inc the MonthlyRollups buckets with the output of rollup_deltas()."""
+        if not deltas:
+            return None
+        operations = [
+            UpdateOne(
+                {
+                    "username": username,
+                    "month": month,
+                    "category": category,
+                    "transactionType": transaction_type,
+                },
+                {"$inc": {"total": total, "count": count}},
+                upsert=True,
+            )
+            for (username, month, category, transaction_type), (total, count) in deltas.items()
+        ]
+        return self.monthly_rollups.bulk_write(operations, ordered=False)
+
+    def rollup_chart_rows(self, username: str) -> list:
+        """
+        Expense totals per (month, category) read from MonthlyRollups, in the same
+        shape as aggregate_chart_data(). Costs O(months x categories x types).
+        """
+        totals = defaultdict(float)
+        for rollup in self.monthly_rollups.find(
+            {"username": username, "count": {"$gt": 0}},
+            {"_id": 0, "month": 1, "category": 1, "transactionType": 1, "total": 1},
+        ):
+            expenses = rollup["total"] if rollup["transactionType"] == "expense" else 0.0
+            totals[(rollup["month"], rollup["category"])] += expenses
+        return [
+            {"_id": {"month": month, "category": category}, "expenses": expenses}
+            for (month, category), expenses in sorted(totals.items())
+        ]
 
-        self.transactions.update_one(
-            {"_id": unique_id},
+    def compute_rollups(self, username: Optional[str] = None) -> dict:
+        """Recomputes rollups from Transactions: {(username, month, category, type): [total, count]}."""
+        query = {"username": username} if username else {}
+        return rollup_deltas(
+            new_docs=self.transactions.find(query, {**ROLLUP_PROJECTION, "username": 1})
+        )
+
+    def rebuild_rollups(self, username: Optional[str] = None) -> int:
+        """Replaces the stored rollups (of one user, or everyone) with recomputed ones."""
+        rollups = self.compute_rollups(username)
+        self.monthly_rollups.delete_many({"username": username} if username else {})
+        if rollups:
+            self.monthly_rollups.insert_many(
+                [
+                    {
+                        "username": user,
+                        "month": month,
+                        "category": category,
+                        "transactionType": transaction_type,
+                        "total": total,
+                        "count": count,
+                    }
+                    for (user, month, category, transaction_type), (total, count) in rollups.items()
+                ]
+            )
+        self.users.update_many(
+            {"_id": username} if username else {}, {"$inc": {"dataVersion": 1}}
+        )
+        return len(rollups)
+
+    def verify_rollups(self, username: Optional[str] = None, tolerance: float = 0.005) -> list:
+        """
+        Compares stored rollups with recomputed ones and returns the drifted buckets:
+            [{"key": (username, month, category, type), "expected": [total, count], "actual": [total, count]}]
+        """
+        expected = self.compute_rollups(username)
+        actual = {}
+        for rollup in self.monthly_rollups.find({"username": username} if username else {}):
+            key = (
+                rollup["username"],
+                rollup["month"],
+                rollup["category"],
+                rollup["transactionType"],
+            )
+            actual[key] = [rollup.get("total", 0.0), rollup.get("count", 0)]
+
+        drift = []
+        for key in expected.keys() | actual.keys():
+            exp = expected.get(key, [0.0, 0])
+            act = actual.get(key, [0.0, 0])
+            if exp[1] != act[1] or abs(exp[0] - act[0]) > tolerance:
+                drift.append({"key": key, "expected": exp, "actual": act})
+        return drift
+
+    def aggregate_chart_data(self, username: str) -> list:
+        """
+        Sums expense amounts per (month, category) for a user on the server, so only the
+        aggregated rows are sent back instead of every transaction.
+
+        Return Example:
+            [
+                {"_id": {"month": "2024-01", "category": "Food"}, "expenses": 54.2, "count": 7},
+                {"_id": {"month": "Pending", "category": "Uncategorized"}, "expenses": 0.0, "count": 1},
+            ]
+        Rows are sorted by month ("YYYY-MM", with "Pending" last) then category.
+        Categories that only have income rows are kept with expenses = 0.
+        """
+        booking_date_type = {"$type": "$bookingDate"}
+        month = {
+            "$switch": {
+                "branches": [
+                    {
+                        "case": {"$eq": [booking_date_type, "date"]},
+                        "then": {
+                            "$dateToString": {"format": "%Y-%m", "date": "$bookingDate"}
+                        },
+                    },
+                    {
+                        # short-circuits, so $strLenCP only sees strings
+                        "case": {
+                            "$and": [
+                                {"$eq": [booking_date_type, "string"]},
+                                {"$gte": [{"$strLenCP": "$bookingDate"}, 7]},
+                            ]
+                        },
+                        "then": {"$substrCP": ["$bookingDate", 0, 7]},
+                    },
+                ],
+                "default": "Pending",
+            }
+        }
+        category = {
+            "$cond": [
+                {"$eq": [{"$ifNull": ["$category", ""]}, ""]},
+                "Uncategorized",
+                "$category",
+            ]
+        }
+        # unsigned, like rollup_amount: older bank imports stored expenses negative
+        amount = {
+            "$abs": {
+                "$convert": {
+                    "input": "$transactionAmount.amount",
+                    "to": "double",
+                    "onError": 0.0,
+                    "onNull": 0.0,
+                }
+            }
+        }
+        pipeline = [
+            {"$match": {"username": username}},
             {
-                "$set": {**txn_dict, "updatedDate": now},
-                "$setOnInsert": {"createdDate": now},
+                "$group": {
+                    "_id": {"month": month, "category": category},
+                    "expenses": {
+                        "$sum": {
+                            "$cond": [
+                                {"$eq": ["$transactionType", "expense"]},
+                                amount,
+                                0.0,
+                            ]
+                        }
+                    },
+                    "count": {"$sum": 1},
+                }
             },
-            upsert=True,
+            {"$sort": {"_id.month": 1, "_id.category": 1}},
+        ]
+        return list(self.transactions.aggregate(pipeline))
+
+    def update_sync_state(self, username: str, account_id: str, sync_state: dict):
+        """
+        Stores the incremental sync watermark of one linked account under
+        gocardless_sync.<account_id> in the user doc, next to gocardless_requisition.
+        """
+        return self.users.update_one(
+            {"_id": username}, {"$set": {f"gocardless_sync.{account_id}": sync_state}}
         )
-        return True
 
     def delete_user(self, username):
-        return self.users.delete_one({"_id": username})
+        deleted = self.users.delete_one({"_id": username})
+        self.invalidate_principal(username)
+        return deleted
 
     def delete_all_users(self):
-        return self.users.delete_many({})
+        deleted = self.users.delete_many({})
+        if self.principal_cache is not None:
+            self.principal_cache.clear()
+        return deleted
 
     def delete_all_categories(self):
-        return self.categories.delete_many({})
+        deleted = self.categories.delete_many({})
+        self.invalidate_taxonomy()
+        return deleted
 
     def delete_all_transactions(self):
-        return self.transactions.delete_many({})
+        self.monthly_rollups.delete_many({})
+        deleted = self.transactions.delete_many({})
+        self.users.update_many({}, {"$inc": {"dataVersion": 1}})
+        return deleted
 
     def delete_all(self):
         self.delete_all_users()
@@ -0,0 +1,102 @@
+# backend/app/utils/password_hasher.py
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional, Tuple
+
+from app.utils._password_utils import DEFAULT_ITERATIONS, check_and_rehash, hash_password
+
+
+def _pool_context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # importing the hashing code runs app/__init__.py, so the server loads the app
+    # package (Flask, pymongo, ...) once, without calling create_app(): it has no
+    # MongoDB client or threads, and workers forked from it start with all of
+    # that already imported
+    context.set_forkserver_preload(["app.utils._password_utils"])
+    return context
+
+
+class HasherBusy(Exception):
+    """The hashing pool is full, or a hash did not finish within the timeout."""
+
+
+class PasswordHasher:
+    """
+    Runs PBKDF2 hashing (app/utils/_password_utils.py) on a bounded pool of
+    'max_workers' processes, so a burst of logins or signups can use at most that
+    many cores while request threads keep serving everything else.
+
+    At most 'max_queue' hashes wait for a free worker; beyond that, and when a hash
+    takes longer than 'timeout' seconds, calls raise HasherBusy right away and the
+    route answers 503 instead of tying up a request thread. max_workers=0 hashes in
+    the calling thread (no pool, no limit).
+
+    Workers are never forked from the app process: forking a process that has
+    other threads running (the MongoDB pool monitors, the job heartbeat) can leave
+    a child stuck on a lock one of those threads held. They come from a forkserver
+    that has imported _password_utils, and with it the app package but no app
+    instance (or are spawned where forkserver does not exist), and run its
+    module-level functions. Like any forkserver/spawn
+    worker they import the entry script as __mp_main__, so a script that builds
+    the app at import time must not do so then: run.py checks __name__, and other
+    scripts keep create_app() under `if __name__ == "__main__"` (or set
+    FLASK_PASSWORD_HASH_WORKERS=0 to hash in the calling thread).
+    """
+
+    def __init__(
+        self,
+        iterations: int = DEFAULT_ITERATIONS,
+        max_workers: int = 2,
+        max_queue: int = 16,
+        timeout: float = 5.0,
+    ):
+        self.iterations = iterations
+        self.timeout = timeout
+        self.rejected = 0
+        self.executor = None
+        if max_workers:
+            self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=_pool_context())
+            # a slot per running or queued hash, released when the hash finishes
+            # (not when the caller gives up waiting for it)
+            self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._rejected_lock = threading.Lock()
+
+    def _run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            self._reject()
+            raise HasherBusy("Too many password hashes queued")
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._reject()
+            raise HasherBusy(f"Password hash took longer than {self.timeout} seconds")
+
+    def _reject(self):
+        with self._rejected_lock:
+            self.rejected += 1
+
+    def hash(self, password: str) -> str:
+        """hash_password at the configured iterations."""
+        return self._run(hash_password, password, self.iterations)
+
+    def check(self, stored_password: str, provided_password: str) -> Tuple[bool, Optional[str]]:
+        """check_and_rehash at the configured iterations: (matched, new hash or None)."""
+        return self._run(check_and_rehash, stored_password, provided_password, self.iterations)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
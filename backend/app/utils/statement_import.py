@@ -0,0 +1,443 @@
+# backend/app/utils/statement_import.py
+
+import csv
+import datetime as dt
+import hashlib
+import io
+import json
+import re
+import time
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, Optional
+
+from app.utils.bank_import import prepare_bank_transaction
+from app.utils.mongodb_connector import batched
+
+FORMATS = ("csv", "ofx", "camt053")
+
+# CSV column mapping: GoCardlessTransaction field (or one of the helper keys below)
+# -> column header, matched case-insensitively. Helper keys:
+#   amount        signed amount ("-12.50" is an expense)
+#   debit/credit  unsigned amounts in two columns, instead of "amount"
+#   currency      defaults to the 'currency' option when absent
+#   counterparty  creditorName of expenses, debtorName of income
+#   creditorIban/debtorIban
+#   transactionId the bank's reference, used to recognise the row on re-import
+DEFAULT_CSV_MAPPING = {
+    "bookingDate": "date",
+    "amount": "amount",
+    "currency": "currency",
+    "counterparty": "counterparty",
+    "remittanceInformationUnstructured": "description",
+    "transactionId": "reference",
+}
+
+# Rejected rows listed in an import report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+_AMOUNT_JUNK = re.compile(r"[^\d,.\-+]")
+
+
+class StatementError(ValueError):
+    """The uploaded file cannot be read as the given format at all."""
+
+
+def detect_format(filename: Optional[str], head: bytes) -> str:
+    """The statement format from the file extension, else from its first bytes."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension in ("csv", "txt"):
+        return "csv"
+    if extension in ("ofx", "qfx"):
+        return "ofx"
+    if extension == "xml" or b"camt.053" in head:
+        return "camt053"
+    if b"OFXHEADER" in head or b"<OFX>" in head:
+        return "ofx"
+    return "csv"
+
+
+def parse_amount(value: str, decimal: str = ".") -> float:
+    """'1.234,56' (decimal=","), '-1,234.56', '(12.00)', '€ 12' -> float."""
+    original = value = value.strip()
+    negative = value.startswith("(") and value.endswith(")")
+    value = _AMOUNT_JUNK.sub("", value)
+    if decimal == ",":
+        value = value.replace(".", "").replace(",", ".")
+    else:
+        value = value.replace(",", "")
+    if not value:
+        raise ValueError(f"not an amount: {original!r}")
+    amount = float(value)
+    return -amount if negative else amount
+
+
+# Parsers. Each yields (row, transaction, error) per statement entry: 'row' is the
+# line (CSV) or entry number (OFX, CAMT) for the import report, 'transaction' is
+# GoCardlessTransaction-shaped with the bank's reference in 'transactionId', and
+# 'error' is set (and 'transaction' None) when the entry cannot be read.
+
+
+def parse_csv(
+    stream: BinaryIO,
+    mapping: Optional[dict] = None,
+    delimiter: str = ",",
+    date_format: str = "%Y-%m-%d",
+    decimal: str = ".",
+    currency: str = "EUR",
+    encoding: str = "utf-8-sig",
+) -> Iterator[tuple]:
+    """Reads a CSV statement with a header row, one row at a time."""
+    text = io.TextIOWrapper(stream, encoding=encoding, errors="replace", newline="")
+    try:
+        reader = csv.reader(text, delimiter=delimiter)
+    except TypeError as e:  # e.g. a delimiter of more than one character
+        raise StatementError(f"Invalid CSV options: {e}") from e
+    header = next(reader, None)
+    if not header:
+        raise StatementError("The CSV file is empty")
+    columns = {name.strip().lower(): index for index, name in enumerate(header)}
+    fields = {}
+    for field, column in (mapping or DEFAULT_CSV_MAPPING).items():
+        if column and column.strip().lower() in columns:
+            fields[field] = columns[column.strip().lower()]
+    if "bookingDate" not in fields or not (
+        "amount" in fields or "debit" in fields or "credit" in fields
+    ):
+        raise StatementError(
+            f"The CSV header {header} has no columns mapped to bookingDate and amount "
+            "(or debit/credit); pass a column mapping"
+        )
+    # the fixed per-file work happens once, the loop only indexes into each row
+    passthrough = [
+        (field, index)
+        for field, index in fields.items()
+        if field
+        in (
+            "transactionId",
+            "endToEndId",
+            "creditorName",
+            "debtorName",
+            "remittanceInformationUnstructured",
+            "proprietaryBankTransactionCode",
+            "category",
+            "sub_category",
+        )
+    ]
+
+    # statements list many entries per day: parse each distinct date string once
+    last_date = last_booking_date = None
+    for row in _csv_rows(reader):
+        line = reader.line_num
+        if not any(row):
+            continue
+        try:
+            values = {field: row[index].strip() for field, index in fields.items()}
+            if values.get("amount"):
+                amount = parse_amount(values["amount"], decimal)
+            elif values.get("debit") or values.get("credit"):
+                debit = values.get("debit")
+                credit = values.get("credit")
+                amount = parse_amount(credit, decimal) if credit else 0.0
+                if debit:
+                    amount -= abs(parse_amount(debit, decimal))
+            else:
+                raise ValueError("no amount")
+            if values["bookingDate"] != last_date:
+                last_booking_date = _parse_date(values["bookingDate"], date_format)
+                last_date = values["bookingDate"]
+            booking_date = last_booking_date
+        except (IndexError, ValueError) as e:
+            yield line, None, f"{type(e).__name__}: {e}"
+            continue
+
+        transaction = {
+            field: values[field] for field, _ in passthrough if values[field]
+        }
+        transaction["bookingDate"] = booking_date.isoformat()
+        transaction["transactionAmount"] = {
+            "amount": amount,
+            "currency": values.get("currency") or currency,
+        }
+        counterparty = values.get("counterparty")
+        if counterparty:
+            transaction["creditorName" if amount < 0 else "debtorName"] = counterparty
+        if values.get("creditorIban"):
+            transaction["creditorAccount"] = {"iban": values["creditorIban"]}
+        if values.get("debtorIban"):
+            transaction["debtorAccount"] = {"iban": values["debtorIban"]}
+        yield line, transaction, None
+
+
+def _parse_date(value: str, date_format: str) -> dt.date:
+    if date_format == "%Y-%m-%d" and len(value) == 10:
+        return dt.date.fromisoformat(value)
+    return dt.datetime.strptime(value, date_format).date()
+
+
+def _csv_rows(reader) -> Iterator[list]:
+    try:
+        yield from reader
+    except csv.Error as e:  # e.g. a field over csv.field_size_limit()
+        raise StatementError(f"Unreadable CSV at line {reader.line_num}: {e}") from e
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9._]+)[^>]*>([^<]*)")
+
+
+def _ofx_date(value: str) -> str:
+    # YYYYMMDD[HHMMSS[.XXX][TZ]]
+    return dt.date(int(value[0:4]), int(value[4:6]), int(value[6:8])).isoformat()
+
+
+def parse_ofx(stream: BinaryIO, chunk_size: int = 65536, encoding: str = "utf-8") -> Iterator[tuple]:
+    """
+    Reads the STMTTRN entries of an OFX statement, SGML (1.x, unclosed leaf tags)
+    or XML (2.x), with a tag scanner over fixed-size chunks.
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, errors="replace")
+    buffer = ""
+    context = {}  # CURDEF and ACCTID of the statement being read
+    transaction = None
+    entry = 0
+    saw_ofx = False
+    while True:
+        chunk = text.read(chunk_size)
+        buffer += chunk
+        # a tag's value runs up to the next "<", so the last tag is only complete
+        # once the next one has been read (or the file ended)
+        if chunk:
+            cut = buffer.rfind("<")
+            if cut == -1:  # e.g. the SGML header, nothing to scan yet
+                buffer = ""
+                continue
+            if cut == 0:
+                continue
+        else:
+            cut = len(buffer)
+        for closing, tag, value in _OFX_TAG.findall(buffer, 0, cut):
+            tag = tag.upper()
+            value = value.strip()
+            if tag == "OFX":
+                saw_ofx = True
+            if tag == "STMTTRN":
+                if not closing:
+                    transaction = {}
+                    continue
+                entry += 1
+                yield entry, *_ofx_transaction(transaction or {}, context)
+                transaction = None
+            elif not closing and value:
+                if transaction is not None:
+                    transaction[tag] = value
+                elif tag in ("CURDEF", "ACCTID"):
+                    context[tag] = value
+        buffer = buffer[cut:]
+        if not chunk:
+            break
+    if not saw_ofx:
+        raise StatementError("Not an OFX file (no <OFX> element)")
+
+
+def _ofx_transaction(fields: dict, context: dict) -> tuple:
+    try:
+        amount = float(fields["TRNAMT"].replace(",", "."))
+        booking_date = _ofx_date(fields["DTPOSTED"])
+    except (KeyError, ValueError) as e:
+        return None, f"{type(e).__name__}: {e}"
+    transaction = {
+        "bookingDate": booking_date,
+        "transactionAmount": {
+            "amount": amount,
+            "currency": fields.get("CURRENCY") or context.get("CURDEF") or "EUR",
+        },
+        "proprietaryBankTransactionCode": fields.get("TRNTYPE"),
+        "remittanceInformationUnstructured": fields.get("MEMO"),
+    }
+    if fields.get("FITID"):
+        # FITIDs are only unique per account
+        transaction["transactionId"] = f"{context.get('ACCTID', '')}:{fields['FITID']}"
+    name = fields.get("NAME") or fields.get("PAYEE")
+    if name:
+        transaction["creditorName" if amount < 0 else "debtorName"] = name
+    return transaction, None
+
+
+def parse_camt053(stream: BinaryIO) -> Iterator[tuple]:
+    """
+    Reads the Ntry (entry) elements of an ISO 20022 camt.053 bank statement, any
+    version. While an entry is parsed its leaf texts are collected by path (e.g.
+    "NtryDtls/TxDtls/RmtInf/Ustrd"), and the entry is dropped from the tree once
+    read, so memory stays flat however long the statement is.
+    """
+    path = []  # local names from the root to the current element
+    elements = []  # the elements on that path
+    stmt_depth = ntry_depth = None
+    fields = {}
+    iban = ""
+    entry = 0
+    try:
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                tag = element.tag
+                name = tag[tag.rfind("}") + 1 :]
+                path.append(name)
+                elements.append(element)
+                if name == "Stmt":
+                    stmt_depth, iban = len(path), ""
+                elif name == "Ntry" and ntry_depth is None:
+                    ntry_depth, fields = len(path), {}
+                continue
+
+            if ntry_depth is not None:
+                if len(path) == ntry_depth:
+                    entry += 1
+                    yield entry, *_camt_transaction(fields, iban)
+                    ntry_depth = None
+                    elements[-2].remove(element)
+                else:
+                    text = element.text
+                    if text and not text.isspace():
+                        # with several TxDtls (batch bookings) the first one wins
+                        fields.setdefault("/".join(path[ntry_depth:]), text.strip())
+                    if len(path) == ntry_depth + 1 and path[-1] == "Amt":
+                        fields["Amt@Ccy"] = element.get("Ccy")
+            elif stmt_depth is not None and element.text:
+                if "/".join(path[stmt_depth:]) in ("Acct/Id/IBAN", "Acct/Id/Othr/Id"):
+                    iban = element.text.strip()
+            path.pop()
+            elements.pop()
+    except ET.ParseError as e:
+        raise StatementError(f"Not a valid camt.053 file: {e}") from e
+    if stmt_depth is None:
+        raise StatementError("Not a camt.053 file (no Stmt element)")
+
+
+def _camt_transaction(fields: dict, iban: str) -> tuple:
+    try:
+        amount = float(fields["Amt"])
+    except (KeyError, ValueError):
+        return None, "Entry without a valid Amt"
+    if fields.get("CdtDbtInd") == "DBIT":
+        amount = -amount
+    booking_date = fields.get("BookgDt/Dt") or fields.get("BookgDt/DtTm", "")[:10]
+
+    details = "NtryDtls/TxDtls/"
+    parties = details + "RltdPties/"
+    transaction = {
+        "bookingDate": booking_date or None,
+        "transactionAmount": {"amount": amount, "currency": fields.get("Amt@Ccy") or "EUR"},
+        "endToEndId": fields.get(details + "Refs/EndToEndId"),
+        "debtorName": fields.get(parties + "Dbtr/Nm") or fields.get(parties + "Dbtr/Pty/Nm"),
+        "creditorName": fields.get(parties + "Cdtr/Nm") or fields.get(parties + "Cdtr/Pty/Nm"),
+        "remittanceInformationUnstructured": fields.get(details + "RmtInf/Ustrd")
+        or fields.get("AddtlNtryInf"),
+        "proprietaryBankTransactionCode": fields.get("BkTxCd/Prtry/Cd"),
+    }
+    debtor_iban = fields.get(parties + "DbtrAcct/Id/IBAN")
+    if debtor_iban:
+        transaction["debtorAccount"] = {"iban": debtor_iban}
+    creditor_iban = fields.get(parties + "CdtrAcct/Id/IBAN")
+    if creditor_iban:
+        transaction["creditorAccount"] = {"iban": creditor_iban}
+    reference = fields.get("AcctSvcrRef") or fields.get("NtryRef")
+    if reference:
+        transaction["transactionId"] = f"{iban}:{reference}"
+    return transaction, None
+
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "camt053": parse_camt053}
+
+
+class _ReferenceAssigner:
+    """
+    Gives every uploaded transaction an internalTransactionId that is stable across
+    re-imports of the same statement and cannot collide with other users' ids:
+    "upload:<username>:<format>:<bank reference>", or for entries without a
+    reference a hash of their content plus their occurrence on that date (so two
+    identical coffees on one day stay two transactions). Occurrences are only
+    counted within a run of entries with the same date, as statements are sorted
+    by date, which keeps memory constant.
+    """
+
+    def __init__(self, username: str, fmt: str, account: str = ""):
+        self.prefix = f"upload:{username}:{fmt}:"
+        self.account = account
+        self._date = None
+        self._seen = {}
+
+    def __call__(self, transaction: dict) -> dict:
+        reference = transaction.pop("transactionId", None)
+        if reference:
+            reference = f"{self.account}:{reference}" if self.account else reference
+        else:
+            if transaction.get("bookingDate") != self._date:
+                self._date = transaction.get("bookingDate")
+                self._seen.clear()
+            content = hashlib.sha1(
+                json.dumps(transaction, sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+            occurrence = self._seen.get(content, 0)
+            self._seen[content] = occurrence + 1
+            reference = f"{content}#{occurrence}"
+        transaction["internalTransactionId"] = self.prefix + reference
+        return transaction
+
+
+def import_statement(
+    mongo,
+    username: str,
+    stream: BinaryIO,
+    fmt: str,
+    batch_size: int = 1000,
+    account: str = "",
+    **options,
+) -> dict:
+    """
+    Stream-parses a statement file (see PARSERS; 'options' go to the parser, e.g.
+    mapping/delimiter/date_format/decimal/currency for CSV) and bulk upserts its
+    transactions 'batch_size' at a time through upsert_transactions, so memory is
+    bounded by one batch whatever the file size. Re-importing the same file
+    changes nothing (see _ReferenceAssigner). 'account' namespaces the bank
+    references of CSV files that cover several accounts.
+    Raises StatementError if the file cannot be read as 'fmt' at all.
+
+    Return Example:
+        {"format": "csv", "rows": 120000, "inserted": 119990, "modified": 0,
+         "unchanged": 0, "rejected": 10, "errors": [{"row": 57, "error": "..."}],
+         "elapsed_seconds": 4.1, "rows_per_second": 29268.3}
+    'errors' lists the first MAX_REPORTED_ERRORS rejected rows; 'rejected' counts all.
+    """
+    if fmt not in PARSERS:
+        raise StatementError(f"Unknown statement format {fmt!r}, expected one of {FORMATS}")
+    start = time.perf_counter()
+    assign_reference = _ReferenceAssigner(username, fmt, account)
+    report = {"format": fmt, "rows": 0, "inserted": 0, "modified": 0, "unchanged": 0, "rejected": 0}
+    errors = []
+
+    def reject(row, error):
+        report["rejected"] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row, "error": error})
+
+    for _, batch in batched(PARSERS[fmt](stream, **options), batch_size):
+        report["rows"] += len(batch)
+        rows, transactions = [], []
+        for row, transaction, error in batch:
+            if error:
+                reject(row, error)
+                continue
+            rows.append(row)
+            transactions.append(prepare_bank_transaction(assign_reference(transaction), username))
+        counts = mongo.upsert_transactions(transactions, batch_size=len(transactions) or 1)
+        for name in ("inserted", "modified", "unchanged"):
+            report[name] += counts[name]
+        for error in counts["errors"]:
+            reject(rows[error["index"]], error["error"])
+
+    elapsed = time.perf_counter() - start
+    return {
+        **report,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(report["rows"] / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,185 @@
+# backend/app/utils/sync_scheduler.py
+
+import datetime as dt
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.utils.bank_auth.gocardless_api import ApiClient
+from app.utils.bank_import import import_account
+
+
+def agreement_is_valid(agreement: Optional[dict], now: Optional[dt.datetime] = None) -> bool:
+    """
+    True if a stored gocardless_agreement was accepted and has not expired yet
+    (created + access_valid_for_days).
+    """
+    if not agreement or not agreement.get("accepted") or not agreement.get("created"):
+        return False
+    try:
+        created = dt.datetime.fromisoformat(agreement["created"].replace("Z", "+00:00"))
+        valid_days = int(agreement.get("access_valid_for_days") or 0)
+    except (TypeError, ValueError):
+        return False
+    now = now or dt.datetime.now(dt.timezone.utc)
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=dt.timezone.utc)
+    return created + dt.timedelta(days=valid_days) > now
+
+
+class Pacer:
+    """
+    Spreads calls evenly so at most 'requests_per_window' start per 'window_seconds',
+    i.e. one every window / requests seconds, instead of bursting the whole budget.
+    Thread safe; wait() blocks until the caller's slot.
+    """
+
+    def __init__(self, requests_per_window: int, window_seconds: float):
+        self.spacing = window_seconds / max(requests_per_window, 1)
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """Blocks until the next free slot. Returns the seconds spent waiting."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.spacing
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class SyncScheduler:
+    """
+    Periodically runs incremental imports for every user with a valid
+    gocardless_agreement and linked accounts.
+
+    Each run collects the accounts whose last sync (gocardless_sync.<id>.last_synced)
+    is older than 'interval_seconds', stalest first, interleaved so every user gets
+    their stalest account synced before anyone gets a second one. Imports then run
+    on at most 'max_concurrency' threads, started no faster than the Pacer allows;
+    the client's RateLimiter holds back any call whose endpoint quota is spent.
+    """
+
+    def __init__(
+        self,
+        mongo,
+        client_factory: Callable[[], ApiClient],
+        interval_seconds: float = 6 * 3600,
+        max_concurrency: int = 2,
+        requests_per_window: int = 30,
+        window_seconds: float = 60,
+        initial_days: int = 90,
+        overlap_days: int = 3,
+    ):
+        self.mongo = mongo
+        self.client = client_factory()
+        self.interval = dt.timedelta(seconds=interval_seconds)
+        self.max_concurrency = max_concurrency
+        self.pacer = Pacer(requests_per_window, window_seconds)
+        self.initial_days = initial_days
+        self.overlap_days = overlap_days
+        self._stopped = threading.Event()
+
+    def due_accounts(self, now: Optional[dt.datetime] = None) -> list:
+        """
+        [(username, account_id, sync_state)] that need a sync, in dispatch order.
+        """
+        now = now or dt.datetime.now()
+        per_user = []
+        for user_doc in self.mongo.users.find(
+            {
+                "gocardless_agreement.accepted": {"$nin": [None, ""]},
+                "gocardless_requisition.accounts.0": {"$exists": True},
+            },
+            {
+                "gocardless_agreement": 1,
+                "gocardless_requisition.accounts": 1,
+                "gocardless_sync": 1,
+            },
+        ):
+            if not agreement_is_valid(user_doc.get("gocardless_agreement")):
+                continue
+            sync = user_doc.get("gocardless_sync", {})
+            stale = []
+            for account_id in user_doc["gocardless_requisition"]["accounts"]:
+                state = sync.get(account_id, {})
+                last_synced = state.get("last_synced") or dt.datetime.min
+                if now - last_synced >= self.interval:
+                    stale.append((last_synced, user_doc["_id"], account_id, state))
+            if stale:
+                per_user.append(sorted(stale, key=lambda s: s[0]))
+
+        # round-robin over users: every user's stalest account, then their second, ...
+        ordered = []
+        for rank in range(max((len(accounts) for accounts in per_user), default=0)):
+            ordered += sorted(
+                (accounts[rank] for accounts in per_user if rank < len(accounts)),
+                key=lambda s: s[0],
+            )
+        return [(username, account_id, state) for _, username, account_id, state in ordered]
+
+    def run_once(self) -> dict:
+        """
+        Syncs every due account once. Returns {"synced": n, "failed": n, "throttled_seconds": s},
+        where throttled_seconds covers both pacing and waits for the GoCardless quota.
+        """
+        due = self.due_accounts()
+        stats = {"synced": 0, "failed": 0, "throttled_seconds": 0.0}
+        if not due:
+            return stats
+
+        today = dt.date.today()
+        date_from = (today - dt.timedelta(days=self.initial_days)).isoformat()
+        date_to = today.isoformat()
+        lock = threading.Lock()
+        throttled_before = self.client.throttled_seconds
+
+        def sync(username, account_id, state):
+            try:
+                import_account(
+                    self.client,
+                    self.mongo,
+                    username,
+                    account_id,
+                    date_from,
+                    date_to,
+                    sync_state=state,
+                    incremental=True,
+                    overlap_days=self.overlap_days,
+                )
+                outcome = "synced"
+            except Exception as e:
+                self.mongo.logger.error(f"Scheduled sync of {username}/{account_id} failed: {e}")
+                outcome = "failed"
+            with lock:
+                stats[outcome] += 1
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="bank-sync"
+        ) as pool:
+            for username, account_id, state in due:
+                if self._stopped.is_set():
+                    break
+                stats["throttled_seconds"] += self._wait_for_budget()
+                pool.submit(sync, username, account_id, state)
+        stats["throttled_seconds"] += self.client.throttled_seconds - throttled_before
+        return stats
+
+    def run_forever(self, poll_seconds: float = 60):
+        """Runs run_once() every 'poll_seconds' until stop() is called."""
+        while not self._stopped.is_set():
+            stats = self.run_once()
+            if stats["synced"] or stats["failed"]:
+                self.mongo.logger.info(f"Scheduled bank sync: {stats}")
+            self._stopped.wait(poll_seconds)
+
+    def stop(self):
+        self._stopped.set()
+
+    def _wait_for_budget(self) -> float:
+        """Waits for the pacing slot. Returns the seconds spent waiting."""
+        return self.pacer.wait()
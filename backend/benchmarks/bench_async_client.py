@@ -0,0 +1,77 @@
+# backend/benchmarks/bench_async_client.py
+"""
+Fan-out of get_transactions over many accounts: sync loop vs thread pool vs asyncio.
+
+Runs against benchmarks.mock_gocardless, so no credentials or network are needed.
+With per-request latency L and N accounts, the sync loop takes about N x L, while
+the thread pool and asyncio take about N / concurrency x L. asyncio does that on one
+thread instead of one thread per in-flight call.
+Usage:
+    cd backend
+    python -m benchmarks.bench_async_client --accounts 200 --latency 0.1 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.bank_auth.async_gocardless_api import AsyncApiClient, build_async_session
+from app.utils.bank_auth.gocardless_api import ApiClient
+from app.utils.bank_auth.http_session import build_session
+from app.utils.bank_auth.rate_limiter import RateLimiter
+from benchmarks.mock_gocardless import MockGoCardless
+
+
+def sync_client(url, concurrency):
+    return ApiClient(
+        url, "token", session=build_session(pool_maxsize=concurrency), limiter=RateLimiter()
+    )
+
+
+def run_sync(url, account_ids, concurrency):
+    client = sync_client(url, concurrency)
+    return [client.get_transactions(a) for a in account_ids]
+
+
+def run_threads(url, account_ids, concurrency):
+    client = sync_client(url, concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(client.get_transactions, account_ids))
+
+
+def run_async(url, account_ids, concurrency):
+    async def fan_out():
+        async with build_async_session(pool_maxsize=concurrency) as http_session:
+            client = AsyncApiClient(url, "token", http_session=http_session, limiter=RateLimiter())
+            return await asyncio.gather(*(client.get_transactions(a) for a in account_ids))
+
+    return asyncio.run(fan_out())
+
+
+def bench(label, fn, url, account_ids, concurrency):
+    start = time.perf_counter()
+    results = fn(url, account_ids, concurrency)
+    elapsed = time.perf_counter() - start
+    fetched = sum(len(r["transactions"]["booked"]) for r in results)
+    print(
+        f"{label:<8} {elapsed:8.2f} s   {len(account_ids) / elapsed:8.1f} accounts/s   "
+        f"{fetched / elapsed:10.0f} tx/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per mock response.")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=100, help="Per account.")
+    parser.add_argument("--skip-sync", action="store_true", help="Skip the sequential run.")
+    args = parser.parse_args()
+
+    account_ids = [f"acc-{i}" for i in range(args.accounts)]
+    with MockGoCardless(args.latency, args.transactions) as mock:
+        if not args.skip_sync:
+            bench("sync", run_sync, mock.url, account_ids, args.concurrency)
+        bench("threads", run_threads, mock.url, account_ids, args.concurrency)
+        bench("asyncio", run_async, mock.url, account_ids, args.concurrency)
@@ -0,0 +1,174 @@
+# backend/benchmarks/bench_bank_import.py
+"""
+End-to-end throughput of /banks/import against the local mock GoCardless server.
+
+Links a bench user to a requisition on benchmarks.mock_gocardless, then for each run
+POSTs /banks/import and polls /banks/jobs/<id> until the job finishes. Reports
+transactions/second, peak RSS of the process and MongoDB round trips per command
+and collection, counted with a pymongo CommandListener. The second run imports the
+same transactions again, so it shows the cost of an import that changes nothing.
+
+Needs a reachable MongoDB (FLASK_MONGODB_URI, FLASK_SECRET_KEY in .env). Usage:
+    cd backend
+    python -m benchmarks.bench_bank_import --accounts 4 --transactions 5000 --runs 2
+"""
+
+import argparse
+import datetime as dt
+import os
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+
+from pymongo import monitoring
+
+from benchmarks.mock_gocardless import MockGoCardless
+
+BENCH_USER = "bench_bank_import"
+BENCH_PASSWORD = "bench-password"
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts every command sent to MongoDB as (command, collection)."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else ""
+        with self._lock:
+            self.counts[(event.command_name, collection)] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self.counts)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def link_bench_user(app, mock_url):
+    """Creates the bench user with an accepted agreement and a linked requisition."""
+    from app.utils.bank_auth.gocardless_api import ApiClient
+
+    client = ApiClient(mock_url, "bench-token")
+    agreement = client.create_end_user_agreement(max_historical_days=365)
+    requisition = client.link_bank_account(open_browser=False)
+    agreement = client.get_agreement("agreements/enduser", agreement["id"])
+    app.mongo.upsert_user(
+        username=BENCH_USER, name="bench", email="bench_import@example.com", password=BENCH_PASSWORD
+    )
+    app.mongo.users.update_one(
+        {"_id": BENCH_USER},
+        {"$set": {"gocardless_agreement": agreement, "gocardless_requisition": requisition}},
+    )
+    return requisition["accounts"]
+
+
+def run_import(client, date_from, date_to, poll_interval):
+    resp = client.post("/banks/import", json={"date_from": date_from, "date_to": date_to})
+    assert resp.status_code == 202, resp.get_data(as_text=True)
+    job_id = resp.get_json()["job_id"]
+    while True:
+        job = client.get(f"/banks/jobs/{job_id}").get_json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(poll_interval)
+
+
+def main(args):
+    counter = RoundTripCounter()
+    monitoring.register(counter)  # before create_app, so the app's MongoClient picks it up
+
+    with MockGoCardless(
+        latency=args.latency,
+        transactions_per_account=args.transactions,
+        accounts_per_requisition=args.accounts,
+        rate_limit=args.rate_limit,
+        rate_limit_window=args.rate_limit_window,
+        error_rate=args.error_rate,
+    ) as mock:
+        os.environ["GOCARDLESS_BANK_ACCOUNT_INFO_BASE_URL"] = mock.url
+        os.environ["GOCARDLESS_ACCESS_TOKEN"] = "bench-token"
+
+        from app import create_app
+
+        app = create_app()
+        app.mongo.transactions.delete_many({"username": BENCH_USER})
+        app.mongo.delete_user(BENCH_USER)
+        account_ids = link_bench_user(app, mock.url)
+        client = app.test_client()
+        client.post("/login", json={"username_email": BENCH_USER, "password": BENCH_PASSWORD})
+
+        date_to = dt.date.today()
+        date_from = (date_to - dt.timedelta(days=365)).isoformat()
+        print(
+            f"{len(account_ids)} accounts x {args.transactions} transactions, "
+            f"{args.latency * 1000:.0f} ms latency, rate limit {args.rate_limit or 'off'}, "
+            f"429 rate {args.error_rate:.0%}"
+        )
+        try:
+            for run in range(1, args.runs + 1):
+                before = counter.snapshot()
+                mock_before = mock.stats()
+                start = time.perf_counter()
+                job = run_import(client, date_from, date_to.isoformat(), args.poll_interval)
+                elapsed = time.perf_counter() - start
+                round_trips = counter.snapshot() - before
+                mock_after = mock.stats()
+
+                if job["status"] != "done":
+                    print(f"run {run}: job failed: {job['error']}")
+                    continue
+                accounts = job["result"]["accounts"].values()
+                fetched = sum(a.get("fetched", 0) for a in accounts)
+                written = sum(a.get("inserted", 0) + a.get("modified", 0) for a in accounts)
+                print(
+                    f"run {run}: {elapsed:7.2f} s   {fetched / elapsed:9.0f} tx/s   "
+                    f"fetched {fetched}   written {written}   "
+                    f"throttled {job['result'].get('throttled_seconds', 0):.1f} s   "
+                    f"GoCardless requests {mock_after['requests'] - mock_before['requests']} "
+                    f"(429: {mock_after['rate_limited'] - mock_before['rate_limited']})   "
+                    f"peak RSS {peak_rss_mb():.0f} MB"
+                )
+                jobs_collection = app.mongo.jobs.name
+                import_trips = {
+                    key: n for key, n in round_trips.items() if key[1] != jobs_collection
+                }
+                print(
+                    f"        Mongo round trips: {sum(import_trips.values())} "
+                    f"(+{sum(round_trips.values()) - sum(import_trips.values())} on the job queue)"
+                )
+                for (command, collection), n in sorted(import_trips.items(), key=lambda kv: -kv[1]):
+                    print(f"          {n:6d}  {command} {collection}")
+        finally:
+            app.mongo.transactions.delete_many({"username": BENCH_USER})
+            app.mongo.rebuild_rollups(BENCH_USER)
+            app.mongo.delete_user(BENCH_USER)
+            app.jobs.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--transactions", type=int, default=2000, help="Per account.")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per mock response.")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests per window.")
+    parser.add_argument("--rate-limit-window", type=float, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 429s.")
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    main(parser.parse_args())
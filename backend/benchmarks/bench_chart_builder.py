@@ -0,0 +1,95 @@
+# backend/benchmarks/bench_chart_builder.py
+"""
+Micro-benchmark of the single-pass chart builder against the old nested loops
+(one pass per category for the pie, one per category per month for the bars).
+
+Per-row cost of build_chart_data should stay flat from 1k to 1M rows. The legacy
+loops are only run up to --legacy-max rows since they are O(categories x rows).
+Usage:
+    cd backend
+    python -m benchmarks.bench_chart_builder --rows 1000 100000 1000000
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from app.utils._constants import categories_dict
+from app.utils.chart_builder import build_chart_data, month_key
+
+
+def make_transactions(n, seed=42):
+    rng = random.Random(seed)
+    categories = list(categories_dict)
+    start = date(2020, 1, 1)
+    return [
+        {
+            "bookingDate": (start + timedelta(days=rng.randrange(5 * 365))).isoformat()
+            if rng.random() > 0.01
+            else "",
+            "amount": round(rng.uniform(1, 200), 2),
+            "transactionType": "expense" if rng.random() > 0.1 else "income",
+            "category": rng.choice(categories),
+        }
+        for _ in range(n)
+    ]
+
+
+def legacy_chart_data(transactions_for_frontend):
+    """The loops /dashboard used before chart_builder, kept here for comparison."""
+    expenses_by_month_category = defaultdict(lambda: defaultdict(list))
+    for txn in transactions_for_frontend:
+        date_str = txn["bookingDate"] or "Pending"
+        try:
+            month_year = datetime.strptime(date_str, "%Y-%m-%d").strftime("%B %Y")
+        except ValueError:
+            month_year = date_str
+        expenses_by_month_category[month_year][txn["category"]].append(txn)
+
+    categories_list = sorted(set(txn["category"] for txn in transactions_for_frontend))
+    amounts_list = []
+    for cat in categories_list:
+        total_for_cat = 0.0
+        for txn in transactions_for_frontend:
+            if txn["category"] == cat and txn["transactionType"] == "expense":
+                total_for_cat += float(txn["amount"])
+        amounts_list.append(total_for_cat)
+
+    dates_list = sorted(expenses_by_month_category.keys())
+    categoryData = []
+    for cat in categories_list:
+        dataset_values = []
+        for d in dates_list:
+            cat_sum = 0.0
+            for txn in expenses_by_month_category[d].get(cat, []):
+                if txn["transactionType"] == "expense":
+                    cat_sum += float(txn["amount"])
+            dataset_values.append(cat_sum)
+        categoryData.append({"label": cat, "data": dataset_values})
+    return {"categories": categories_list, "amounts": amounts_list}
+
+
+def timed(fn, rows):
+    start = time.perf_counter()
+    fn(rows)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'builder s':>10} {'us/row':>8} {'legacy s':>10} {'us/row':>8}")
+    for n in args.rows:
+        rows = make_transactions(n)
+        month_key.cache_clear()
+        builder_s = timed(build_chart_data, rows)
+        line = f"{n:>10} {builder_s:>10.3f} {builder_s / n * 1e6:>8.2f}"
+        if n <= args.legacy_max:
+            legacy_s = timed(legacy_chart_data, rows)
+            line += f" {legacy_s:>10.3f} {legacy_s / n * 1e6:>8.2f}"
+        print(line)
@@ -0,0 +1,143 @@
+# backend/benchmarks/bench_login.py
+"""
+Login throughput, and how much a login burst slows /dashboard down.
+
+Each scenario runs --threads concurrent clients that log in as bench users for
+--seconds, while one more client keeps fetching /dashboard. "inline" hashes in
+the request threads (PASSWORD_HASH_WORKERS=0, the old behaviour), "pool" on the
+PasswordHasher process pool. "stuffing" sends wrong passwords from a single IP;
+the LoginThrottle rejects them before hashing, so look at the 429s and their cost.
+
+Needs a reachable MongoDB (FLASK_MONGODB_URI, FLASK_SECRET_KEY in .env). Usage:
+    cd backend
+    python -m benchmarks.bench_login --threads 16 --workers 2 --seconds 10
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+
+from app import create_app
+from app.utils.login_throttle import LoginThrottle
+from app.utils.password_hasher import PasswordHasher
+
+BENCH_PREFIX = "bench_login_"
+BENCH_PASSWORD = "bench-password"
+DASHBOARD_USER = BENCH_PREFIX + "dashboard"
+
+
+def percentile(timings, q):
+    timings = sorted(timings)
+    return timings[max(int(len(timings) * q) - 1, 0)] if timings else float("nan")
+
+
+def login_loop(app, username, password, ip, stop, results):
+    client = app.test_client()
+    while not stop.is_set():
+        start = time.perf_counter()
+        resp = client.post(
+            "/login",
+            json={"username_email": username, "password": password},
+            environ_base={"REMOTE_ADDR": ip},
+        )
+        results.append((resp.status_code, (time.perf_counter() - start) * 1000))
+
+
+def dashboard_loop(app, stop, timings):
+    client = app.test_client()
+    client.post("/login", json={"username_email": DASHBOARD_USER, "password": BENCH_PASSWORD})
+    while not stop.is_set():
+        start = time.perf_counter()
+        # a fresh ETag-less request each time, so the payload is actually served
+        resp = client.get("/dashboard")
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+
+
+def run_scenario(app, label, threads, seconds, wrong_password=False):
+    stop = threading.Event()
+    results, dashboard = [], []
+    workers = [threading.Thread(target=dashboard_loop, args=(app, stop, dashboard))]
+    for i in range(threads):
+        username = f"{BENCH_PREFIX}{i}"
+        password = "wrong-password" if wrong_password else BENCH_PASSWORD
+        # one IP per client, except when stuffing (all from the same IP)
+        ip = "10.0.0.1" if wrong_password else f"10.0.{i // 250}.{i % 250 + 1}"
+        workers.append(
+            threading.Thread(target=login_loop, args=(app, username, password, ip, stop, results))
+        )
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    statuses = Counter(status for status, _ in results)
+    admitted = [ms for status, ms in results if status in (200, 401)]
+    rejected = [ms for status, ms in results if status in (429, 503)]
+    print(
+        f"{label:<9} {statuses[200] / seconds:8.1f} logins/s   "
+        f"status {dict(sorted(statuses.items()))}   "
+        f"hashed p50 {percentile(admitted, 0.5):7.1f} ms p95 {percentile(admitted, 0.95):7.1f} ms   "
+        f"rejected p95 {percentile(rejected, 0.95):6.2f} ms"
+    )
+    print(
+        f"{'':<9} /dashboard during the burst: {len(dashboard)} requests   "
+        f"p50 {statistics.median(dashboard) if dashboard else float('nan'):7.1f} ms   "
+        f"p95 {percentile(dashboard, 0.95):7.1f} ms"
+    )
+
+
+def main(args):
+    app = create_app()
+    # the throughput scenarios must not be throttled; stuffing uses the app's limits
+    unthrottled = LoginThrottle(max_failures_per_account=10**9, max_attempts_per_ip=10**9)
+    configured = app.login_throttle
+
+    hasher = app.password_hasher
+    app.mongo.upsert_user(
+        username=DASHBOARD_USER, name="bench", email="bench_login_dashboard@example.com",
+        password=BENCH_PASSWORD,
+    )
+    for i in range(args.threads):
+        app.mongo.upsert_user(
+            username=f"{BENCH_PREFIX}{i}", name="bench", email=f"bench_login_{i}@example.com",
+            password=BENCH_PASSWORD, password_hash=hasher.hash(BENCH_PASSWORD),
+        )
+    print(
+        f"{args.threads} clients, {args.seconds:.0f} s per scenario, "
+        f"{hasher.iterations} PBKDF2 iterations, pool of {args.workers}"
+    )
+    try:
+        app.login_throttle = unthrottled
+        app.password_hasher = PasswordHasher(iterations=hasher.iterations, max_workers=0)
+        run_scenario(app, "inline", args.threads, args.seconds)
+
+        app.password_hasher = PasswordHasher(
+            iterations=hasher.iterations,
+            max_workers=args.workers,
+            max_queue=args.max_queue,
+            timeout=app.config["PASSWORD_HASH_TIMEOUT_SECONDS"],
+        )
+        run_scenario(app, "pool", args.threads, args.seconds)
+
+        app.login_throttle = configured
+        run_scenario(app, "stuffing", args.threads, args.seconds, wrong_password=True)
+    finally:
+        app.password_hasher.shutdown()
+        hasher.shutdown()
+        app.mongo.users.delete_many({"_id": {"$regex": f"^{BENCH_PREFIX}"}})
+        app.jobs.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent login clients.")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing processes.")
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    main(parser.parse_args())
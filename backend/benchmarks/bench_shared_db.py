@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_shared_db.py
+"""
+Before/after latency of /dashboard and /add_expense.
+
+"before" reproduces the old behaviour where every handler called create_app(),
+i.e. a new MongoClient (TCP + auth handshake) and a count_documents on Categories
+per request. Only that connector setup is rebuilt: a whole create_app() would now
+also start a job heartbeat and a hashing pool each time and skew the numbers.
+"after" uses the process-wide current_app.mongo.
+
+Needs a reachable MongoDB (FLASK_MONGODB_URI, FLASK_SECRET_KEY in .env). Usage:
+    cd backend
+    python -m benchmarks.bench_shared_db --requests 200
+"""
+
+import argparse
+import statistics
+import time
+
+from flask import g
+
+from app import create_app
+from app.utils._constants import categories_dict
+from app.utils.mongodb_connector import ExpenseTrackerWebAppDB
+
+BENCH_USER = "bench_shared_db"
+BENCH_PASSWORD = "bench-password"
+
+
+def fresh_mongo(app) -> ExpenseTrackerWebAppDB:
+    """The per-request part of the old create_app(): a new client, then the Categories check."""
+    config = app.config
+    mongo = ExpenseTrackerWebAppDB(
+        config["MONGODB_URI"],
+        maxPoolSize=config["MONGODB_MAX_POOL_SIZE"],
+        minPoolSize=config["MONGODB_MIN_POOL_SIZE"],
+        connectTimeoutMS=config["MONGODB_CONNECT_TIMEOUT_MS"],
+        socketTimeoutMS=config["MONGODB_SOCKET_TIMEOUT_MS"],
+        serverSelectionTimeoutMS=config["MONGODB_SERVER_SELECTION_TIMEOUT_MS"],
+    )
+    mongo.seed_categories(categories_dict)
+    return mongo
+
+
+def install_per_request_app(app):
+    """Swap app.mongo for a freshly built handle on every request."""
+
+    @app.before_request
+    def _fresh_app():
+        g.previous_mongo = app.mongo
+        app.mongo = fresh_mongo(app)
+
+    @app.teardown_request
+    def _restore_app(exc):
+        fresh = app.mongo
+        app.mongo = g.pop("previous_mongo", fresh)
+        if fresh is not app.mongo:
+            fresh.close()
+
+
+def time_requests(client, n, method, url, **kwargs):
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        resp = getattr(client, method)(url, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+    return timings
+
+
+def summarize(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<28} mean {statistics.mean(timings):8.2f} ms   "
+        f"p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms"
+    )
+
+
+def run(mode, n):
+    app = create_app()
+    if mode == "before":
+        install_per_request_app(app)
+
+    app.mongo.upsert_user(
+        username=BENCH_USER, name="bench", email="bench@example.com", password=BENCH_PASSWORD
+    )
+    client = app.test_client()
+    client.post("/login", json={"username_email": BENCH_USER, "password": BENCH_PASSWORD})
+
+    expense = {
+        "username": BENCH_USER,
+        "transactionType": "expense",
+        "amount": "12.50",
+        "bookingDate": "2024-01-15",
+        "category": "Food",
+        "sub_category": "Groceries",
+    }
+    try:
+        summarize(f"{mode} /add_expense", time_requests(client, n, "post", "/add_expense", json=expense))
+        summarize(f"{mode} /dashboard", time_requests(client, n, "get", "/dashboard"))
+    finally:
+        app.mongo.transactions.delete_many({"username": BENCH_USER})
+        app.mongo.delete_user(BENCH_USER)
+        app.password_hasher.shutdown()
+        app.jobs.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--mode", choices=["before", "after", "both"], default="both")
+    args = parser.parse_args()
+
+    for mode in ["before", "after"] if args.mode == "both" else [args.mode]:
+        run(mode, args.requests)
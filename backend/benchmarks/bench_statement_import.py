@@ -0,0 +1,170 @@
+# backend/benchmarks/bench_statement_import.py
+"""
+Throughput and memory of statement file imports (CSV, OFX, CAMT.053).
+
+Writes a synthetic statement of --rows entries per format to a temporary file,
+then measures
+  parse:  the streaming parser alone (rows/s, tracemalloc peak), no MongoDB needed
+  import: POST /expenses/import through the Flask test client, reporting the
+          endpoint's rows/s and rejects, plus the peak RSS of the process
+The second import of the same file shows the cost of a re-upload that changes nothing.
+
+The import needs a reachable MongoDB (FLASK_MONGODB_URI, FLASK_SECRET_KEY in .env). Usage:
+    cd backend
+    python -m benchmarks.bench_statement_import --rows 100000
+    python -m benchmarks.bench_statement_import --rows 100000 --parse-only
+"""
+
+import argparse
+import datetime as dt
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app.utils.statement_import import PARSERS
+
+BENCH_USER = "bench_statement_import"
+BENCH_PASSWORD = "bench-password"
+MERCHANTS = ["Albert Heijn", "NS Reizigers", "Coffee Company", "Bol.com", "Shell", "Employer BV"]
+
+
+def synthetic_entries(rows: int, seed: int = 7):
+    """(date, amount, merchant, reference) per entry, oldest first, ending yesterday."""
+    rng = random.Random(seed)
+    start = dt.date.today() - dt.timedelta(days=max(rows // 40, 1) + 1)
+    for i in range(rows):
+        date = start + dt.timedelta(days=i // 40)
+        merchant = rng.choice(MERCHANTS)
+        amount = round(rng.uniform(1000, 3000), 2) if merchant == "Employer BV" else -round(rng.uniform(1, 150), 2)
+        yield date, amount, merchant, f"REF{i:09d}"
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("date,amount,currency,counterparty,description,reference\n")
+        for date, amount, merchant, reference in synthetic_entries(rows):
+            f.write(f"{date.isoformat()},{amount:.2f},EUR,{merchant},Card payment {merchant},{reference}\n")
+
+
+def write_ofx(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>\n")
+        f.write("<CURDEF>EUR\n<BANKACCTFROM><BANKID>BENCH<ACCTID>NL00BENCH0123456789</BANKACCTFROM>\n<BANKTRANLIST>\n")
+        for date, amount, merchant, reference in synthetic_entries(rows):
+            f.write(
+                f"<STMTTRN><TRNTYPE>{'CREDIT' if amount > 0 else 'DEBIT'}<DTPOSTED>{date:%Y%m%d}120000"
+                f"<TRNAMT>{amount:.2f}<FITID>{reference}<NAME>{merchant}<MEMO>Card payment</STMTTRN>\n"
+            )
+        f.write("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+
+
+def write_camt053(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"><BkToCstmrStmt>'
+            "<Stmt><Id>BENCH</Id><Acct><Id><IBAN>NL00BENCH0123456789</IBAN></Id></Acct>\n"
+        )
+        for date, amount, merchant, reference in synthetic_entries(rows):
+            party = "Dbtr" if amount > 0 else "Cdtr"
+            f.write(
+                f'<Ntry><Amt Ccy="EUR">{abs(amount):.2f}</Amt>'
+                f"<CdtDbtInd>{'CRDT' if amount > 0 else 'DBIT'}</CdtDbtInd><Sts>BOOK</Sts>"
+                f"<BookgDt><Dt>{date.isoformat()}</Dt></BookgDt><AcctSvcrRef>{reference}</AcctSvcrRef>"
+                f"<NtryDtls><TxDtls><RltdPties><{party}><Nm>{merchant}</Nm></{party}></RltdPties>"
+                f"<RmtInf><Ustrd>Card payment</Ustrd></RmtInf></TxDtls></NtryDtls></Ntry>\n"
+            )
+        f.write("</Stmt></BkToCstmrStmt></Document>\n")
+
+
+WRITERS = {"csv": write_csv, "ofx": write_ofx, "camt053": write_camt053}
+EXTENSIONS = {"csv": "csv", "ofx": "ofx", "camt053": "xml"}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def bench_parse(fmt, path):
+    # timed and traced in separate passes, tracemalloc slows the parsers several times over
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        rows = sum(1 for _ in PARSERS[fmt](f))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    with open(path, "rb") as f:
+        for _ in PARSERS[fmt](f):
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(
+        f"parse  {fmt:<8} {rows:8d} rows   {size_mb:6.1f} MB file   {rows / elapsed:9.0f} rows/s   "
+        f"peak traced memory {peak / (1024 * 1024):5.2f} MB"
+    )
+
+
+def bench_import(client, fmt, path, run):
+    with open(path, "rb") as f:
+        start = time.perf_counter()
+        resp = client.post(
+            "/expenses/import",
+            data={"file": (f, os.path.basename(path)), "format": fmt},
+            content_type="multipart/form-data",
+        )
+        elapsed = time.perf_counter() - start
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    report = resp.get_json()
+    print(
+        f"import {fmt:<8} run {run}: {report['rows']:8d} rows in {elapsed:6.2f} s   "
+        f"{report['rows_per_second']:9.0f} rows/s   inserted {report['inserted']}   "
+        f"unchanged {report['unchanged']}   rejected {report['rejected']}   "
+        f"peak RSS {peak_rss_mb():.0f} MB"
+    )
+
+
+def main(args):
+    formats = args.formats.split(",")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for fmt in formats:
+            paths[fmt] = os.path.join(tmp, f"statement.{EXTENSIONS[fmt]}")
+            WRITERS[fmt](paths[fmt], args.rows)
+        for fmt in formats:
+            bench_parse(fmt, paths[fmt])
+        if args.parse_only:
+            return
+
+        from app import create_app
+
+        app = create_app()
+        app.mongo.upsert_user(
+            username=BENCH_USER, name="bench", email="bench_statement@example.com",
+            password=BENCH_PASSWORD,
+        )
+        client = app.test_client()
+        client.post("/login", json={"username_email": BENCH_USER, "password": BENCH_PASSWORD})
+        try:
+            for fmt in formats:
+                for run in (1, 2):
+                    bench_import(client, fmt, paths[fmt], run)
+        finally:
+            app.mongo.transactions.delete_many({"username": BENCH_USER})
+            app.mongo.rebuild_rollups(BENCH_USER)
+            app.mongo.delete_user(BENCH_USER)
+            app.password_hasher.shutdown()
+            app.jobs.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--formats", default="csv,ofx,camt053")
+    parser.add_argument("--parse-only", action="store_true", help="Skip the MongoDB import.")
+    main(parser.parse_args())
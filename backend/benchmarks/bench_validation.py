@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_validation.py
+"""
+Per-row cost of validating transactions one model at a time vs validate_transactions.
+
+"per-row" is the old path: GoCardlessTransaction(**doc) in a try/except per doc
+(with a date.today() per row in check_booking_date), then model_dump per model.
+"batched" validates each batch with the cached TypeAdapter(list[GoCardlessTransaction])
+and one "today", then dumps the batch in one call, as upsert_transactions does.
+--invalid-share of the rows fail validation, which exercises the batched error path.
+
+The generated input is moved out of the cyclic GC (gc.freeze) before timing. A
+streaming import never holds the whole input at once. Without the freeze, each
+collection triggered by a batch's live models rescans all 100k input rows, and
+that cost would swamp the validation cost being measured.
+Usage:
+    cd backend
+    python -m benchmarks.bench_validation --rows 100000 --batch-size 500
+"""
+
+import argparse
+import gc
+import random
+import time
+from datetime import date, timedelta
+
+from pydantic import ValidationError
+
+from app.models.transactions import (
+    TRANSACTION_LIST_ADAPTER,
+    GoCardlessTransaction,
+    validate_transactions,
+)
+
+
+def make_docs(n, invalid_share, seed=42):
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    docs = []
+    for i in range(n):
+        doc = {
+            "transactionId": f"txn-{i}",
+            "bookingDate": (start + timedelta(days=rng.randrange(5 * 365))).isoformat(),
+            "transactionAmount": {"amount": f"{rng.uniform(-200, 200):.2f}", "currency": "EUR"},
+            "creditorName": f"Shop {rng.randrange(50)}",
+            "remittanceInformationUnstructured": f"Purchase {i}",
+            "transactionType": rng.choice(["expense", "income"]),
+            "category": "Food",
+            "sub_category": "Groceries",
+            "username": "bench",
+        }
+        if rng.random() < invalid_share:
+            doc["transactionType"] = "refund"
+        docs.append(doc)
+    return docs
+
+
+def per_row(docs, dump):
+    rejected = 0
+    for doc in docs:
+        try:
+            model = GoCardlessTransaction(**doc)
+        except ValidationError:
+            rejected += 1
+            continue
+        if dump:
+            model.model_dump(by_alias=True, exclude_none=True, mode="json")
+    return rejected
+
+
+def batched_path(docs, dump, batch_size):
+    rejected = 0
+    for start in range(0, len(docs), batch_size):
+        models, errors = validate_transactions(docs[start : start + batch_size])
+        rejected += len(errors)
+        if dump:
+            TRANSACTION_LIST_ADAPTER.dump_python(
+                [m for m in models if m is not None], by_alias=True, exclude_none=True, mode="json"
+            )
+    return rejected
+
+
+def bench(label, fn, n):
+    gc.collect()
+    start = time.perf_counter()
+    rejected = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.3f} s   {elapsed / n * 1e6:7.2f} us/row   rejected {rejected}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--invalid-share", type=float, default=0.01)
+    args = parser.parse_args()
+
+    docs = make_docs(args.rows, args.invalid_share)
+    gc.freeze()
+    for dump in (False, True):
+        suffix = " + dump" if dump else ""
+        bench(f"per-row{suffix}", lambda: per_row(docs, dump), args.rows)
+        bench(
+            f"batched{suffix}",
+            lambda: batched_path(docs, dump, args.batch_size),
+            args.rows,
+        )
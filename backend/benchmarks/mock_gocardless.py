@@ -0,0 +1,378 @@
+# backend/benchmarks/mock_gocardless.py
+"""
+Local stand-in for the GoCardless Bank Account Data API, so bank code paths can be
+run and benchmarked without credentials.
+
+Implements token/new, token/refresh, agreements/enduser (create, get),
+requisitions (create, get, delete) and accounts/{id}/transactions. Latency,
+rate limits and 429 injection are configurable, and transactions are generated
+per account, so any volume can be served. Rate-limit headers use GoCardless'
+names: http_x_ratelimit_* for the general quota, and
+http_x_ratelimit_account_success_* for each account's transactions quota.
+
+Run standalone and point the backend at it:
+    cd backend
+    python -m benchmarks.mock_gocardless --port 8001 --transactions 5000 --rate-limit 10
+    GOCARDLESS_BANK_ACCOUNT_INFO_BASE_URL=http://127.0.0.1:8001/ python run.py
+"""
+
+import argparse
+import datetime as dt
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def synthetic_transactions(
+    account_id: str, n: int, date_from=None, date_to=None, pending: int = 2
+) -> dict:
+    """
+    n booked transactions for 'account_id', spread over the year up to today,
+    newest first, plus 'pending' pending ones. Deterministic per account, so
+    repeated imports see the same transactionIds. Filtered to date_from..date_to.
+    """
+    rng = random.Random(account_id)
+    today = dt.date.today()
+    date_from = dt.date.fromisoformat(date_from) if date_from else None
+    date_to = dt.date.fromisoformat(date_to) if date_to else None
+    booked = []
+    for i in range(n):
+        day = today - dt.timedelta(days=i * 365 // max(n, 1))
+        if (date_from and day < date_from) or (date_to and day > date_to):
+            continue
+        income = rng.random() < 0.1
+        amount = rng.uniform(500, 3000) if income else -rng.uniform(1, 200)
+        booked.append(
+            {
+                "transactionId": f"{account_id}-{i}",
+                "bookingDate": day.isoformat(),
+                "valueDate": day.isoformat(),
+                "transactionAmount": {"amount": f"{amount:.2f}", "currency": "EUR"},
+                "debtorName" if income else "creditorName": f"Party {rng.randrange(50)}",
+                "remittanceInformationUnstructured": f"Transaction {i}",
+                "bankTransactionCode": "PMNT",
+            }
+        )
+    return {
+        "transactions": {
+            "booked": booked,
+            "pending": [
+                {
+                    "valueDate": today.isoformat(),
+                    "transactionAmount": {"amount": f"-{j + 1}.00", "currency": "EUR"},
+                    "remittanceInformationUnstructured": f"Pending {account_id} {j}",
+                }
+                for j in range(pending)
+            ],
+        }
+    }
+
+
+class QuotaWindow:
+    """Fixed-window request quota: 'limit' requests per 'window' seconds."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.used = 0
+        self.started = time.monotonic()
+
+    def take(self):
+        """Returns (allowed, remaining, reset_seconds)."""
+        now = time.monotonic()
+        if now - self.started >= self.window:
+            self.used, self.started = 0, now
+        reset = max(int(self.started + self.window - now + 0.999), 1)
+        if self.used >= self.limit:
+            return False, 0, reset
+        self.used += 1
+        return True, self.limit - self.used, reset
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default of 5 drops concurrent connects into SYN retries
+
+
+class MockGoCardless:
+    """
+    Args:
+      latency (float): Seconds every response is delayed by.
+      jitter (float): Extra random delay of up to this many seconds.
+      transactions_per_account (int): Booked transactions generated per account.
+      accounts_per_requisition (int): Accounts a created requisition links.
+      rate_limit (int, optional): Requests allowed per 'rate_limit_window' seconds,
+        per account for transactions and shared by everything else. None disables it.
+      error_rate (float): Probability of answering any request with a 429.
+
+    Usage:
+        with MockGoCardless(latency=0.1, rate_limit=10) as mock:
+            client = ApiClient(mock.url, "token")
+            mock.stats()  # {"requests": ..., "rate_limited": ..., "by_route": {...}}
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.1,
+        transactions_per_account: int = 100,
+        jitter: float = 0.0,
+        accounts_per_requisition: int = 2,
+        rate_limit: int = None,
+        rate_limit_window: float = 60,
+        error_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.transactions_per_account = transactions_per_account
+        self.accounts_per_requisition = accounts_per_requisition
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.error_rate = error_rate
+        self.agreements = {}
+        self.requisitions = {}
+        self.by_route = Counter()
+        self.rate_limited = 0
+        self._quotas = {}
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self._routes = [
+            ("POST", re.compile(r"^/token/new/?$"), self.new_token),
+            ("POST", re.compile(r"^/token/refresh/?$"), self.refresh_token),
+            ("POST", re.compile(r"^/agreements/enduser/?$"), self.create_agreement),
+            ("GET", re.compile(r"^/agreements/enduser/([^/]+)/?$"), self.get_agreement),
+            ("POST", re.compile(r"^/requisitions/?$"), self.create_requisition),
+            ("GET", re.compile(r"^/requisitions/([^/]+)/?$"), self.get_requisition),
+            ("DELETE", re.compile(r"^/requisitions/([^/]+)/?$"), self.delete_requisition),
+            ("GET", re.compile(r"^/accounts/([^/]+)/transactions/?$"), self.transactions),
+        ]
+        self._server = _Server((host, port), self._handler())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": sum(self.by_route.values()),
+                "rate_limited": self.rate_limited,
+                "by_route": dict(self.by_route),
+            }
+
+    # Endpoints: (body, query) -> (status, response body)
+
+    def new_token(self, body, query):
+        if not body.get("secret_id") or not body.get("secret_key"):
+            return 401, {"summary": "Authentication failed", "status_code": 401}
+        return 200, {
+            "access": uuid.uuid4().hex,
+            "access_expires": 86400,
+            "refresh": uuid.uuid4().hex,
+            "refresh_expires": 2592000,
+        }
+
+    def refresh_token(self, body, query):
+        if not body.get("refresh"):
+            return 401, {"summary": "Authentication failed", "status_code": 401}
+        return 200, {"access": uuid.uuid4().hex, "access_expires": 86400}
+
+    def create_agreement(self, body, query):
+        agreement = {
+            "id": str(uuid.uuid4()),
+            "created": dt.datetime.now(dt.timezone.utc).isoformat().replace("+00:00", "Z"),
+            "institution_id": body.get("institution_id", "SANDBOXFINANCE_SFIN0000"),
+            "max_historical_days": int(body.get("max_historical_days", 90)),
+            "access_valid_for_days": int(body.get("access_valid_for_days", 90)),
+            "access_scope": body.get("access_scope", ["balances", "details", "transactions"]),
+            "accepted": "",
+        }
+        self.agreements[agreement["id"]] = agreement
+        return 201, agreement
+
+    def get_agreement(self, body, query, agreement_id):
+        agreement = self.agreements.get(agreement_id)
+        if agreement is None:
+            return 404, {"summary": "Not found.", "status_code": 404}
+        # the end user accepts the agreement when they first open the link
+        agreement["accepted"] = agreement["accepted"] or agreement["created"]
+        return 200, agreement
+
+    def create_requisition(self, body, query):
+        requisition_id = str(uuid.uuid4())
+        requisition = {
+            "id": requisition_id,
+            "created": dt.datetime.now(dt.timezone.utc).isoformat().replace("+00:00", "Z"),
+            "redirect": body.get("redirect"),
+            "status": "LN",
+            "institution_id": body.get("institution_id"),
+            "agreement": body.get("agreement"),
+            "reference": body.get("reference", requisition_id),
+            "accounts": [str(uuid.uuid4()) for _ in range(self.accounts_per_requisition)],
+            "user_language": body.get("user_language", "EN"),
+            "link": f"{self.url}link/{requisition_id}",
+        }
+        self.requisitions[requisition_id] = requisition
+        return 201, requisition
+
+    def get_requisition(self, body, query, requisition_id):
+        requisition = self.requisitions.get(requisition_id)
+        if requisition is None:
+            return 404, {"summary": "Not found.", "status_code": 404}
+        return 200, requisition
+
+    def delete_requisition(self, body, query, requisition_id):
+        if self.requisitions.pop(requisition_id, None) is None:
+            return 404, {"summary": "Not found.", "status_code": 404}
+        return 200, {"summary": "Requisition deleted", "status_code": 200}
+
+    def transactions(self, body, query, account_id):
+        date_from = query.get("date_from", [None])[0]
+        date_to = query.get("date_to", [None])[0]
+        key = (account_id, date_from, date_to)
+        with self._lock:
+            cached = self._bodies.get(key)
+        if cached is None:
+            cached = json.dumps(
+                synthetic_transactions(
+                    account_id, self.transactions_per_account, date_from, date_to
+                )
+            ).encode()
+            with self._lock:
+                self._bodies[key] = cached
+        return 200, cached
+
+    # Plumbing
+
+    def _quota(self, route_name, args):
+        """
+        (quota, header prefix) for a request. The quota is None without rate limits;
+        the prefix is still needed for the reset header of injected 429s.
+        """
+        if route_name == "transactions":
+            key, prefix = ("account", args[0]), "http_x_ratelimit_account_success_"
+        else:
+            key, prefix = ("general",), "http_x_ratelimit_"
+        if self.rate_limit is None:
+            return None, prefix
+        with self._lock:
+            if key not in self._quotas:
+                self._quotas[key] = QuotaWindow(self.rate_limit, self.rate_limit_window)
+            return self._quotas[key], prefix
+
+    def _dispatch(self, method, raw_path, raw_body):
+        """Returns (status, body bytes, headers)."""
+        parts = urlsplit(raw_path)
+        for route_method, pattern, endpoint in self._routes:
+            match = pattern.match(parts.path)
+            if route_method == method and match:
+                break
+        else:
+            return 404, b'{"summary": "Not found.", "status_code": 404}', {}
+
+        with self._lock:
+            self.by_route[endpoint.__name__] += 1
+            inject_429 = self._rng.random() < self.error_rate
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        headers = {}
+        quota, prefix = self._quota(endpoint.__name__, match.groups())
+        if quota is not None:
+            with self._lock:
+                allowed, remaining, reset = quota.take()
+            headers = {
+                prefix + "limit": quota.limit,
+                prefix + "remaining": remaining,
+                prefix + "reset": reset,
+            }
+            inject_429 = inject_429 or not allowed
+        if inject_429:
+            with self._lock:
+                self.rate_limited += 1
+            headers.setdefault(prefix + "reset", 1)
+            body = {"summary": "Rate limit exceeded", "detail": "Try again later", "status_code": 429}
+            return 429, json.dumps(body).encode(), headers
+
+        try:
+            request_body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return 400, b'{"summary": "Invalid JSON", "status_code": 400}', headers
+        status, body = endpoint(request_body, parse_qs(parts.query), *match.groups())
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        return status, body, headers
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+            disable_nagle_algorithm = True  # no 40 ms delayed-ACK stalls on reused connections
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                status, body, headers = mock._dispatch(self.command, self.path, raw_body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--transactions", type=int, default=100, help="Per account.")
+    parser.add_argument("--accounts", type=int, default=2, help="Per requisition.")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests per window.")
+    parser.add_argument("--rate-limit-window", type=float, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 429s.")
+    args = parser.parse_args()
+
+    mock = MockGoCardless(
+        latency=args.latency,
+        transactions_per_account=args.transactions,
+        jitter=args.jitter,
+        accounts_per_requisition=args.accounts,
+        rate_limit=args.rate_limit,
+        rate_limit_window=args.rate_limit_window,
+        error_rate=args.error_rate,
+        port=args.port,
+    )
+    with mock:
+        print(f"Mock GoCardless listening on {mock.url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -1,6 +1,9 @@
 from app import create_app
 
-app = create_app()
+# Password hashing workers (app/utils/password_hasher.py) import this module as
+# __mp_main__ when it is the entry point; they must not build an app of their own
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True, host="localhost", port=8000)
@@ -0,0 +1,55 @@
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+
+from app.utils import mongodb_connector
+
+# pymongo 4.9+ passes sort= to UpdateOne bulk requests, which mongomock 4.3 does not
+# take; the connector never sorts its bulk updates
+_add_update = BulkOperationBuilder.add_update
+BulkOperationBuilder.add_update = lambda self, *args, sort=None, **kwargs: _add_update(
+    self, *args, **kwargs
+)
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(mongodb_connector, "MongoClient", lambda *args, **kwargs: client)
+    return client
+
+
+@pytest.fixture
+def mongo(mongo_client):
+    db = mongodb_connector.ExpenseTrackerWebAppDB("mongodb://test")
+    db.ensure_indexes()
+    return db
+
+
+@pytest.fixture
+def app(mongo_client, monkeypatch):
+    monkeypatch.setenv("FLASK_MONGODB_URI", "mongodb://test")
+    monkeypatch.setenv("FLASK_SECRET_KEY", "test")
+    monkeypatch.setenv("FLASK_PASSWORD_HASH_WORKERS", "0")
+    monkeypatch.setenv("FLASK_PASSWORD_HASH_ITERATIONS", "1000")
+    monkeypatch.setenv("FLASK_JOBS_WORKER_ENABLED", "false")
+    from app import create_app
+
+    app = create_app()
+    yield app
+    app.jobs.shutdown()
+    app.password_hasher.shutdown()
+
+
+@pytest.fixture
+def client(app):
+    """A test client logged in as "alice"."""
+    client = app.test_client()
+    client.post(
+        "/signup",
+        json={"username": "alice", "nickname": "alice", "email": "alice@example.com",
+              "password": "password1"},
+    )
+    response = client.post("/login", json={"username_email": "alice", "password": "password1"})
+    assert response.status_code == 200, response.get_json()
+    return client
@@ -0,0 +1,51 @@
+import threading
+import time
+
+from app.utils.cache import CachedValue
+
+
+class CountingLoader:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            return self.calls
+
+
+def test_cached_value_is_loaded_once_without_ttl():
+    loader = CountingLoader()
+    cached = CachedValue(loader)
+    assert [cached.get() for _ in range(3)] == [1, 1, 1]
+    cached.invalidate()
+    assert cached.get() == 2
+
+
+def test_cached_value_reloads_after_ttl():
+    loader = CountingLoader()
+    cached = CachedValue(loader, ttl=0.05)
+    assert cached.get() == cached.get() == 1
+    time.sleep(0.06)
+    assert cached.get() == 2
+
+
+def test_zero_or_negative_ttl_reloads_every_time():
+    for ttl in (0, -1):
+        loader = CountingLoader()
+        cached = CachedValue(loader, ttl=ttl)
+        assert [cached.get() for _ in range(3)] == [1, 2, 3]
+
+
+def test_concurrent_callers_share_one_reload():
+    loader = CountingLoader(delay=0.05)
+    cached = CachedValue(loader, ttl=60)
+    threads = [threading.Thread(target=cached.get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == 1
@@ -0,0 +1,58 @@
+import pytest
+
+from app.utils.bank_import import prepare_bank_transaction
+
+EXPENSE = {"username": "alice", "transactionType": "expense", "bookingDate": "2024-01-02",
+           "category": "Food"}
+
+
+def bank_transaction(transaction_id, amount, **fields):
+    return {
+        "transactionId": transaction_id,
+        "bookingDate": "2024-01-05",
+        "transactionAmount": {"amount": amount, "currency": "EUR"},
+        **fields,
+    }
+
+
+def test_prepare_bank_transaction_stores_expenses_unsigned():
+    debit = prepare_bank_transaction(bank_transaction("t1", "-7.50"), "alice")
+    assert debit["transactionType"] == "expense"
+    assert debit["transactionAmount"] == {"amount": 7.5, "currency": "EUR"}
+
+    credit = prepare_bank_transaction(bank_transaction("t2", "1200.00"), "alice")
+    assert credit["transactionType"] == "income"
+    assert credit["transactionAmount"]["amount"] == "1200.00"
+
+
+# mongomock cannot run the "aggregate" pipeline ($type), it shares rollup_amount's $abs
+@pytest.mark.parametrize("chart_source", ["rollups", "python"])
+def test_manual_and_imported_expenses_add_up(app, client, chart_source):
+    app.config["DASHBOARD_CHART_SOURCE"] = chart_source
+    for amount in ("5.0", "20.0"):
+        assert client.post("/add_expense", json={**EXPENSE, "amount": amount}).status_code == 200
+    report = app.mongo.upsert_transactions(
+        [prepare_bank_transaction(bank_transaction("t1", "-7.50", category="Food"), "alice")]
+    )
+    assert report["inserted"] == 1
+
+    payload = client.get("/dashboard").get_json()
+
+    assert sorted(t["amount"] for t in payload["transactions"]) == [5.0, 7.5, 20.0]
+    chart = payload["chart_data"]
+    assert dict(zip(chart["categories"], chart["amounts"])) == {"Food": 32.5}
+
+
+def test_legacy_negative_expenses_count_unsigned(app, client):
+    # bank rows imported before expenses were stored unsigned
+    app.mongo.transactions.insert_one(
+        {**bank_transaction("legacy", -7.5), **EXPENSE, "_id": "legacy"}
+    )
+    client.post("/add_expense", json={**EXPENSE, "amount": "5.0"})
+    app.mongo.rebuild_rollups("alice")
+    app.mongo.bump_data_version("alice")
+
+    for chart_source in ("rollups", "python"):
+        app.config["DASHBOARD_CHART_SOURCE"] = chart_source
+        chart = client.get("/dashboard").get_json()["chart_data"]
+        assert dict(zip(chart["categories"], chart["amounts"])) == {"Food": 12.5}, chart_source
@@ -0,0 +1,82 @@
+EXPENSE = {"username": "alice", "transactionType": "expense", "bookingDate": "2024-01-02",
+           "category": "Food", "amount": "5.0"}
+
+
+def rollups(mongo):
+    return {
+        doc["category"]: (doc["total"], doc["count"])
+        for doc in mongo.monthly_rollups.find({"username": "alice"})
+    }
+
+
+def test_edit_expense_moves_the_amount_between_rollups(app, client):
+    expense_id = client.post("/add_expense", json=EXPENSE).get_json()["inserted_id"]
+
+    response = client.post(f"/edit_expense/{expense_id}", json={"category": "Rent", "amount": "8"})
+
+    assert response.status_code == 200, response.get_json()
+    assert rollups(app.mongo) == {"Food": (0, 0), "Rent": (8.0, 1)}
+
+
+def test_edit_expense_rejects_an_invalid_result_without_writing(app, client):
+    expense_id = client.post("/add_expense", json=EXPENSE).get_json()["inserted_id"]
+
+    response = client.post(f"/edit_expense/{expense_id}", json={"bookingDate": "2999-01-01"})
+
+    assert response.status_code == 400
+    assert "bookingDate" in response.get_json()["error"]
+    assert app.mongo.transactions.find_one()["bookingDate"] == "2024-01-02"
+    assert rollups(app.mongo) == {"Food": (5.0, 1)}
+
+
+def test_edit_expense_tells_missing_from_foreign(app, client):
+    app.mongo.transactions.insert_one({**EXPENSE, "_id": "bobs", "username": "bob"})
+
+    assert client.post("/edit_expense/nope", json={"category": "Rent"}).status_code == 404
+    assert client.post("/edit_expense/bobs", json={"category": "Rent"}).status_code == 403
+
+
+
+class DeletedAfterRead:
+    """The Transactions collection, where another request deletes 'expense_id' right
+    after the first find()."""
+
+    def __init__(self, mongo, expense_id):
+        self.mongo, self.collection, self.expense_id = mongo, mongo.transactions, expense_id
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def find(self, *args, **kwargs):
+        docs = list(self.collection.find(*args, **kwargs))
+        if self.expense_id is not None:
+            self.mongo.transactions = self.collection
+            self.mongo.delete_transaction(self.expense_id, "alice")
+            self.mongo.transactions, self.expense_id = self, None
+        return docs
+
+
+def test_concurrent_deletes_remove_the_expense_from_its_rollup_once(app, client):
+    expense_id = client.post("/add_expense", json=EXPENSE).get_json()["inserted_id"]
+    app.mongo.transactions = DeletedAfterRead(app.mongo, expense_id)
+
+    response = client.post("/expenses/batch", json={"operations": [{"op": "delete", "id": expense_id}]})
+
+    assert response.get_json()["results"] == [{"status": "not_found", "id": expense_id}]
+    assert rollups(app.mongo) == {"Food": (0, 0)}
+
+
+def test_batch_applies_creates_updates_and_deletes(app, client):
+    first, second = (
+        client.post("/add_expense", json=EXPENSE).get_json()["inserted_id"] for _ in range(2)
+    )
+    operations = [
+        {"op": "create", "fields": {**EXPENSE, "category": "Rent", "amount": "9"}},
+        {"op": "update", "id": first, "fields": {"amount": "6"}},
+        {"op": "delete", "id": second},
+    ]
+
+    response = client.post("/expenses/batch", json={"operations": operations})
+
+    assert response.get_json()["counts"] == {"created": 1, "updated": 1, "deleted": 1}
+    assert rollups(app.mongo) == {"Food": (6.0, 1), "Rent": (9.0, 1)}
@@ -0,0 +1,65 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils.bank_auth.gocardless_api import ApiClient, RateLimitError
+from app.utils.bank_auth.http_session import build_session
+from app.utils.bank_auth.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def server():
+    """A local server that answers "429, Retry-After: 1" once, then 200."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            status = 429 if len(hits) == 1 else 200
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/", hits
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_session_does_not_retry_429(server):
+    url, hits = server
+    response = build_session().get(url + "requisitions/")
+    assert response.status_code == 429
+    assert len(hits) == 1
+
+
+def test_429_is_handled_by_the_rate_limiter(server):
+    url, hits = server
+    limiter = RateLimiter(max_wait=5)
+    client = ApiClient(url, "token", session=build_session(), limiter=limiter)
+
+    response = client.get("requisitions/")
+
+    assert response.status_code == 200
+    assert len(hits) == 2
+    assert limiter.metrics()["rate_limited"] == 1
+    assert client.throttled_seconds >= 0.9
+
+
+def test_429_wait_beyond_max_wait_fails_fast(server):
+    url, hits = server
+    client = ApiClient(url, "token", session=build_session(), limiter=RateLimiter(max_wait=0.1))
+
+    with pytest.raises(RateLimitError):
+        client.get("requisitions/")
+    assert len(hits) == 1
@@ -0,0 +1,163 @@
+import datetime as dt
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from flask import Flask
+
+from app.utils.jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.mongo = SimpleNamespace(logger=logging.getLogger("test_jobs"))
+    return app
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.Jobs
+
+
+def make_queue(app, collection, **kwargs):
+    queue = JobQueue(app, collection, max_workers=1, stale_after=60, **kwargs)
+    queue.register("ok", lambda job, progress: progress(step=1) or {"echo": job["params"]})
+    queue.register("boom", lambda job, progress: 1 / 0)
+    return queue
+
+
+def orphan(collection, job_id, heartbeat, attempts=1, status=RUNNING):
+    collection.insert_one(
+        {
+            "_id": job_id, "kind": "ok", "username": "alice", "params": {"n": job_id},
+            "status": status, "progress": {}, "result": None, "error": None,
+            "owner": "crashed:1", "heartbeat": heartbeat, "attempts": attempts,
+            "createdDate": heartbeat, "updatedDate": heartbeat,
+        }
+    )
+
+
+def test_submit_runs_the_handler_and_stores_its_result(app, collection):
+    queue = make_queue(app, collection)
+    job_id = queue.submit("ok", "alice", {"n": 1})
+    queue.shutdown()
+
+    job = queue.get(job_id, username="alice")
+    assert job["status"] == DONE
+    assert job["result"] == {"echo": {"n": 1}}
+    assert job["progress"] == {"step": 1}
+    assert job["attempts"] == 1
+    assert "params" not in job
+    assert queue.get(job_id, username="bob") is None
+    assert collection.find_one({"_id": job_id})["finishedAt"] is not None
+
+
+def test_failing_handler_marks_the_job_failed(app, collection):
+    queue = make_queue(app, collection)
+    job_id = queue.submit("boom", "alice")
+    queue.shutdown()
+
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert "division by zero" in job["error"]
+    assert job["result"] is None
+    assert collection.find_one({"_id": job_id})["finishedAt"] is not None
+
+
+def test_unknown_kind_is_rejected(app, collection):
+    queue = make_queue(app, collection)
+    with pytest.raises(ValueError):
+        queue.submit("nope", "alice")
+    queue.shutdown()
+    assert collection.count_documents({}) == 0
+
+
+def test_recover_orphans_only_requeues_stale_jobs(app, collection):
+    now = dt.datetime.now()
+    orphan(collection, "stale", now - dt.timedelta(seconds=300))
+    orphan(collection, "stale-queued", now - dt.timedelta(seconds=300), attempts=0, status=QUEUED)
+    orphan(collection, "fresh", now - dt.timedelta(seconds=5))
+    orphan(collection, "worn-out", now - dt.timedelta(seconds=300), attempts=3)
+    queue = make_queue(app, collection, max_attempts=3)
+
+    recovered = queue.recover_orphans()
+    queue.shutdown()
+
+    assert sorted(recovered) == ["stale", "stale-queued"]
+    for job_id in recovered:
+        job = queue.get(job_id)
+        assert job["status"] == DONE
+        assert job["owner"] == queue.owner
+        assert job["result"] == {"echo": {"n": job_id}}
+    fresh = queue.get("fresh")
+    assert (fresh["status"], fresh["owner"]) == (RUNNING, "crashed:1")
+    worn_out = queue.get("worn-out")
+    assert worn_out["status"] == FAILED
+    assert "orphaned" in worn_out["error"]
+
+
+def test_start_recovers_once(app, collection):
+    orphan(collection, "stale", dt.datetime.now() - dt.timedelta(seconds=300))
+    queue = make_queue(app, collection)
+    calls = []
+    recover = queue.recover_orphans
+    queue.recover_orphans = lambda: calls.append(1) or recover()
+
+    queue.start()
+    queue.start()
+    queue.shutdown()
+
+    assert calls == [1]
+    assert queue.get("stale")["status"] == DONE
+
+
+def test_a_taken_over_run_cannot_overwrite_the_new_result(app, collection):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(job, progress):
+        started.set()
+        release.wait(5)
+        return {"run": "first"}
+
+    first = JobQueue(app, collection, max_workers=1, stale_after=60)
+    first.register("ok", slow)
+    job_id = first.submit("ok", "alice")
+    assert started.wait(5)
+
+    # the first worker misses its heartbeats, another one recovers the job
+    collection.update_one(
+        {"_id": job_id}, {"$set": {"heartbeat": dt.datetime.now() - dt.timedelta(seconds=300)}}
+    )
+    second = JobQueue(app, collection, max_workers=1, stale_after=60)
+    second.owner = "other:2"
+    second.register("ok", lambda job, progress: {"run": "second"})
+    assert second.recover_orphans() == [job_id]
+    second.shutdown()
+
+    release.set()
+    first.shutdown()
+
+    job = first.get(job_id)
+    assert (job["status"], job["result"], job["owner"]) == (DONE, {"run": "second"}, "other:2")
+
+
+def test_jobs_heartbeat_without_start_but_orphans_stay_put(app, collection):
+    orphan(collection, "foreign", dt.datetime.now() - dt.timedelta(seconds=300))
+    release = threading.Event()
+    # heartbeats every second
+    queue = JobQueue(app, collection, max_workers=1, stale_after=4)
+    queue.register("ok", lambda job, progress: release.wait(5) and {})
+    job_id = queue.submit("ok", "alice")
+    submitted = collection.find_one({"_id": job_id})["heartbeat"]
+
+    time.sleep(1.5)
+    heartbeat = collection.find_one({"_id": job_id})["heartbeat"]
+    release.set()
+    queue.shutdown()
+
+    assert heartbeat > submitted
+    assert queue.get("foreign")["owner"] == "crashed:1"
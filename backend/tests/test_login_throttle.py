@@ -0,0 +1,28 @@
+from app.utils.login_throttle import LoginThrottle
+
+
+def test_failures_lock_out_only_the_ip_that_sent_them():
+    throttle = LoginThrottle(max_failures_per_account=3, max_attempts_per_ip=100, window=60)
+    for _ in range(3):
+        assert throttle.retry_after("Alice", "10.0.0.1") == 0
+        throttle.record("Alice", "10.0.0.1", success=False)
+
+    assert throttle.retry_after("alice", "10.0.0.1") > 0
+    assert throttle.retry_after("alice", "10.0.0.2") == 0  # the real user elsewhere
+    assert throttle.retry_after("bob", "10.0.0.1") == 0
+
+
+def test_success_clears_the_failures():
+    throttle = LoginThrottle(max_failures_per_account=2, max_attempts_per_ip=100, window=60)
+    throttle.record("alice", "10.0.0.1", success=False)
+    throttle.record("alice", "10.0.0.1", success=True)
+    throttle.record("alice", "10.0.0.1", success=False)
+    assert throttle.retry_after("alice", "10.0.0.1") == 0
+
+
+def test_ip_limit_counts_every_attempt():
+    throttle = LoginThrottle(max_failures_per_account=100, max_attempts_per_ip=3, window=60)
+    for account in ("a", "b", "c"):
+        assert throttle.retry_after(account, "10.0.0.1") == 0
+    assert throttle.retry_after("d", "10.0.0.1") > 0
+    assert throttle.retry_after(None, "10.0.0.2") == 0
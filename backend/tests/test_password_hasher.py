@@ -0,0 +1,15 @@
+from app.utils._password_utils import hash_password
+from app.utils.password_hasher import PasswordHasher
+
+
+def test_pool_hashes_and_checks():
+    hasher = PasswordHasher(iterations=1000, max_workers=1, max_queue=1, timeout=30)
+    try:
+        stored = hasher.hash("correct horse")
+        assert hasher.check(stored, "correct horse") == (True, None)
+        assert hasher.check(stored, "wrong") == (False, None)
+        matched, new_hash = hasher.check(hash_password("correct horse", 500), "correct horse")
+        assert matched and new_hash.startswith("pbkdf2_sha256$1000$")
+    finally:
+        hasher.shutdown()
+    assert hasher.executor._mp_context.get_start_method() != "fork"
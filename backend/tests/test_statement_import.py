@@ -0,0 +1,150 @@
+import io
+import json
+
+import pytest
+
+from app.utils.statement_import import (
+    DEFAULT_CSV_MAPPING,
+    StatementError,
+    _ReferenceAssigner,
+    parse_camt053,
+    parse_csv,
+    parse_ofx,
+)
+
+CSV = b"""date,amount,currency,counterparty,description,reference,category
+2024-01-05,-7.50,EUR,Bakery,bread,r1,Food
+2024-01-05,1200.00,EUR,ACME,salary,r2,
+2024-01-06,lots,EUR,Shop,bad amount,r3,
+"""
+
+OFX = b"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<CURDEF>EUR
+<BANKACCTFROM><BANKID>B<ACCTID>NL01</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105120000<TRNAMT>-7.50<FITID>f1<NAME>Bakery<MEMO>bread</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240105<TRNAMT>1200.00<FITID>f2<NAME>ACME</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<TRNAMT>-1.00<FITID>f3</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+CAMT053 = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"><BkToCstmrStmt><Stmt>
+<Acct><Id><IBAN>NL01</IBAN></Id></Acct>
+<Ntry><Amt Ccy="EUR">7.50</Amt><CdtDbtInd>DBIT</CdtDbtInd><BookgDt><Dt>2024-01-05</Dt></BookgDt>
+<AcctSvcrRef>c1</AcctSvcrRef><NtryDtls><TxDtls><RltdPties><Cdtr><Nm>Bakery</Nm></Cdtr></RltdPties>
+<RmtInf><Ustrd>bread</Ustrd></RmtInf></TxDtls></NtryDtls></Ntry>
+<Ntry><Amt Ccy="EUR">1200.00</Amt><CdtDbtInd>CRDT</CdtDbtInd><BookgDt><Dt>2024-01-05</Dt></BookgDt>
+<AcctSvcrRef>c2</AcctSvcrRef></Ntry>
+<Ntry><CdtDbtInd>DBIT</CdtDbtInd></Ntry>
+</Stmt></BkToCstmrStmt></Document>
+"""
+
+FILES = {"csv": ("statement.csv", CSV), "ofx": ("statement.ofx", OFX),
+         "camt053": ("statement.xml", CAMT053)}
+
+
+def test_parse_csv_reads_signed_amounts_and_reports_bad_rows():
+    rows = list(parse_csv(io.BytesIO(CSV)))
+
+    assert [row for row, _, _ in rows] == [2, 3, 4]
+    debit, credit, bad = (transaction for _, transaction, _ in rows)
+    assert debit == {
+        "transactionId": "r1",
+        "remittanceInformationUnstructured": "bread",
+        "bookingDate": "2024-01-05",
+        "transactionAmount": {"amount": -7.5, "currency": "EUR"},
+        "creditorName": "Bakery",
+    }
+    assert credit["debtorName"] == "ACME"
+    assert bad is None
+    assert "not an amount" in rows[2][2]
+
+
+def test_parse_csv_with_a_mapping_debit_credit_columns_and_decimal_commas():
+    data = "Datum;Af;Bij;Valuta\n05-01-2024;1.234,50;;USD\n06-01-2024;;12,00;\n".encode()
+    rows = parse_csv(
+        io.BytesIO(data),
+        mapping={"bookingDate": "datum", "debit": "Af", "credit": "Bij", "currency": "valuta"},
+        delimiter=";",
+        date_format="%d-%m-%Y",
+        decimal=",",
+    )
+
+    assert [transaction for _, transaction, _ in rows] == [
+        {"bookingDate": "2024-01-05", "transactionAmount": {"amount": -1234.5, "currency": "USD"}},
+        {"bookingDate": "2024-01-06", "transactionAmount": {"amount": 12.0, "currency": "EUR"}},
+    ]
+
+
+def test_parse_csv_needs_a_date_and_an_amount_column():
+    with pytest.raises(StatementError):
+        list(parse_csv(io.BytesIO(b"when,what\n2024-01-05,1\n")))
+
+
+def test_parse_ofx_namespaces_fitids_by_account():
+    rows = list(parse_ofx(io.BytesIO(OFX), chunk_size=64))
+
+    debit, credit, bad = (transaction for _, transaction, _ in rows)
+    assert debit["transactionId"] == "NL01:f1"
+    assert debit["bookingDate"] == "2024-01-05"
+    assert debit["transactionAmount"] == {"amount": -7.5, "currency": "EUR"}
+    assert debit["creditorName"] == "Bakery"
+    assert credit["debtorName"] == "ACME"
+    assert bad is None and "DTPOSTED" in rows[2][2]
+
+
+def test_parse_camt053_signs_debits_and_namespaces_references_by_iban():
+    rows = list(parse_camt053(io.BytesIO(CAMT053)))
+
+    debit, credit, bad = (transaction for _, transaction, _ in rows)
+    assert debit["transactionId"] == "NL01:c1"
+    assert debit["transactionAmount"] == {"amount": -7.5, "currency": "EUR"}
+    assert debit["creditorName"] == "Bakery"
+    assert debit["remittanceInformationUnstructured"] == "bread"
+    assert credit["transactionAmount"]["amount"] == 1200.0
+    assert bad is None and rows[2][2] == "Entry without a valid Amt"
+
+
+def test_reference_assigner_namespaces_references_and_numbers_identical_entries():
+    assign = _ReferenceAssigner("alice", "csv", account="main")
+    coffee = {"bookingDate": "2024-01-05", "transactionAmount": {"amount": -3.0}}
+
+    referenced = assign({**coffee, "transactionId": "r1"})
+    first, second = assign(dict(coffee)), assign(dict(coffee))
+    next_day = assign({**coffee, "bookingDate": "2024-01-06"})
+
+    assert referenced["internalTransactionId"] == "upload:alice:csv:main:r1"
+    assert "transactionId" not in referenced
+    assert first["internalTransactionId"].endswith("#0")
+    assert second["internalTransactionId"] == first["internalTransactionId"][:-1] + "1"
+    assert next_day["internalTransactionId"].endswith("#0")
+
+
+@pytest.mark.parametrize("fmt", FILES)
+def test_uploaded_debits_are_stored_as_positive_expenses(app, client, fmt):
+    filename, data = FILES[fmt]
+    form = {}
+    if fmt == "csv":
+        form["mapping"] = json.dumps({**DEFAULT_CSV_MAPPING, "category": "category"})
+
+    def upload():
+        return client.post(
+            "/expenses/import",
+            data={**form, "file": (io.BytesIO(data), filename)},
+            content_type="multipart/form-data",
+        ).get_json()
+
+    report = upload()
+    assert (report["format"], report["inserted"], report["rejected"]) == (fmt, 2, 1)
+
+    debit = app.mongo.transactions.find_one({"transactionType": "expense"})
+    assert debit["transactionAmount"]["amount"] == 7.5
+    [rollup] = app.mongo.monthly_rollups.find({"transactionType": "expense"})
+    assert (rollup["category"], rollup["total"]) == ("Food" if fmt == "csv" else "Uncategorized", 7.5)
+
+    assert upload()["unchanged"] == 2
+    assert app.mongo.transactions.count_documents({}) == 2
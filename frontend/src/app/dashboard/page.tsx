@@ -9,12 +9,14 @@ import PieChart from "@/components/charts/PieChart";
 import StackedBarChart from "@/components/charts/StackedBarChart";
 import ImportTransactionsModal from "@/components/ImportTransactionsModal";
 import LinkBankModal from "@/components/LinkBankModal";
+import { waitForJob } from "@/components/utils/waitForJob";
 
 /**
  * The Flask /dashboard endpoint now returns this structure:
  * {
  *   user: { id: string },
- *   transactions: Array<GoCardlessTransaction>,
+ *   transactions: Array<GoCardlessTransaction>, // first page, newest first
+ *   next_cursor: string | null, // pass as ?after= to /transactions for the next page
  *   chart_data: {
  *     categories: string[],
  *     amounts: number[],
@@ -59,6 +61,8 @@ export default function DashboardPage() {
   // State for transactions and chart data
   const [transactions, setTransactions] = useState<Transaction[]>([]);
   const [chartData, setChartData] = useState<ChartData | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // State for modals
   // const [showAddModal, setShowAddModal] = useState(false);
@@ -112,6 +116,7 @@ export default function DashboardPage() {
 
         // Update states
         setTransactions(data.transactions || []);
+        setNextCursor(data.next_cursor || null);
         setChartData(data.chart_data || null);
       } catch (err) {
         setErrorMessage(`Failed to reach server: ${err}`);
@@ -121,6 +126,32 @@ export default function DashboardPage() {
     })();
   }, []);
 
+  // Fetch the next page of transactions from `/transactions`
+  const loadMoreTransactions = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const resp = await fetch(
+        `http://localhost:8000/transactions?after=${encodeURIComponent(
+          nextCursor
+        )}`,
+        { method: "GET", credentials: "include" }
+      );
+      if (!resp.ok) {
+        const errorText = await resp.text();
+        console.error("Failed to load more transactions:", errorText);
+        return;
+      }
+      const data = await resp.json();
+      setTransactions((prev) => [...prev, ...(data.transactions || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      console.error("Error loading more transactions:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const openEditModal = (txn: Transaction) => {
     setEditingTransaction(txn);
     setShowEditModal(true);
@@ -174,8 +205,14 @@ export default function DashboardPage() {
               console.error("Failed to refresh link status:", data);
               return;
             }
-            const data = await resp.json();
-            console.log("Refreshed link status:", data);
+            // The refresh runs as a background job; wait for it to finish
+            const { job_id } = await resp.json();
+            const job = await waitForJob(job_id);
+            if (job.status === "failed") {
+              console.error("Failed to refresh link status:", job.error);
+              return;
+            }
+            console.log("Refreshed link status:", job.result);
             // Possibly reload or update local state
             window.location.reload();
           } catch (err) {
@@ -217,6 +254,15 @@ export default function DashboardPage() {
           </li>
         ))}
       </ul>
+      {nextCursor && (
+        <Button
+          variant="secondary"
+          onClick={loadMoreTransactions}
+          disabled={loadingMore}
+        >
+          {loadingMore ? "Loading..." : "Load More"}
+        </Button>
+      )}
 
       {/* Modals */}
       {/* <AddExpenseModal
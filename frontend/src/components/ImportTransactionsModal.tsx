@@ -2,6 +2,7 @@
 
 import React, { useState } from "react";
 import { Modal, Button, Form } from "react-bootstrap";
+import { waitForJob } from "@/components/utils/waitForJob";
 
 interface ImportTransactionsModalProps {
   show: boolean;
@@ -14,6 +15,7 @@ export default function ImportTransactionsModal({
 }: ImportTransactionsModalProps) {
   const [dateFrom, setDateFrom] = useState("");
   const [dateTo, setDateTo] = useState("");
+  const [status, setStatus] = useState("");
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -29,7 +31,22 @@ export default function ImportTransactionsModal({
         console.error("Failed to import transactions", errorData);
         return;
       }
+      // The import runs as a background job; wait for it to finish
+      const { job_id } = await resp.json();
+      setStatus("Importing...");
+      const job = await waitForJob(job_id, (running) => {
+        const { accounts_done, accounts_total } = running.progress;
+        if (accounts_total !== undefined) {
+          setStatus(`Importing... ${accounts_done}/${accounts_total} accounts`);
+        }
+      });
+      if (job.status === "failed") {
+        console.error("Failed to import transactions", job.error);
+        setStatus(`Import failed: ${job.error}`);
+        return;
+      }
       // If success, close modal and maybe reload to see new data
+      setStatus("");
       onClose();
       window.location.reload();
     } catch (err) {
@@ -62,6 +79,7 @@ export default function ImportTransactionsModal({
               required
             />
           </Form.Group>
+          {status && <p>{status}</p>}
 
           <div className="d-flex justify-content-end">
             <Button variant="secondary" onClick={onClose} className="mr-2">
@@ -0,0 +1,35 @@
+/**
+ * Background jobs queued by the Flask backend (/banks/import, /banks/refresh_link)
+ * return { job_id } right away. This polls /banks/jobs/<job_id> until the job is
+ * "done" or "failed" and returns the final job document.
+ */
+export interface Job {
+  id: string;
+  kind: string;
+  status: "queued" | "running" | "done" | "failed";
+  progress: Record<string, unknown>;
+  result: Record<string, unknown> | null;
+  error: string | null;
+}
+
+export async function waitForJob(
+  jobId: string,
+  onProgress?: (job: Job) => void,
+  intervalMs = 1000
+): Promise<Job> {
+  for (;;) {
+    const resp = await fetch(`http://localhost:8000/banks/jobs/${jobId}`, {
+      method: "GET",
+      credentials: "include",
+    });
+    if (!resp.ok) {
+      throw new Error(`Failed to fetch job ${jobId}: ${await resp.text()}`);
+    }
+    const job: Job = await resp.json();
+    if (job.status === "done" || job.status === "failed") {
+      return job;
+    }
+    onProgress?.(job);
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}